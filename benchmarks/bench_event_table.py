@@ -0,0 +1,86 @@
+"""Benchmark EventTable against a list of event dicts for building the events DataFrame.
+
+Usage:
+    python benchmarks/bench_event_table.py [--events 500000]
+"""
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import pandas as pd
+
+from calendarmetrics.event_table import EventTable
+
+
+def synthetic_fields(n: int, seed: int = 0):
+    """Yield (start, end, summary, category) like CalendarParser produces them."""
+    rng = np.random.default_rng(seed)
+    base = datetime(2015, 1, 1)
+    offsets = rng.integers(0, 10 * 365 * 24 * 60, n).tolist()
+    lengths = rng.integers(15, 240, n).tolist()
+    summaries = [f'Activity {i}' for i in rng.integers(0, 500, n).tolist()]
+    categories = ('WORK', 'SLEEP', 'ERRANDS')
+    for i in range(n):
+        start = base + timedelta(minutes=offsets[i])
+        yield start, start + timedelta(minutes=lengths[i]), summaries[i], categories[i % 3]
+
+
+def build_dicts(n: int) -> pd.DataFrame:
+    events = []
+    for start, end, summary, category in synthetic_fields(n):
+        events.append({
+            'start': start,
+            'end': end,
+            'macro_activities': category,
+            'micro_activities': summary,
+            'duration': (end - start).total_seconds() / 3600,
+            'calendar': category
+        })
+    return pd.DataFrame(events)
+
+
+def build_table(n: int) -> pd.DataFrame:
+    table = EventTable()
+    for start, end, summary, category in synthetic_fields(n):
+        table.append(start, end, summary, category)
+    return table.to_frame()
+
+
+def timed(func, n: int) -> float:
+    began = time.perf_counter()
+    func(n)
+    return time.perf_counter() - began
+
+
+def peak_memory(func, n: int) -> float:
+    """Peak traced allocation in MB (measured separately, tracing slows everything)."""
+    tracemalloc.start()
+    func(n)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak / 1024 / 1024
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--events', type=int, default=500000)
+    args = parser.parse_args()
+
+    dict_time, table_time = timed(build_dicts, args.events), timed(build_table, args.events)
+    dict_peak, table_peak = peak_memory(build_dicts, args.events), peak_memory(build_table, args.events)
+
+    print(f"events:     {args.events}")
+    print(f"dicts:      {dict_time:.3f}s, peak {dict_peak:.1f} MB")
+    print(f"EventTable: {table_time:.3f}s, peak {table_peak:.1f} MB "
+          f"({dict_time / table_time:.1f}x faster, {dict_peak / table_peak:.1f}x less memory)")
+
+
+if __name__ == '__main__':
+    main()
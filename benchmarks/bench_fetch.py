@@ -0,0 +1,129 @@
+"""Benchmark FeedFetcher against a local stand-in for a calendar server.
+
+The stand-in serves synthetic ICS feeds over HTTP/1.1 with keep-alive,
+ETag and Last-Modified, like Google's secret iCal addresses. The first
+fetch downloads every feed; the second must only get 304s.
+
+Usage:
+    python benchmarks/bench_fetch.py [--feeds 8] [--events 20000]
+"""
+import argparse
+import email.utils
+import hashlib
+import os
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from calendarmetrics.fetch import Feed, FeedFetcher
+
+
+def synthetic_feed(events: int, seed: int) -> bytes:
+    lines = ['BEGIN:VCALENDAR', 'VERSION:2.0', 'PRODID:-//bench//EN']
+    for i in range(events):
+        day = 1 + (i + seed) % 28
+        hour = (i * 7 + seed) % 23
+        lines += ['BEGIN:VEVENT', f'UID:{seed}-{i}@bench',
+                  f'DTSTART:202401{day:02d}T{hour:02d}0000Z', f'DTEND:202401{day:02d}T{hour + 1:02d}0000Z',
+                  f'SUMMARY:Activity {i % 50}', 'END:VEVENT']
+    lines.append('END:VCALENDAR')
+    return ('\r\n'.join(lines) + '\r\n').encode('utf-8')
+
+
+class StandInServer:
+    """Serve path -> body over HTTP/1.1 on 127.0.0.1 with conditional GET support.
+
+    Bodies are sent chunked for odd paths and with Content-Length otherwise,
+    so both framings are exercised. Every request is counted in hits.
+    """
+
+    def __init__(self, bodies):
+        self.bodies = bodies
+        self.hits = {'200': 0, '304': 0}
+        self.last_modified = email.utils.formatdate(time.time(), usegmt=True)
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                body = server.bodies.get(self.path)
+                if body is None:
+                    self.send_response(404)
+                    self.send_header('Content-Length', '0')
+                    self.end_headers()
+                    return
+                etag = '"' + hashlib.sha1(body).hexdigest() + '"'
+                if self.headers.get('If-None-Match') == etag:
+                    server.hits['304'] += 1
+                    self.send_response(304)
+                    self.send_header('ETag', etag)
+                    self.end_headers()
+                    return
+                server.hits['200'] += 1
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/calendar')
+                self.send_header('ETag', etag)
+                self.send_header('Last-Modified', server.last_modified)
+                if len(self.path) % 2:
+                    self.send_header('Transfer-Encoding', 'chunked')
+                    self.end_headers()
+                    for start in range(0, len(body), 50000):
+                        chunk = body[start:start + 50000]
+                        self.wfile.write(f'{len(chunk):x}\r\n'.encode('ascii') + chunk + b'\r\n')
+                    self.wfile.write(b'0\r\n\r\n')
+                else:
+                    self.send_header('Content-Length', str(len(body)))
+                    self.end_headers()
+                    self.wfile.write(body)
+
+        self.httpd = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.url = f'http://127.0.0.1:{self.httpd.server_address[1]}'
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--feeds', type=int, default=8)
+    parser.add_argument('--events', type=int, default=20000, help='events per feed')
+    parser.add_argument('--connections', type=int, default=4)
+    args = parser.parse_args()
+
+    bodies = {f'/calendar/{i}/basic.ics': synthetic_feed(args.events, i) for i in range(args.feeds)}
+    with StandInServer(bodies) as server, tempfile.TemporaryDirectory() as calendars_dir:
+        feeds = [Feed(f'cal{i}', server.url + path, os.path.join(calendars_dir, f'cal{i}.ics'))
+                 for i, path in enumerate(bodies)]
+        fetcher = FeedFetcher(calendars_dir, max_connections=args.connections)
+        for label in ('cold', 'unchanged'):
+            began = time.perf_counter()
+            results = fetcher.fetch(feeds)
+            elapsed = time.perf_counter() - began
+            statuses = sorted({result['status'] for result in results.values()})
+            downloaded = sum(result.get('bytes', 0) for result in results.values())
+            print(f"{label:10s} {elapsed:7.3f}s  {downloaded / 1e6:8.2f} MB  "
+                  f"{fetcher.connections_opened} connection(s)  {', '.join(statuses)}")
+
+        for feed, path in zip(feeds, bodies):
+            with open(feed.path, 'rb') as f:
+                assert f.read() == bodies[path], f"{feed.name} was not saved intact"
+        assert server.hits == {'200': args.feeds, '304': args.feeds}, server.hits
+        print(f"server hits: {server.hits}")
+
+
+if __name__ == '__main__':
+    main()
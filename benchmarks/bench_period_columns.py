@@ -0,0 +1,71 @@
+"""Benchmark period-column derivation against the previous row-wise version.
+
+Usage:
+    python benchmarks/bench_period_columns.py [--events 300000]
+"""
+import argparse
+import os
+import sys
+import time
+from types import SimpleNamespace
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from calendarmetrics.data_processor import DataProcessor
+
+
+def legacy_period_columns(df: pd.DataFrame, fiscal_start_month: int) -> pd.DataFrame:
+    """The row-wise implementation DataProcessor used before vectorization."""
+    df['date'] = df['start'].dt.date
+    df['week'] = df['start'].dt.isocalendar().week
+    df['year'] = df['start'].dt.year
+    df['month'] = df['start'].dt.month
+    df['calendar_quarter'] = ((df['month'] - 1) // 3 + 1).astype(int)
+    df['calendar_quarter_year'] = df.apply(
+        lambda x: f"{x['year']} Q{x['calendar_quarter']}", axis=1
+    )
+    df['custom_quarter'] = ((df['month'] - fiscal_start_month) % 12 // 3 + 1).astype(int)
+    df['fiscal_year'] = df.apply(
+        lambda x: x['year'] + (1 if x['month'] >= fiscal_start_month else 0),
+        axis=1
+    )
+    return df
+
+
+def synthetic_events(n: int, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    start = pd.Timestamp('2015-01-01') + pd.to_timedelta(rng.integers(0, 10 * 365 * 24 * 60, n), unit='min')
+    return pd.DataFrame({'start': start.sort_values(), 'duration': rng.random(n) * 3})
+
+
+def timed(func, *args) -> float:
+    began = time.perf_counter()
+    func(*args)
+    return time.perf_counter() - began
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--events', type=int, default=300000)
+    parser.add_argument('--fiscal-start-month', type=int, default=9)
+    args = parser.parse_args()
+
+    config = SimpleNamespace(time_periods={
+        'default_periods': {'year': {'start_month': args.fiscal_start_month}}
+    })
+    processor = DataProcessor.from_processed(pd.DataFrame(), config)
+    events = synthetic_events(args.events)
+
+    legacy = timed(legacy_period_columns, events.copy(), args.fiscal_start_month)
+    vectorized = timed(processor._add_period_columns, events.copy())
+
+    print(f"events:     {args.events}")
+    print(f"legacy:     {legacy:.3f}s")
+    print(f"vectorized: {vectorized:.3f}s ({legacy / vectorized:.1f}x)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,232 @@
+"""Benchmark each pipeline stage (parse, process, aggregate, render) on synthetic calendars.
+
+For every scale a synthetic workspace is generated (see synthetic_calendars.py)
+and each stage runs in its own interpreter, reading the previous stage's
+result from a pickle, so its time and peak memory are measured in isolation.
+Results are written as JSON and can be compared with an earlier run.
+
+Usage:
+    python benchmarks/bench_pipeline.py [--scales 10000,100000,1000000] [--compare OLD.json]
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import pickle
+import platform
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from synthetic_calendars import add_spec_arguments, generate_workspace, spec_from_args
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+STAGES = ('parse', 'process', 'aggregate', 'render')
+
+
+def _peak_rss_mb() -> float:
+    # ru_maxrss is in KB on Linux and in bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 1024 / 1024 if sys.platform == 'darwin' else peak / 1024
+
+
+def _load(workspace: str, name: str):
+    with open(os.path.join(workspace, f'{name}.pkl'), 'rb') as f:
+        return pickle.load(f)
+
+
+def _save(workspace: str, name: str, value) -> None:
+    with open(os.path.join(workspace, f'{name}.pkl'), 'wb') as f:
+        pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+
+def run_stage(stage: str, workspace: str, render_mode: str) -> dict:
+    """Run one stage in this process and return its measurements."""
+    from calendarmetrics.config_loader import ConfigLoader
+
+    config = ConfigLoader(os.path.join(workspace, 'config'))
+    if stage == 'parse':
+        from calendarmetrics.ingest import CalendarIngestor
+
+        before = _peak_rss_mb()
+        began = time.perf_counter()
+        result = CalendarIngestor(config).ingest_table(os.path.join(workspace, 'input', 'calendars'))
+        elapsed = time.perf_counter() - began
+        rows = len(result)
+    elif stage == 'process':
+        from calendarmetrics.data_processor import DataProcessor
+
+        table = _load(workspace, 'parse')
+        before = _peak_rss_mb()
+        began = time.perf_counter()
+        result = DataProcessor(table, config)
+        elapsed = time.perf_counter() - began
+        rows = len(result.df)
+    elif stage == 'aggregate':
+        from calendarmetrics.cli import build_figures
+
+        processor = _load(workspace, 'process')
+        before = _peak_rss_mb()
+        began = time.perf_counter()
+        result = build_figures(processor, config)
+        elapsed = time.perf_counter() - began
+        rows = sum(len(spec.data) for spec in result)
+    elif stage == 'render':
+        from calendarmetrics.rendering import FigureRenderer
+
+        figures = _load(workspace, 'aggregate')
+        output_dir = os.path.join(workspace, 'output')
+        shutil.rmtree(output_dir, ignore_errors=True)
+        os.makedirs(output_dir)
+        before = _peak_rss_mb()
+        began = time.perf_counter()
+        FigureRenderer(config, output_dir, mode=render_mode).render(figures)
+        elapsed = time.perf_counter() - began
+        rows = len(figures)
+        result = None
+    else:
+        raise ValueError(f"Unknown stage: {stage}")
+
+    peak = _peak_rss_mb()
+    if result is not None:
+        _save(workspace, stage, result)
+    return {
+        'seconds': round(elapsed, 4),
+        'peak_rss_mb': round(peak, 1),
+        'stage_rss_mb': round(peak - before, 1),
+        'rows': rows
+    }
+
+
+def measure_stage(stage: str, workspace: str, render_mode: str) -> dict:
+    """Run one stage in a fresh interpreter."""
+    output = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), '--run-stage', stage,
+         '--workspace', workspace, '--render-mode', render_mode],
+        cwd=ROOT, check=True, capture_output=True, text=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def environment() -> dict:
+    versions = {}
+    for package in ('pandas', 'numpy', 'plotly', 'icalendar', 'pytz'):
+        try:
+            versions[package] = __import__(package).__version__
+        except ImportError:
+            versions[package] = None
+    try:
+        commit = subprocess.run(['git', 'rev-parse', 'HEAD'], cwd=ROOT, capture_output=True,
+                                text=True).stdout.strip() or None
+    except OSError:
+        commit = None
+    return {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpus': os.cpu_count(),
+        'commit': commit,
+        'packages': versions
+    }
+
+
+def compare(results: dict, previous_path: str) -> None:
+    """Print the time and memory of each stage relative to an earlier run."""
+    with open(previous_path) as f:
+        previous = {run['events']: run for run in json.load(f)['runs']}
+    print(f"\nCompared with {previous_path} (new / old):")
+    for run in results['runs']:
+        old = previous.get(run['events'])
+        if old is None:
+            continue
+        for stage, current in run['stages'].items():
+            before = old['stages'].get(stage)
+            if not before or not before['seconds']:
+                continue
+            line = f"  {run['events']:>9} {stage:10} time {current['seconds'] / before['seconds']:.2f}x"
+            if 'peak_rss_mb' in current and before.get('peak_rss_mb'):
+                line += f", peak memory {current['peak_rss_mb'] / before['peak_rss_mb']:.2f}x"
+            print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--scales', default='10000,100000,1000000',
+                        help='comma-separated event counts, e.g. 10000,100000,1000000,5000000')
+    parser.add_argument('--stages', default=','.join(STAGES))
+    parser.add_argument('--render-mode', default='standalone')
+    parser.add_argument('--workdir', default=None,
+                        help='directory for the generated workspaces (default: a temporary directory)')
+    parser.add_argument('--keep', action='store_true', help='keep the generated workspaces')
+    parser.add_argument('--output', default=None,
+                        help='results file (default: benchmarks/results/pipeline-<timestamp>.json)')
+    parser.add_argument('--compare', default=None, help='earlier results file to compare with')
+    parser.add_argument('--run-stage', choices=STAGES, help=argparse.SUPPRESS)
+    parser.add_argument('--workspace', help=argparse.SUPPRESS)
+    add_spec_arguments(parser)
+    args = parser.parse_args()
+
+    if args.run_stage:
+        with contextlib.redirect_stdout(io.StringIO()):
+            measurements = run_stage(args.run_stage, args.workspace, args.render_mode)
+        print(json.dumps(measurements))
+        return
+
+    scales = [int(scale) for scale in args.scales.split(',') if scale]
+    stages = [stage for stage in args.stages.split(',') if stage]
+    unknown = [stage for stage in stages if stage not in STAGES]
+    if unknown:
+        parser.error(f"unknown stage(s): {', '.join(unknown)}")
+    # Every stage reads the result of the one before it
+    stages = list(STAGES[:max(STAGES.index(stage) for stage in stages) + 1])
+
+    workdir = args.workdir or tempfile.mkdtemp(prefix='calendarmetrics-bench-')
+    started = datetime.now()
+    results = {
+        'started': started.isoformat(timespec='seconds'),
+        'environment': environment(),
+        'spec': spec_from_args(args, 0).to_dict(),
+        'render_mode': args.render_mode,
+        'runs': []
+    }
+    results['spec'].pop('events')
+
+    try:
+        for events in scales:
+            workspace = os.path.join(workdir, f'events-{events}')
+            began = time.perf_counter()
+            generate_workspace(workspace, spec_from_args(args, events))
+            run = {'events': events, 'stages': {'generate': {'seconds': round(time.perf_counter() - began, 4)}}}
+            print(f"{events} events:")
+            for stage in stages:
+                run['stages'][stage] = measure_stage(stage, workspace, args.render_mode)
+                measured = run['stages'][stage]
+                print(f"  {stage:10} {measured['seconds']:9.3f}s  peak {measured['peak_rss_mb']:8.1f} MB  "
+                      f"(+{measured['stage_rss_mb']:.1f} MB)  rows {measured['rows']}")
+            results['runs'].append(run)
+            if not args.keep:
+                shutil.rmtree(workspace, ignore_errors=True)
+    finally:
+        if not args.keep and not args.workdir:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    output = args.output or os.path.join(ROOT, 'benchmarks', 'results',
+                                         f'pipeline-{started:%Y%m%d-%H%M%S}.json')
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump(results, f, indent=2)
+    print(f"\nResults saved to {output}")
+
+    if args.compare:
+        compare(results, args.compare)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,78 @@
+"""Check that CLI startup stays fast and each stage only imports what it needs.
+
+Every check imports modules in a fresh interpreter and fails when a module
+listed as forbidden gets loaded, or when the median import time is over
+budget. Exits with status 1 on any failure, so it can run in CI.
+
+Usage:
+    python benchmarks/check_import_time.py [--runs 5] [--budget-scale 1.0]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+
+# (name, statement, modules that must not be loaded, budget in seconds)
+CHECKS = [
+    ('package', 'import calendarmetrics',
+     ('pandas', 'numpy', 'icalendar', 'plotly'), 0.05),
+    ('cli', 'import calendarmetrics.cli',
+     ('pandas', 'numpy', 'icalendar', 'plotly'), 0.05),
+    ('config', 'from calendarmetrics import ConfigLoader',
+     ('pandas', 'icalendar', 'plotly'), 0.3),
+    ('parse', 'from calendarmetrics import CalendarIngestor, IncrementalIngestor',
+     ('plotly',), 1.0),
+    ('aggregate', 'from calendarmetrics import DataProcessor, OverlapResolver; '
+                  'import calendarmetrics.export',
+     ('plotly',), 1.0),
+    ('render', 'from calendarmetrics import Visualizer; import calendarmetrics.rendering',
+     ('plotly.express',), 1.0),
+]
+
+PROBE = """
+import json, sys, time
+began = time.perf_counter()
+exec({statement!r})
+elapsed = time.perf_counter() - began
+print(json.dumps({{'elapsed': elapsed, 'loaded': sorted(sys.modules)}}))
+"""
+
+
+def probe(statement: str) -> dict:
+    """Run statement in a fresh interpreter and return its import time and modules."""
+    output = subprocess.run(
+        [sys.executable, '-c', PROBE.format(statement=statement)],
+        cwd=ROOT, check=True, capture_output=True, text=True
+    ).stdout
+    return json.loads(output)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--budget-scale', type=float, default=1.0,
+                        help='multiply every budget, e.g. for slow CI machines')
+    args = parser.parse_args()
+
+    failures = 0
+    for name, statement, forbidden, budget in CHECKS:
+        results = [probe(statement) for _ in range(args.runs)]
+        elapsed = statistics.median(result['elapsed'] for result in results)
+        loaded = set(results[0]['loaded'])
+        leaked = [module for module in forbidden if module in loaded]
+        over = elapsed > budget * args.budget_scale
+
+        status = 'FAIL' if leaked or over else 'ok'
+        print(f"{status:4}  {name:10} {elapsed * 1000:7.1f} ms (budget {budget * args.budget_scale * 1000:.0f} ms)"
+              + (f", loads {', '.join(leaked)}" if leaked else ''))
+        failures += bool(leaked or over)
+
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == '__main__':
+    main()
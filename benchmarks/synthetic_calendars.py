@@ -0,0 +1,229 @@
+"""Deterministic synthetic calendar workspaces for benchmarks.
+
+A workspace has the layout main.py expects (config/ and input/calendars/)
+and is fully determined by a SyntheticSpec, so the same spec always
+produces byte-identical files.
+
+Usage:
+    python benchmarks/synthetic_calendars.py OUTPUT_DIR [--events 100000] [--calendars 3] ...
+"""
+import argparse
+import os
+import random
+from datetime import date, datetime, timedelta
+from typing import Dict, List
+
+import yaml
+
+CATEGORIES = ('WORK', 'SLEEP', 'ERRANDS', 'SPORT', 'STUDY', 'SOCIAL', 'HEALTH', 'TRAVEL')
+COLORS = ('#4287f5', '#f54242', '#42f554', '#f5a442', '#a442f5', '#42f5e6', '#f542b3', '#b3f542')
+WORDS = ('team', 'meeting', 'review', 'planning', 'sleep', 'groceries', 'call', 'client',
+         'standup', 'gym', 'lunch', 'dinner', 'doctor', 'report', 'design', 'sync')
+
+
+class SyntheticSpec:
+    """Parameters of a synthetic workspace.
+
+    Args:
+        events: Number of VEVENTs across all calendars (a recurring series
+            counts once, however many occurrences it expands to)
+        calendars: Number of calendars (ICS files)
+        timezones: Zones DTSTART/DTEND are written in, picked uniformly;
+            "UTC" writes "Z" times and "floating" writes times without zone
+        all_day_share: Fraction of all-day events
+        recurrence_share: Fraction of events that are weekly RRULE series
+        recurrence_count: Occurrences per recurring series
+        summary_cardinality: Number of distinct summaries per calendar
+        holidays_per_year: Holiday dates per year in holidays.yaml
+        vacations_per_year: Vacation periods per year in holidays.yaml
+        vacation_days: Length of each vacation period
+        years: Years the events are spread over, starting at start_year
+        start_year: First year of events
+        seed: Random seed
+    """
+
+    def __init__(self, events: int = 100000, calendars: int = 3,
+                 timezones: List[str] = ('UTC', 'Europe/Rome', 'America/New_York'),
+                 all_day_share: float = 0.05, recurrence_share: float = 0.05,
+                 recurrence_count: int = 10, summary_cardinality: int = 200,
+                 holidays_per_year: int = 12, vacations_per_year: int = 2,
+                 vacation_days: int = 10, years: int = 3, start_year: int = 2022,
+                 seed: int = 0):
+        if not 1 <= calendars <= len(CATEGORIES):
+            raise ValueError(f"calendars must be between 1 and {len(CATEGORIES)}")
+        self.events = events
+        self.calendars = calendars
+        self.timezones = list(timezones)
+        self.all_day_share = all_day_share
+        self.recurrence_share = recurrence_share
+        self.recurrence_count = recurrence_count
+        self.summary_cardinality = summary_cardinality
+        self.holidays_per_year = holidays_per_year
+        self.vacations_per_year = vacations_per_year
+        self.vacation_days = vacation_days
+        self.years = years
+        self.start_year = start_year
+        self.seed = seed
+
+    def __repr__(self) -> str:
+        return f'SyntheticSpec(events={self.events}, calendars={self.calendars}, seed={self.seed})'
+
+    def to_dict(self) -> Dict:
+        return dict(vars(self))
+
+
+def generate_workspace(output_dir: str, spec: SyntheticSpec) -> Dict[str, str]:
+    """Write config/ and input/calendars/ for spec into output_dir.
+
+    Returns:
+        Mapping of calendar category to ICS path
+    """
+    rng = random.Random(spec.seed)
+    config_dir = os.path.join(output_dir, 'config')
+    calendars_dir = os.path.join(output_dir, 'input', 'calendars')
+    os.makedirs(config_dir, exist_ok=True)
+    os.makedirs(calendars_dir, exist_ok=True)
+
+    first = date(spec.start_year, 1, 1)
+    last = date(spec.start_year + spec.years, 1, 1) - timedelta(days=1)
+    _write_config(config_dir, spec, rng, first, last)
+
+    paths = {}
+    base, share = divmod(spec.events, spec.calendars)
+    for i in range(spec.calendars):
+        category = CATEGORIES[i]
+        path = os.path.join(calendars_dir, f'{i + 1}{category.capitalize()}.ics')
+        _write_calendar(path, category, base + (i < share), spec, rng, first, last)
+        paths[category] = path
+    return paths
+
+
+def _write_config(config_dir: str, spec: SyntheticSpec, rng: random.Random,
+                  first: date, last: date) -> None:
+    calendars = {
+        category.lower(): {
+            'file': f'{i + 1}{category.capitalize()}.ics',
+            'category': category,
+            'color': COLORS[i],
+            'description': f'Synthetic {category.lower()} calendar'
+        }
+        for i, category in enumerate(CATEGORIES[:spec.calendars])
+    }
+
+    holidays, vacations = {}, {}
+    for year in range(first.year, last.year + 1):
+        days = sorted(rng.sample(range(365), min(spec.holidays_per_year, 365)))
+        holidays[year] = [(date(year, 1, 1) + timedelta(days=day)).isoformat() for day in days]
+        vacations[year] = []
+        for _ in range(spec.vacations_per_year):
+            start = date(year, 1, 1) + timedelta(days=rng.randrange(365 - spec.vacation_days))
+            vacations[year].append({
+                'start': start.isoformat(),
+                'end': (start + timedelta(days=spec.vacation_days - 1)).isoformat(),
+                'description': 'Synthetic vacation'
+            })
+
+    files = {
+        'calendars.yaml': {'calendars': calendars},
+        'holidays.yaml': {'holidays': holidays, 'vacations': vacations},
+        'time_periods.yaml': {
+            'default_periods': {
+                'quarter': {'start_month': 9, 'duration_months': 3},
+                'year': {'start_month': 9, 'end_month': 8}
+            },
+            'active_range': {'start_date': first.isoformat(), 'end_date': last.isoformat()}
+        },
+        'text_replacements.yaml': {'replacements': {'meting': 'meeting', 'planing': 'planning'}},
+        'settings.yaml': {'parsing': {'expand_recurrences': spec.recurrence_share > 0}}
+    }
+    for filename, content in files.items():
+        with open(os.path.join(config_dir, filename), 'w') as f:
+            yaml.safe_dump(content, f, sort_keys=False)
+
+
+def _write_calendar(path: str, category: str, count: int, spec: SyntheticSpec,
+                    rng: random.Random, first: date, last: date) -> None:
+    summaries = [' '.join(rng.sample(WORDS, 3)) + f' {i}' for i in range(max(spec.summary_cardinality, 1))]
+    span_minutes = ((last - first).days + 1) * 24 * 60
+    origin = datetime.combine(first, datetime.min.time())
+
+    with open(path, 'w', newline='') as f:
+        lines = ['BEGIN:VCALENDAR', 'VERSION:2.0', 'PRODID:-//CalendarMetrics//Synthetic//EN',
+                 f'X-WR-CALNAME:{category}']
+        for n in range(count):
+            start = origin + timedelta(minutes=rng.randrange(0, span_minutes, 15))
+            lines.append('BEGIN:VEVENT')
+            lines.append(f'UID:{category.lower()}-{n}@synthetic')
+            lines.append('DTSTAMP:20250101T000000Z')
+            if rng.random() < spec.all_day_share:
+                end = start.date() + timedelta(days=rng.choice((1, 1, 1, 2, 3)))
+                lines.append(f'DTSTART;VALUE=DATE:{start:%Y%m%d}')
+                lines.append(f'DTEND;VALUE=DATE:{end:%Y%m%d}')
+            else:
+                end = start + timedelta(minutes=rng.choice((15, 30, 45, 60, 90, 120, 240, 480)))
+                zone = rng.choice(spec.timezones)
+                lines.append('DTSTART' + _time_value(start, zone))
+                lines.append('DTEND' + _time_value(end, zone))
+            if rng.random() < spec.recurrence_share:
+                lines.append(f'RRULE:FREQ=WEEKLY;COUNT={spec.recurrence_count}')
+            lines.append(f'SUMMARY:{rng.choice(summaries)}')
+            lines.append('END:VEVENT')
+            if len(lines) > 10000:
+                f.write('\r\n'.join(lines) + '\r\n')
+                lines = []
+        lines.append('END:VCALENDAR')
+        f.write('\r\n'.join(lines) + '\r\n')
+
+
+def _time_value(value: datetime, zone: str) -> str:
+    if zone == 'UTC':
+        return f':{value:%Y%m%dT%H%M%S}Z'
+    if zone == 'floating':
+        return f':{value:%Y%m%dT%H%M%S}'
+    return f';TZID={zone}:{value:%Y%m%dT%H%M%S}'
+
+
+def add_spec_arguments(parser: argparse.ArgumentParser) -> None:
+    """Add a command line option for every SyntheticSpec parameter."""
+    defaults = SyntheticSpec()
+    parser.add_argument('--calendars', type=int, default=defaults.calendars)
+    parser.add_argument('--timezones', default=','.join(defaults.timezones),
+                        help='comma-separated zones; "UTC" and "floating" are special')
+    parser.add_argument('--all-day-share', type=float, default=defaults.all_day_share)
+    parser.add_argument('--recurrence-share', type=float, default=defaults.recurrence_share)
+    parser.add_argument('--recurrence-count', type=int, default=defaults.recurrence_count)
+    parser.add_argument('--summary-cardinality', type=int, default=defaults.summary_cardinality)
+    parser.add_argument('--holidays-per-year', type=int, default=defaults.holidays_per_year)
+    parser.add_argument('--vacations-per-year', type=int, default=defaults.vacations_per_year)
+    parser.add_argument('--vacation-days', type=int, default=defaults.vacation_days)
+    parser.add_argument('--years', type=int, default=defaults.years)
+    parser.add_argument('--start-year', type=int, default=defaults.start_year)
+    parser.add_argument('--seed', type=int, default=defaults.seed)
+
+
+def spec_from_args(args: argparse.Namespace, events: int) -> SyntheticSpec:
+    return SyntheticSpec(
+        events=events, calendars=args.calendars,
+        timezones=[zone.strip() for zone in args.timezones.split(',') if zone.strip()],
+        all_day_share=args.all_day_share, recurrence_share=args.recurrence_share,
+        recurrence_count=args.recurrence_count, summary_cardinality=args.summary_cardinality,
+        holidays_per_year=args.holidays_per_year, vacations_per_year=args.vacations_per_year,
+        vacation_days=args.vacation_days, years=args.years, start_year=args.start_year,
+        seed=args.seed
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('output_dir')
+    parser.add_argument('--events', type=int, default=SyntheticSpec().events)
+    add_spec_arguments(parser)
+    args = parser.parse_args()
+
+    spec = spec_from_args(args, args.events)
+    for category, path in generate_workspace(args.output_dir, spec).items():
+        print(f"{category}: {path} ({os.path.getsize(path) / 1024 / 1024:.1f} MB)")
+
+
+if __name__ == '__main__':
+    main()
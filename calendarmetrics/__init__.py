@@ -1,15 +1,37 @@
-"""CalendarMetrics package for analyzing Google Calendar data."""
+"""CalendarMetrics package for analyzing Google Calendar data.
 
-from calendarmetrics.calendar_parser import CalendarParser
-from calendarmetrics.config_loader import ConfigLoader
-from calendarmetrics.data_processor import DataProcessor
-from calendarmetrics.visualizer import Visualizer
+The public classes are imported on first access, so importing the package
+does not load pandas, icalendar or plotly until a class that needs them is
+used.
+"""
 
-__all__ = [
-    'CalendarParser',
-    'ConfigLoader',
-    'DataProcessor',
-    'Visualizer'
-]
+import importlib
 
-__version__ = '0.1.0'
\ No newline at end of file
+# Public name -> module defining it
+_EXPORTS = {
+    'CalendarIngestor': 'calendarmetrics.ingest',
+    'CalendarParser': 'calendarmetrics.calendar_parser',
+    'ConfigLoader': 'calendarmetrics.config_loader',
+    'DataProcessor': 'calendarmetrics.data_processor',
+    'EventStore': 'calendarmetrics.event_store',
+    'EventTable': 'calendarmetrics.event_table',
+    'IncrementalIngestor': 'calendarmetrics.ingest',
+    'OverlapResolver': 'calendarmetrics.overlap',
+    'Visualizer': 'calendarmetrics.visualizer'
+}
+
+__all__ = list(_EXPORTS)
+
+__version__ = '0.1.0'
+
+
+def __getattr__(name):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(_EXPORTS[name]), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(list(globals()) + __all__)
@@ -0,0 +1,3 @@
+from calendarmetrics.cli import main
+
+main()
@@ -0,0 +1,187 @@
+import contextlib
+import io
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from typing import Dict, Iterator, List, Tuple
+
+import pandas as pd
+
+from calendarmetrics.instrumentation import peak_rss_mb
+
+# Layout of each user's workspace, the same as a single-user run
+WORKSPACE_CONFIG_DIR = 'config'
+WORKSPACE_CALENDARS_DIR = os.path.join('input', 'calendars')
+
+
+def find_workspaces(batch_dir: str) -> List[Tuple[str, str]]:
+    """List the user workspaces of a batch directory.
+
+    Every subdirectory with a config/ directory is one user, named after
+    the subdirectory.
+
+    Returns:
+        List of (user, workspace path), largest calendars first so the
+        slowest user never starts last
+    """
+    workspaces = [
+        (entry.name, entry.path) for entry in os.scandir(batch_dir)
+        if entry.is_dir() and os.path.isdir(os.path.join(entry.path, WORKSPACE_CONFIG_DIR))
+    ]
+    return sorted(workspaces, key=lambda workspace: (-_calendars_size(workspace[1]), workspace[0]))
+
+
+def _calendars_size(workspace: str) -> int:
+    try:
+        with os.scandir(os.path.join(workspace, WORKSPACE_CALENDARS_DIR)) as entries:
+            return sum(entry.stat().st_size for entry in entries if entry.is_file())
+    except FileNotFoundError:
+        return 0
+
+
+def aggregate_workspace(user: str, workspace: str, stream: bool = False) -> Dict:
+    """Parse, process and aggregate one user's calendars.
+
+    Runs in a worker process. Only the per-period hours leave it: the
+    events are dropped before returning, so what is sent back is a few
+    rows per period and category whatever the size of the calendars.
+
+    Args:
+        user: User name stored with the result
+        workspace: Directory with config/ and input/calendars/
+        stream: Use the streaming parser
+
+    Returns:
+        Dictionary with the user, event count, wall and CPU seconds, the
+        worker's peak RSS, 'failed_calendars' mapping each calendar that
+        could not be parsed to its error, and 'partials' mapping each granularity of
+        DataProcessor.CUBE_GRANULARITIES to a DataFrame of period,
+        macro_activities and hours
+    """
+    from calendarmetrics.cli import resolve_overlaps
+    from calendarmetrics.config_loader import ConfigLoader
+    from calendarmetrics.data_processor import DataProcessor
+    from calendarmetrics.ingest import CalendarIngestor
+
+    began, began_cpu = time.perf_counter(), time.process_time()
+    # Per-calendar progress of many users would interleave unreadably;
+    # calendars that fail are returned in the result instead
+    with contextlib.redirect_stdout(io.StringIO()):
+        config = ConfigLoader(os.path.join(workspace, WORKSPACE_CONFIG_DIR))
+        ingestor = CalendarIngestor(config, stream=stream)
+        table = ingestor.ingest_table(os.path.join(workspace, WORKSPACE_CALENDARS_DIR))
+        processor = resolve_overlaps(DataProcessor(table, config), config)
+        del table
+        events = len(processor.df)
+        cube = processor.get_aggregation_cube()
+        partials = {granularity: cells['hours'].reset_index() for granularity, cells in cube.items()}
+        del processor, cube
+
+    peak = peak_rss_mb()
+    return {
+        'user': user,
+        'events': events,
+        'wall_seconds': time.perf_counter() - began,
+        'cpu_seconds': time.process_time() - began_cpu,
+        'peak_rss_mb': round(peak, 1) if peak is not None else None,
+        'failed_calendars': ingestor.failed,
+        'partials': partials
+    }
+
+
+class TeamRollup:
+    """Merge per-user partial aggregates into per-user and team tables.
+
+    Hours are additive, so the team hours of a period are the sum of the
+    users' hours; percentages are computed only after merging. Period keys
+    come from each user's own time_periods configuration, so fiscal
+    periods only line up across users who share a fiscal year start.
+    """
+
+    def __init__(self):
+        self.users: List[str] = []
+        self._partials: Dict[str, Dict[str, pd.DataFrame]] = {}
+
+    def __repr__(self) -> str:
+        return f'TeamRollup(users={len(self.users)})'
+
+    def add(self, result: Dict) -> None:
+        """Add the partials of one user, as returned by aggregate_workspace."""
+        self.users.append(result['user'])
+        for granularity, partial in result['partials'].items():
+            self._partials.setdefault(granularity, {})[result['user']] = partial.assign(user=result['user'])
+
+    @property
+    def granularities(self) -> List[str]:
+        return list(self._partials)
+
+    def _frames(self, granularity: str) -> List[pd.DataFrame]:
+        # Users finish in any order; merging in name order keeps the float sums reproducible
+        partials = self._partials.get(granularity, {})
+        return [partials[user] for user in sorted(partials)]
+
+    def per_user(self, granularity: str) -> pd.DataFrame:
+        """Hours and percentages per user, period and macro activity."""
+        frames = self._frames(granularity)
+        if not frames:
+            return pd.DataFrame(columns=['user', 'period', 'macro_activities', 'hours', 'percentage'])
+        df = pd.concat(frames, ignore_index=True)[['user', 'period', 'macro_activities', 'hours']]
+        df = df.sort_values(['user', 'period', 'macro_activities'], ignore_index=True)
+        df['percentage'] = df['hours'] / df.groupby(['user', 'period'])['hours'].transform('sum') * 100
+        return df
+
+    def team(self, granularity: str) -> pd.DataFrame:
+        """Hours and percentages per period and macro activity over all users."""
+        frames = self._frames(granularity)
+        if not frames:
+            return pd.DataFrame(columns=['period', 'macro_activities', 'hours', 'users', 'percentage'])
+        df = (pd.concat(frames, ignore_index=True)
+              .groupby(['period', 'macro_activities'])
+              .agg(hours=('hours', 'sum'), users=('user', 'nunique'))
+              .reset_index())
+        df['percentage'] = df['hours'] / df.groupby('period')['hours'].transform('sum') * 100
+        return df
+
+
+def run_batch(workspaces: List[Tuple[str, str]], workers: int = 1,
+              stream: bool = False) -> Iterator[Dict]:
+    """Aggregate every workspace, yielding each user's result as it finishes.
+
+    At most workers users are in flight at a time and each worker holds
+    one user's events, so memory is bounded by the largest users rather
+    than by the team. A user that fails is yielded with an 'error' key.
+
+    Args:
+        workspaces: (user, workspace path) pairs, e.g. from find_workspaces
+        workers: Number of worker processes (1 runs in-process, 0 uses all cores)
+        stream: Use the streaming parser
+    """
+    workers = workers if workers > 0 else (os.cpu_count() or 1)
+    if workers == 1:
+        for user, workspace in workspaces:
+            try:
+                yield aggregate_workspace(user, workspace, stream)
+            except Exception as e:
+                yield {'user': user, 'error': str(e)}
+        return
+
+    pending = iter(workspaces)
+    with ProcessPoolExecutor(max_workers=min(workers, len(workspaces) or 1)) as executor:
+        running = {}
+
+        def submit_next() -> None:
+            for user, workspace in pending:
+                running[executor.submit(aggregate_workspace, user, workspace, stream)] = user
+                return
+
+        for _ in range(workers):
+            submit_next()
+        while running:
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                user = running.pop(future)
+                submit_next()
+                try:
+                    yield future.result()
+                except Exception as e:
+                    yield {'user': user, 'error': str(e)}
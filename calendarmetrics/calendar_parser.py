@@ -1,19 +1,58 @@
-from typing import Dict, List, Optional, Tuple
+from typing import BinaryIO, Dict, Iterable, Iterator, List, Optional, Set, Tuple
 import icalendar
 from datetime import datetime, timedelta, date
+import numpy as np
+import pandas as pd
 import pytz
+import time
+
+from calendarmetrics.event_table import EventTable
+from calendarmetrics.recurrence import RecurrenceExpander, overridden_instants
+from calendarmetrics.text_replacer import TextReplacer
+from calendarmetrics.timezones import TimezoneNormalizer
 
 class CalendarParser:
     """Parser for Google Calendar ICS files."""
     
-    def __init__(self, config_loader):
+    # Top-level components decoded by the streaming parser
+    STREAMED_COMPONENTS = ('VEVENT', 'VTIMEZONE')
+    
+    # Property names read by _event_identity
+    IDENTITY_PREFIXES = ('BEGIN', 'END', 'UID', 'RECURRENCE-ID', 'SEQUENCE', 'LAST-MODIFIED',
+                         'RRULE', 'RDATE')
+    
+    # Property names read by _outside_time_range, and the slack it allows
+    PRUNE_PREFIXES = ('BEGIN', 'END', 'DTSTART', 'DTEND', 'RRULE', 'RDATE', 'RECURRENCE-ID')
+    PRUNE_MARGIN = timedelta(days=2)
+    
+    def __init__(self, config_loader, filter_holidays: bool = True,
+                 apply_replacements: bool = True):
         """Initialize parser with configuration.
         
         Args:
             config_loader: ConfigLoader instance with replacements and activities mappings
+            filter_holidays: Drop events starting on holidays/vacations while parsing.
+                Disable when the caller excludes them in one batch step instead
+                (see ConfigLoader.holiday_mask).
+            apply_replacements: Apply text replacements to summaries while parsing.
+                Disable when the caller replaces a whole column at once instead
+                (see TextReplacer.replace_many).
         """
         self.config = config_loader
+        self.filter_holidays = filter_holidays
+        self.apply_replacements = apply_replacements
+        self.replacer = TextReplacer(
+            config_loader.get_text_replacements(),
+            match=config_loader.get_text_replacement_mode()
+        )
         self.time_range = self._get_time_range()
+        self.expand_recurrences = bool(
+            config_loader.get_parsing_settings().get('expand_recurrences', False)
+        )
+        self.normalizer = TimezoneNormalizer.from_config(config_loader)
+        self.expander = RecurrenceExpander(*self.time_range, normalizer=self.normalizer)
+        # Seconds spent in each phase of the last parse_table call
+        self.last_timings: Dict[str, float] = {}
         
     def _get_time_range(self) -> Tuple[Optional[datetime], Optional[datetime]]:
         """Get configured time range from config."""
@@ -37,12 +76,11 @@ class CalendarParser:
         return start_date, end_date
         
     def _convert_to_utc(self, dt: datetime) -> datetime:
-        """Convert datetime to UTC and strip timezone information."""
-        if dt.tzinfo is None:
-            # If naive, assume it's UTC
-            return dt
-        # Convert to UTC then remove timezone info
-        return dt.astimezone(pytz.UTC).replace(tzinfo=None)
+        """Convert datetime to UTC and strip timezone information.
+        
+        Naive (floating) times are read in the configured floating timezone.
+        """
+        return self.normalizer.to_utc(dt)
         
     def parse_ics(self, ics_path: str, calendar_category: str) -> List[Dict]:
         """Parse ICS file and extract relevant event information.
@@ -54,59 +92,477 @@ class CalendarParser:
         Returns:
             List of event dictionaries
         """
+        if any(self.time_range) or self.expand_recurrences:
+            # The streaming path prunes out-of-range events before decoding them
+            # and is the one that expands recurring series
+            return list(self.iter_events(ics_path, calendar_category))
+        
         events = []
-        start_date, end_date = self.time_range
 
         with open(ics_path, 'rb') as f:
             cal = icalendar.Calendar.from_ical(f.read())
             
             for event in cal.walk('vevent'):
-                event_start = event.get('dtstart').dt
-                event_end = event.get('dtend').dt
-                
-                # Handle all-day events
-                if isinstance(event_start, date) and not isinstance(event_start, datetime):
-                    event_start = datetime.combine(event_start, datetime.min.time())
-                    event_end = datetime.combine(event_end, datetime.max.time())
-                
-                # Convert to UTC and strip timezone info
-                event_start = self._convert_to_utc(event_start)
-                event_end = self._convert_to_utc(event_end)
-                
-                # Apply time range filtering
-                if start_date and event_end < start_date:
+                record = self._build_event_record(event, calendar_category)
+                if record is not None:
+                    events.append(record)
+                    
+        return events
+    
+    def parse_table(self, ics_path: str, calendar_category: str,
+                    stream: bool = False) -> EventTable:
+        """Parse an ICS file straight into a compact EventTable.
+        
+        Holds the same events as parse_ics, in the same order, without
+        building a dict per event. Timezone conversion, range filtering,
+        holiday filtering and text replacements are each applied once to the
+        whole file: times are converted per TZID in one batch (see
+        TimezoneNormalizer) instead of one astimezone call per value.
+        
+        Args:
+            ics_path: Path to the ICS file
+            calendar_category: Category of the calendar (e.g., "WORK", "PERSONAL")
+            stream: Read the file one event at a time (see iter_events)
+            
+        Returns:
+            EventTable of the file's events
+        """
+        timings = self.last_timings = {}
+        began = time.perf_counter()
+        if stream or any(self.time_range) or self.expand_recurrences:
+            events = (icalendar.Event.from_ical(block) for _, block in self.iter_raw_events(ics_path))
+        else:
+            with open(ics_path, 'rb') as f:
+                events = icalendar.Calendar.from_ical(f.read()).walk('vevent')
+        
+        raw_starts, raw_ends, summaries = [], [], []
+        masters = []
+        for event, overridden in self._iter_series(events):
+            if overridden is not None:
+                masters.append((event, overridden))
+                continue
+            times = self._event_times(event)
+            if times is not None:
+                raw_starts.append(times[0])
+                raw_ends.append(times[1])
+                summaries.append(times[2])
+        timings['decode'], began = time.perf_counter() - began, time.perf_counter()
+        
+        starts = [self.normalizer.to_utc_values(raw_starts)]
+        ends = [self.normalizer.to_utc_values(raw_ends, end=True)]
+        # Occurrences of every series are converted to UTC together, per zone
+        for (master, _), (series_starts, series_ends) in zip(masters, self.expander.expand_many(masters)):
+            starts.append(series_starts)
+            ends.append(series_ends)
+            summaries.extend([str(master.get('summary', ''))] * len(series_starts))
+        starts, ends = np.concatenate(starts), np.concatenate(ends)
+        
+        start_date, end_date = self.time_range
+        keep = np.ones(len(starts), dtype=bool)
+        if start_date:
+            keep &= ~(ends < np.datetime64(start_date))
+        if end_date:
+            keep &= ~(starts > np.datetime64(end_date))
+        codes, uniques = pd.factorize(pd.Series(summaries, dtype=object))
+        table = EventTable.from_arrays(starts, ends, codes.astype(np.int32), list(uniques),
+                                       np.zeros(len(starts), dtype=np.int32), [calendar_category])
+        table = table.take(keep)
+        timings['timezones_and_range'], began = time.perf_counter() - began, time.perf_counter()
+        
+        if self.filter_holidays and len(table):
+            table = table.take(~self.config.holiday_mask(table.start))
+        timings['holidays'], began = time.perf_counter() - began, time.perf_counter()
+        if self.apply_replacements:
+            table = table.replace_summaries(self.replacer)
+        timings['replacements'] = time.perf_counter() - began
+        return table
+    
+    def iter_events(self, ics_path: str, calendar_category: str) -> Iterator[Dict]:
+        """Stream event records from an ICS file one VEVENT at a time.
+        
+        Unlike parse_ics, the file is never loaded as a whole: lines are
+        unfolded as they are read and each VEVENT is decoded on its own, so
+        memory stays bounded by the largest single event. The records are
+        identical to the ones returned by parse_ics, in the same order.
+        
+        Args:
+            ics_path: Path to the ICS file
+            calendar_category: Category of the calendar (e.g., "WORK", "PERSONAL")
+            
+        Yields:
+            Event dictionaries
+        """
+        events = (icalendar.Event.from_ical(block) for _, block in self.iter_raw_events(ics_path))
+        for event_start, event_end, summary in self._iter_event_fields(events):
+            record = self._make_record(event_start, event_end, summary, calendar_category)
+            if record is not None:
+                yield record
+    
+    def _iter_event_fields(self, events: Iterable[icalendar.Event]
+                           ) -> Iterator[Tuple[datetime, datetime, str]]:
+        """Yield (start, end, summary) of each in-range event, in naive UTC."""
+        for event, overridden in self._iter_series(events):
+            if overridden is not None:
+                yield from self._series_fields(event, overridden)
+                continue
+            fields = self._event_fields(event)
+            if fields is not None:
+                yield fields
+    
+    def _iter_series(self, events: Iterable[icalendar.Event]
+                     ) -> Iterator[Tuple[icalendar.Event, Optional[Set[datetime]]]]:
+        """Yield (event, None) for single events and (master, overridden) for series.
+        
+        With recurrence expansion, single events and RECURRENCE-ID overrides
+        are yielded as they are read. Recurring masters are held back until
+        the end, when every override of their UID is known. Without it,
+        every event is yielded as a single event.
+        """
+        masters = []
+        overrides = {}
+        for event in events:
+            if self.expand_recurrences:
+                if RecurrenceExpander.is_recurring(event):
+                    masters.append(event)
                     continue
-                if end_date and event_start > end_date:
+                if 'recurrence-id' in event:
+                    overrides.setdefault(str(event.get('uid', '')), []).append(event)
+            yield event, None
+        
+        for master in masters:
+            yield master, overridden_instants(overrides.get(str(master.get('uid', '')), []),
+                                              self.normalizer)
+    
+    def expand_series(self, master: icalendar.Event, overridden: Set[datetime],
+                      calendar_category: str) -> Iterator[Dict]:
+        """Yield one event record per occurrence of a recurring event.
+        
+        Args:
+            master: VEVENT with RRULE and/or RDATE
+            overridden: Naive UTC instants of instances replaced by overrides
+            calendar_category: Category of the calendar (e.g., "WORK", "PERSONAL")
+            
+        Yields:
+            Event dictionaries, in start order
+        """
+        for event_start, event_end, summary in self._series_fields(master, overridden):
+            record = self._make_record(event_start, event_end, summary, calendar_category)
+            if record is not None:
+                yield record
+    
+    def _series_fields(self, master: icalendar.Event,
+                       overridden: Set[datetime]) -> Iterator[Tuple[datetime, datetime, str]]:
+        """Yield (start, end, summary) of each in-range occurrence of a series."""
+        starts, ends, summary = self._series_times(master, overridden)
+        start_date, end_date = self.time_range
+        for event_start, event_end in zip(starts.astype('datetime64[us]').tolist(),
+                                          ends.astype('datetime64[us]').tolist()):
+            if start_date and event_end < start_date:
+                continue
+            if end_date and event_start > end_date:
+                continue
+            yield event_start, event_end, summary
+    
+    def iter_raw_events(self, ics_path: str) -> Iterator[Tuple[Dict, str]]:
+        """Stream undecoded VEVENT blocks together with their identity.
+        
+        The identity is read straight from the raw content lines, so callers
+        can decide whether an event needs decoding at all (see
+        parse_event_block). VTIMEZONE blocks are decoded as they are seen so
+        that TZID references in later events resolve. Events that certainly
+        fall outside the configured time range are skipped here, before any
+        decoding (see _outside_time_range).
+        
+        Args:
+            ics_path: Path to the ICS file
+            
+        Yields:
+            Tuples of (identity, block) where identity holds the raw uid,
+            recurrence_id, sequence and last_modified values and a recurring flag
+        """
+        with open(ics_path, 'rb') as f:
+            for name, lines in self._iter_component_blocks(f):
+                if name == 'VTIMEZONE':
+                    # Decoding registers the zone so later TZID lookups resolve
+                    icalendar.Timezone.from_ical('\r\n'.join(lines))
                     continue
-                
-                summary = str(event.get('summary', ''))
-                
-                # Skip if event occurs on holiday/vacation
-                if self._is_holiday_or_vacation(event_start.date()):
+                if self._outside_time_range(lines):
                     continue
-                
-                # Apply text replacements
-                summary = self._apply_replacements(summary)
-                
-                # Calculate duration in hours
-                duration = self._calculate_duration(event_start, event_end)
-                
-                events.append({
-                    'start': event_start,
-                    'end': event_end,
-                    'macro_activities': calendar_category,
-                    'micro_activities': summary,
-                    'duration': duration,
-                    'calendar': calendar_category
-                })
-                    
-        return events
+                yield self._event_identity(lines), '\r\n'.join(lines)
+    
+    def parse_event_block(self, block: str, calendar_category: str) -> Optional[Dict]:
+        """Decode a raw VEVENT block into an event record.
+        
+        Args:
+            block: Unfolded VEVENT text from iter_raw_events
+            calendar_category: Category of the calendar (e.g., "WORK", "PERSONAL")
+            
+        Returns:
+            Event dictionary, or None if the event is filtered out
+        """
+        return self._build_event_record(icalendar.Event.from_ical(block), calendar_category)
+    
+    def _event_identity(self, lines: List[str]) -> Dict:
+        """Read UID, RECURRENCE-ID, SEQUENCE, LAST-MODIFIED and RRULE/RDATE presence.
+        
+        Only the event's own properties count, not those of nested
+        components such as VALARM.
+        """
+        identity = {'uid': '', 'recurrence_id': '', 'sequence': 0, 'last_modified': '',
+                    'recurring': False}
+        depth = 0
+        for line in lines:
+            # Cheap prefix check so most lines are never split
+            if not line[:13].upper().startswith(self.IDENTITY_PREFIXES):
+                continue
+            name, params, value = self._split_content_line(line)
+            if name == 'BEGIN':
+                depth += 1
+            elif name == 'END':
+                depth -= 1
+            elif depth == 1:
+                if name == 'UID':
+                    identity['uid'] = value
+                elif name == 'RECURRENCE-ID':
+                    # Keep the parameters: the same instant in another TZID is another instance
+                    identity['recurrence_id'] = f'{params}:{value}'
+                elif name == 'SEQUENCE':
+                    try:
+                        identity['sequence'] = int(value)
+                    except ValueError:
+                        pass
+                elif name == 'LAST-MODIFIED':
+                    identity['last_modified'] = value
+                elif name in ('RRULE', 'RDATE'):
+                    identity['recurring'] = True
+        return identity
+    
+    def _outside_time_range(self, lines: List[str]) -> bool:
+        """Tell from the raw DTSTART/DTEND dates whether an event is out of range.
+        
+        Only the local calendar dates are read, so the check widens the range
+        by PRUNE_MARGIN to cover any UTC offset and the end-of-day extension
+        of all-day events; anything near the boundary is left to the exact
+        check in _build_event_record. Recurring events (RRULE/RDATE) are never
+        pruned since later instances may fall in range, and overrides
+        (RECURRENCE-ID) are kept while the instance they replace is in range.
+        """
+        start_date, end_date = self.time_range
+        if not start_date and not end_date:
+            return False
+        
+        raw = {}
+        depth = 0
+        for line in lines:
+            if not line[:13].upper().startswith(self.PRUNE_PREFIXES):
+                continue
+            name, params, value = self._split_content_line(line)
+            if name == 'BEGIN':
+                depth += 1
+            elif name == 'END':
+                depth -= 1
+            elif depth == 1:
+                raw[name] = value
+        
+        if 'RRULE' in raw or 'RDATE' in raw:
+            return False
+        
+        dtstart = self._raw_date(raw.get('DTSTART'))
+        dtend = self._raw_date(raw.get('DTEND'))
+        if dtstart is None or dtend is None:
+            return False
+        
+        outside = self._raw_dates_outside(dtstart, dtend, start_date, end_date)
+        if outside and 'RECURRENCE-ID' in raw:
+            recurrence_id = self._raw_date(raw['RECURRENCE-ID'])
+            return (recurrence_id is not None and
+                    self._raw_dates_outside(recurrence_id, recurrence_id, start_date, end_date))
+        return outside
+    
+    def _raw_dates_outside(self, first: date, last: date, start_date: Optional[datetime],
+                           end_date: Optional[datetime]) -> bool:
+        if start_date and last + self.PRUNE_MARGIN < start_date.date():
+            return True
+        if end_date and first - self.PRUNE_MARGIN > end_date.date():
+            return True
+        return False
+    
+    @staticmethod
+    def _raw_date(value: Optional[str]) -> Optional[date]:
+        """Read the calendar date from a raw DATE or DATE-TIME value."""
+        if not value or len(value) < 8 or not value[:8].isdigit():
+            return None
+        try:
+            return date(int(value[:4]), int(value[4:6]), int(value[6:8]))
+        except ValueError:
+            return None
+    
+    @staticmethod
+    def _split_content_line(line: str) -> Tuple[str, str, str]:
+        """Split a content line into its upper-cased name, raw parameters and raw value.
+        
+        Colons inside quoted parameter values do not end the parameters.
+        """
+        in_quotes = False
+        name_end = None
+        for i, char in enumerate(line):
+            if char == '"':
+                in_quotes = not in_quotes
+            elif not in_quotes:
+                if char == ';' and name_end is None:
+                    name_end = i
+                elif char == ':':
+                    if name_end is None:
+                        name_end = i
+                    return line[:name_end].upper(), line[name_end + 1:i], line[i + 1:]
+        return line.upper(), '', ''
+    
+    def _iter_component_blocks(self, f: BinaryIO) -> Iterator[Tuple[str, List[str]]]:
+        """Yield raw (name, lines) blocks for each VEVENT and VTIMEZONE in a file.
+        
+        Content lines are unfolded per RFC 5545: a line starting with a space
+        or tab continues the previous one with that single character removed.
+        """
+        block = []
+        name = None
+        depth = 0
+        pending = None
+        
+        for raw in f:
+            line = raw.decode('utf-8-sig', 'replace').rstrip('\n').rstrip('\r')
+            if line[:1] in (' ', '\t') and pending is not None:
+                pending += line[1:]
+                continue
+            if pending is not None:
+                name, depth = self._collect_line(pending, block, name, depth)
+                if name is not None and depth == 0:
+                    yield name, block
+                    block = []
+                    name = None
+            pending = line if line else None
+        
+        if pending is not None:
+            name, depth = self._collect_line(pending, block, name, depth)
+            if name is not None and depth == 0:
+                yield name, block
+    
+    def _collect_line(self, line: str, block: List[str], name: Optional[str],
+                      depth: int) -> Tuple[Optional[str], int]:
+        """Add an unfolded line to the current block, tracking nesting depth."""
+        upper = line.upper()
+        if upper.startswith('BEGIN:'):
+            component = upper[6:].strip()
+            if name is None:
+                if component not in self.STREAMED_COMPONENTS:
+                    return None, 0
+                name = component
+            depth += 1
+        elif upper.startswith('END:') and name is not None:
+            depth -= 1
+        
+        if name is not None:
+            block.append(line)
+        return name, depth
+    
+    def _build_event_record(self, event: icalendar.Event,
+                            calendar_category: str) -> Optional[Dict]:
+        """Convert a decoded VEVENT into an event record.
+        
+        Returns:
+            Event dictionary, or None if the event is filtered out
+        """
+        fields = self._event_fields(event)
+        if fields is None:
+            return None
+        return self._make_record(*fields, calendar_category)
+    
+    def _series_times(self, master: icalendar.Event,
+                      overridden: Set[datetime]) -> Tuple[np.ndarray, np.ndarray, str]:
+        """Expand a series into naive UTC start and end arrays and its summary."""
+        starts, ends = self.expander.expand(master, overridden)
+        return starts, ends, str(master.get('summary', ''))
+    
+    def _event_times(self, event: icalendar.Event) -> Optional[Tuple[object, object, str]]:
+        """Read the raw DTSTART and end values and the summary of a decoded VEVENT.
+        
+        Without DTEND, the end is DTSTART plus DURATION, or as RFC 5545
+        defines it: one day after an all-day DTSTART, or DTSTART itself.
+        
+        Returns:
+            Tuple of (dtstart, dtend, summary) as dates or datetimes, or None
+            for a cancelled override
+        """
+        # A cancelled override only removes an instance from its series
+        if (self.expand_recurrences and 'recurrence-id' in event and
+                str(event.get('status', '')).upper() == 'CANCELLED'):
+            return None
+        
+        event_start = event.get('dtstart').dt
+        if 'dtend' in event:
+            event_end = event['dtend'].dt
+        elif 'duration' in event:
+            event_end = event_start + event['duration'].dt
+        elif self.normalizer.is_all_day(event_start):
+            event_end = event_start + timedelta(days=1)
+        else:
+            event_end = event_start
+        return event_start, event_end, str(event.get('summary', ''))
+    
+    def _event_fields(self, event: icalendar.Event) -> Optional[Tuple[datetime, datetime, str]]:
+        """Read naive UTC start and end and the summary of a decoded VEVENT.
+        
+        Returns:
+            Tuple of (start, end, summary), or None if the event is filtered out
+        """
+        start_date, end_date = self.time_range
+        
+        times = self._event_times(event)
+        if times is None:
+            return None
+        
+        # Convert to UTC and strip timezone info; all-day events span whole days
+        event_start = self.normalizer.to_utc(times[0])
+        event_end = self.normalizer.to_utc(times[1], end=True)
+        
+        # Apply time range filtering
+        if start_date and event_end < start_date:
+            return None
+        if end_date and event_start > end_date:
+            return None
+        
+        return event_start, event_end, times[2]
+    
+    def _make_record(self, event_start: datetime, event_end: datetime, summary: str,
+                     calendar_category: str) -> Optional[Dict]:
+        """Build an event record from naive UTC times, applying holiday filtering
+        and text replacements.
+        
+        Returns:
+            Event dictionary, or None if the event is filtered out
+        """
+        # Skip if event occurs on holiday/vacation
+        if self.filter_holidays and self._is_holiday_or_vacation(event_start.date()):
+            return None
+        
+        # Apply text replacements
+        if self.apply_replacements:
+            summary = self._apply_replacements(summary)
+        
+        # Calculate duration in hours
+        duration = self._calculate_duration(event_start, event_end)
+        
+        return {
+            'start': event_start,
+            'end': event_end,
+            'macro_activities': calendar_category,
+            'micro_activities': summary,
+            'duration': duration,
+            'calendar': calendar_category
+        }
     
     def _apply_replacements(self, text: str) -> str:
         """Apply configured text replacements."""
-        for old, new in self.config.get_text_replacements().items():
-            text = text.replace(old, new)
-        return text
+        return self.replacer.replace(text)
     
     def _calculate_duration(self, start: datetime, end: datetime) -> float:
         """Calculate event duration in hours."""
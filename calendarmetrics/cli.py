@@ -0,0 +1,396 @@
+"""Command line interface of CalendarMetrics.
+
+Subcommands run the pipeline up to a given stage:
+
+    parse      download the calendar feeds, parse the calendars (and update the event store)
+    aggregate  parse, process and export the processed events
+    render     everything above, then write the figures (the default)
+    serve      keep the analysis in memory and serve it over a local HTTP/JSON API
+    batch      aggregate a directory of per-user workspaces into team rollups
+
+Each stage imports only the modules it uses, so parse and aggregate never
+load plotly.
+"""
+import argparse
+import os
+import sys
+from typing import List, Optional
+
+COMMANDS = ('parse', 'aggregate', 'render', 'serve', 'batch')
+
+CONFIG_DIR = 'config'
+CALENDARS_DIR = os.path.join('input', 'calendars')
+OUTPUT_DIR = 'output'
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description='Analyze time usage from Google Calendar exports.')
+    subparsers = parser.add_subparsers(dest='command', metavar='{parse,aggregate,render,serve,batch}')
+
+    parse_options = argparse.ArgumentParser(add_help=False)
+    parse_options.add_argument('--report', default=os.path.join(OUTPUT_DIR, 'run_report.json'),
+                               help='where to write the JSON run report with the time and memory '
+                                    'of each stage ("none" to skip)')
+    parse_options.add_argument('--trace-memory', action='store_true',
+                               help='also record the peak of Python allocations per stage (slower)')
+    parse_options.add_argument('--profile', action='store_true',
+                               help='run under cProfile and write output/profile.pstats and '
+                                    'output/profile.txt (parses in-process)')
+    parse_options.add_argument('--stream', action='store_true',
+                               help='parse ICS files one event at a time to keep memory bounded')
+    parse_options.add_argument('--workers', type=int, default=1,
+                               help='number of processes used to parse calendars and render figures '
+                                    'in parallel (0 = all cores)')
+    parse_options.add_argument('--cache-dir', default=None,
+                               help='directory for caching parsed events between runs')
+    parse_options.add_argument('--cache-max-mb', type=int, default=512,
+                               help='size limit of the parsed-events cache in MB')
+    parse_options.add_argument('--store-dir', default=None,
+                               help='keep a persistent event store here and only re-ingest changed events')
+    parse_options.add_argument('--offline', action='store_true',
+                               help='do not download calendars that have a url; parse the local copies')
+    parse_options.add_argument('--fetch-connections', type=int, default=8,
+                               help='maximum number of calendar feeds downloaded at once')
+
+    aggregate_options = argparse.ArgumentParser(add_help=False)
+    aggregate_options.add_argument('--export', default=None,
+                                   help='comma-separated formats for the processed events '
+                                        '(xlsx, xlsx_stream, parquet, arrow, csv), or "none"; '
+                                        'overrides settings.yaml')
+
+    render_options = argparse.ArgumentParser(add_help=False)
+    render_options.add_argument('--render-mode', default=None,
+                                help='write figures as standalone HTML files ("standalone"), as files '
+                                     'sharing one plotly.min.js ("shared"), or as one tabbed '
+                                     'dashboard ("dashboard"); overrides settings.yaml')
+
+    subparsers.add_parser('parse', parents=[parse_options],
+                          help='parse the calendars and report the events found')
+    subparsers.add_parser('aggregate', parents=[parse_options, aggregate_options],
+                          help='parse and process the events and export them')
+    subparsers.add_parser('render', parents=[parse_options, aggregate_options, render_options],
+                          help='run the whole analysis and write the figures (default)')
+    serve = subparsers.add_parser('serve', help='load the calendars once, reload them when input/calendars or '
+                                                'config/ change, and serve aggregates and figures over HTTP')
+    serve.add_argument('--host', default='127.0.0.1', help='interface to listen on')
+    serve.add_argument('--port', type=int, default=8765, help='port to listen on')
+    serve.add_argument('--store-dir', default=os.path.join(OUTPUT_DIR, 'event_store'),
+                       help='persistent event store used for incremental reloads')
+    serve.add_argument('--poll-seconds', type=float, default=2.0,
+                       help='how often to check the calendars and configuration for changes')
+    batch = subparsers.add_parser('batch', help='parse and aggregate every user workspace in a directory '
+                                                'on worker processes and merge them into team rollups')
+    batch.add_argument('workspaces_dir',
+                       help='directory with one subdirectory per user, each holding config/ and input/calendars/')
+    batch.add_argument('--workers', type=int, default=0,
+                       help='number of users processed in parallel (0 = all cores)')
+    batch.add_argument('--stream', action='store_true',
+                       help='parse ICS files one event at a time to keep memory bounded')
+    batch.add_argument('--export', default='csv',
+                       help='comma-separated formats of the rollup tables (parquet, arrow, csv, xlsx)')
+    batch.add_argument('--output-dir', default=os.path.join(OUTPUT_DIR, 'team'),
+                       help='where to write the rollups and the run report')
+    return parser
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    argv = list(sys.argv[1:] if argv is None else argv)
+    # Without a subcommand, run everything as main.py always did
+    if not argv or (argv[0] not in COMMANDS and argv[0] not in ('-h', '--help')):
+        argv.insert(0, 'render')
+    return build_parser().parse_args(argv)
+
+
+def run_parse(args: argparse.Namespace, config, report):
+    """Download the calendars that have a url, then parse the calendars.
+
+    Returns:
+        A DataProcessor when the event store is used (it keeps the processed
+        events), otherwise the EventTable of all events
+    """
+    if not args.offline and any(calendar_config.get('url')
+                                for calendar_config in config.calendars.get('calendars', {}).values()):
+        from calendarmetrics.fetch import fetch_calendars
+
+        print("Fetching calendar feeds...")
+        with report.stage('fetch') as stage:
+            results = fetch_calendars(config, CALENDARS_DIR, max_connections=args.fetch_connections)
+            stage.details = {'feeds': {name: result['status'] for name, result in results.items()}}
+
+    print("Parsing calendar data...")
+    if args.store_dir:
+        from calendarmetrics.ingest import IncrementalIngestor
+
+        with report.stage('parse') as stage:
+            processor = IncrementalIngestor(config, args.store_dir).ingest(CALENDARS_DIR)
+            stage.events = len(processor.df)
+        print(f"\nTotal events found across all calendars: {len(processor.df)}")
+        return processor
+
+    from calendarmetrics.ingest import CalendarIngestor
+
+    ingestor = CalendarIngestor(config, workers=args.workers, stream=args.stream,
+                                cache_dir=args.cache_dir,
+                                cache_max_bytes=args.cache_max_mb * 1024 * 1024)
+    with report.stage('parse') as stage:
+        all_events = ingestor.ingest_table(CALENDARS_DIR)
+        stage.events = len(all_events)
+    for calendar_name, stats in ingestor.file_stats.items():
+        stats = dict(stats)
+        report.add(f'parse:{calendar_name}', stats.pop('wall_seconds'), stats.pop('cpu_seconds'),
+                   events=stats.pop('events'), **stats)
+    print(f"\nTotal events found across all calendars: {len(all_events)}")
+    return all_events
+
+
+def resolve_overlaps(processor, config):
+    """Return a processor of the non-overlapping segments if overlap.resolve is set.
+
+    Args:
+        processor: DataProcessor of the parsed events
+        config: ConfigLoader instance
+
+    Returns:
+        A new DataProcessor of the segments, or processor itself
+    """
+    from calendarmetrics.data_processor import DataProcessor
+    from calendarmetrics.overlap import OverlapResolver
+
+    overlap = config.get_overlap_settings()
+    if not overlap.get('resolve'):
+        return processor
+    resolver = OverlapResolver(overlap.get('priority') or [])
+    segments = resolver.resolve(processor.df)
+    print(f"Resolved overlaps: {len(processor.df)} events -> {len(segments)} segments")
+    return DataProcessor(segments, config)
+
+
+def run_aggregate(args: argparse.Namespace, config, report):
+    """Parse and process the events and export them.
+
+    Returns:
+        DataProcessor holding the processed events
+    """
+    from calendarmetrics.data_processor import DataProcessor
+    from calendarmetrics.export import check_formats, export_events
+
+    processor = run_parse(args, config, report)
+    if not isinstance(processor, DataProcessor):
+        # Process data
+        print("\nProcessing events...")
+        with report.stage('process', events=len(processor)):
+            processor = DataProcessor(processor, config)
+
+    # Attribute overlapping time to one event so it is counted once
+    if config.get_overlap_settings().get('resolve'):
+        with report.stage('overlap', events=len(processor.df)):
+            processor = resolve_overlaps(processor, config)
+
+    # Save raw data
+    export_settings = config.get_export_settings()
+    if args.export is not None:
+        formats = [name.strip() for name in args.export.split(',') if name.strip() not in ('', 'none')]
+    else:
+        formats = export_settings.get('formats', ['xlsx'])
+    check_formats(formats)
+    for name in formats:
+        with report.stage(f'export:{name}', events=len(processor.df)):
+            paths = export_events(processor.df, [name], OUTPUT_DIR, options=export_settings)
+        for path in paths:
+            print(f"Saved raw data to {path}")
+    print(f"Data shape: {processor.df.shape}")
+    print("\nUnique macro activities found:", processor.df['macro_activities'].unique())
+    return processor
+
+
+def build_figures(processor, config) -> List:
+    """Build the FigureSpec of every output figure from processed events.
+
+    Args:
+        processor: DataProcessor holding the processed events
+        config: ConfigLoader instance
+
+    Returns:
+        List of FigureSpec, in output order
+    """
+    from calendarmetrics.rendering import FigureSpec
+    from calendarmetrics.visualizer import Visualizer
+
+    # Get weekly hours
+    weekly_hours = processor.get_weekly_hours()
+
+    # Get all available periods
+    periods = processor.get_unique_periods()
+
+    viz = Visualizer(config)
+    figures = []
+
+    # Weekly hours plot
+    figures.append(FigureSpec('weekly_hours', 'plot_weekly_hours', weekly_hours))
+
+    # Daily hours plot
+    figures.append(FigureSpec('daily_hours', 'plot_daily_hours',
+                              viz.daily_hours_input(processor.df)))
+
+    # Calendar quarter percentages
+    for quarter in periods['calendar_quarters']:
+        quarter_data = processor.get_calendar_quarter_percentages(quarter)
+        figures.append(FigureSpec(f'percentages_{quarter.replace(" ", "_")}', 'plot_activities_percentages',
+                                  quarter_data, f"Activities Distribution - {quarter}"))
+
+    # Fiscal year percentages
+    for year in periods['fiscal_years']:
+        year_data = processor.get_fiscal_year_percentages(year)
+        figures.append(FigureSpec(f'percentages_FY_{year-1}_{year}', 'plot_activities_percentages',
+                                  year_data, f"Activities Distribution - FY{year-1}-{year}"))
+    return figures
+
+
+def run_render(args: argparse.Namespace, config, report) -> None:
+    """Run the whole analysis and write the figures."""
+    from calendarmetrics.rendering import FigureRenderer
+    from calendarmetrics.visualizer import Visualizer
+
+    # Check the mode before the slow stages run
+    render_mode = args.render_mode or config.get_render_settings().get('mode', 'standalone')
+    if render_mode not in Visualizer.RENDER_MODES:
+        raise ValueError(f"Invalid render mode: {render_mode}")
+
+    processor = run_aggregate(args, config, report)
+
+    # Create visualizations
+    print("\nCreating visualizations...")
+    with report.stage('aggregate', events=len(processor.df)):
+        figures = build_figures(processor, config)
+
+    # Only figures whose input changed since the last run are written again
+    renderer = FigureRenderer(config, OUTPUT_DIR, mode=render_mode, workers=args.workers)
+    with report.stage('render') as stage:
+        written = renderer.render(figures)
+        stage.details = {'figures': len(figures), 'files_written': len(written)}
+    print(f"Rendered {len(written)} HTML file(s); {len(figures)} figures in total")
+
+
+def run_serve(args: argparse.Namespace) -> None:
+    """Load the analysis once and serve it until interrupted."""
+    from calendarmetrics.daemon import AnalysisDaemon, serve
+
+    os.makedirs(OUTPUT_DIR, exist_ok=True)
+    daemon = AnalysisDaemon(CONFIG_DIR, CALENDARS_DIR, args.store_dir, poll_seconds=args.poll_seconds)
+    serve(daemon, args.host, args.port)
+
+
+def run_team_batch(args: argparse.Namespace, report) -> None:
+    """Aggregate every user workspace and write per-user and team rollups."""
+    from calendarmetrics.batch import TeamRollup, find_workspaces, run_batch
+    from calendarmetrics.export import check_formats, export_events
+
+    formats = [name.strip() for name in args.export.split(',') if name.strip() and name.strip() != 'none']
+    check_formats(formats)
+
+    workspaces = find_workspaces(args.workspaces_dir)
+    if not workspaces:
+        raise ValueError(f"No user workspaces (subdirectories with config/) in {args.workspaces_dir}")
+    print(f"Aggregating {len(workspaces)} user(s)...")
+
+    rollup = TeamRollup()
+    failed = []
+    # User -> calendars that could not be parsed; the rollups lack their hours
+    failed_calendars = {}
+    with report.stage('batch') as stage:
+        for result in run_batch(workspaces, args.workers, args.stream):
+            if 'error' in result:
+                failed.append(result['user'])
+                print(f"Error processing {result['user']}: {result['error']}")
+                continue
+            rollup.add(result)
+            report.add(f"user:{result['user']}", result['wall_seconds'], result['cpu_seconds'],
+                       events=result['events'], peak_rss_mb=result['peak_rss_mb'],
+                       failed_calendars=result['failed_calendars'])
+            print(f"{result['user']}: {result['events']} events in {result['wall_seconds']:.2f}s")
+            for calendar_name, error in result['failed_calendars'].items():
+                print(f"Error processing {result['user']}'s {calendar_name} calendar: {error}")
+            if result['failed_calendars']:
+                failed_calendars[result['user']] = sorted(result['failed_calendars'])
+        stage.events = sum(record.events or 0 for record in report.stages if record.name.startswith('user:'))
+        stage.details = {'users': len(rollup.users), 'failed': failed, 'failed_calendars': failed_calendars}
+
+    with report.stage('merge'):
+        paths = []
+        for granularity in rollup.granularities:
+            paths += export_events(rollup.team(granularity), formats, args.output_dir,
+                                   basename=f'team_{granularity}')
+            paths += export_events(rollup.per_user(granularity), formats, args.output_dir,
+                                   basename=f'users_{granularity}')
+    for path in paths:
+        print(f"Saved {path}")
+    if failed or failed_calendars:
+        print("\nWarning: the rollups are missing " + '; '.join(
+            [f"{user} (failed)" for user in failed]
+            + [f"{user} ({', '.join(calendars)})" for user, calendars in sorted(failed_calendars.items())]
+        ))
+
+
+RUNNERS = {
+    'parse': run_parse,
+    'aggregate': run_aggregate,
+    'render': run_render
+}
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    args = parse_args(argv)
+    if args.command == 'serve':
+        run_serve(args)
+        return
+    if args.command == 'batch':
+        from calendarmetrics.instrumentation import RunReport
+
+        os.makedirs(args.output_dir, exist_ok=True)
+        report = RunReport(' '.join(['calendarmetrics'] + list(sys.argv[1:] if argv is None else argv)))
+        run_team_batch(args, report)
+        print("\n" + report.summary())
+        report.write(os.path.join(args.output_dir, 'run_report.json'))
+        print(f"\nBatch complete. Results saved in {args.output_dir}")
+        return
+
+    from calendarmetrics.instrumentation import RunReport
+
+    report = RunReport(' '.join(['calendarmetrics'] + list(sys.argv[1:] if argv is None else argv)),
+                       trace_memory=args.trace_memory)
+    profiler = None
+    if args.profile:
+        import cProfile
+
+        # Worker processes are not profiled
+        args.workers = 1
+        profiler = cProfile.Profile()
+        profiler.enable()
+
+    # Create output directory if it doesn't exist
+    os.makedirs(OUTPUT_DIR, exist_ok=True)
+
+    from calendarmetrics.config_loader import ConfigLoader
+
+    # Initialize components
+    with report.stage('config'):
+        config = ConfigLoader(CONFIG_DIR)
+
+    RUNNERS[args.command](args, config, report)
+
+    if profiler is not None:
+        from calendarmetrics.instrumentation import write_profile
+
+        profiler.disable()
+        for path in write_profile(profiler, OUTPUT_DIR):
+            print(f"Saved profile to {path}")
+
+    print("\n" + report.summary())
+    if args.report and args.report != 'none':
+        report.write(args.report)
+        print(f"Saved run report to {args.report}")
+
+    if args.command == 'render':
+        print("\nAnalysis complete! Results saved in the 'output' directory.")
+    else:
+        print(f"\n{args.command.capitalize()} complete.")
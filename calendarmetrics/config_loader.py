@@ -1,7 +1,9 @@
 import yaml
-from typing import Dict, List, Optional
+import bisect
+from typing import Dict, List, Optional, Tuple
 from datetime import datetime, date
 from pathlib import Path
+import numpy as np
 
 class ConfigLoader:
     """Configuration loader for CalendarMetrics."""
@@ -15,6 +17,7 @@ class ConfigLoader:
         self.config_dir = Path(config_dir)
         self._load_configs()
         self._validate_dates()
+        self._compile_exclusions()
     
     def __repr__(self) -> str:
         return f'ConfigLoader({self.config_dir})'
@@ -36,6 +39,13 @@ class ConfigLoader:
             except FileNotFoundError:
                 print(f"Warning: {filename} not found in {self.config_dir}")
                 setattr(self, attr, {})
+        
+        # Optional settings; defaults apply when the file is missing
+        try:
+            with open(self.config_dir / 'settings.yaml') as f:
+                self.settings = yaml.safe_load(f) or {}
+        except FileNotFoundError:
+            self.settings = {}
     
     def _validate_dates(self) -> None:
         """Validate date formats in holidays and vacations."""
@@ -71,6 +81,56 @@ class ConfigLoader:
         """Get text replacement mappings."""
         return self.replacements.get('replacements', {})
     
+    def get_text_replacement_mode(self) -> str:
+        """Get how replacement rules match: "substring" (default) or "word"."""
+        return self.replacements.get('match', 'substring')
+    
+    def _compile_exclusions(self) -> None:
+        """Compile holidays and vacations into sorted, merged date intervals.
+        
+        A date listed under a year only excludes dates of that same year, so
+        each interval is clipped to its year before merging.
+        """
+        intervals = []
+        if self.holidays:
+            for year, dates in self.holidays.get('holidays', {}).items():
+                for date_str in dates:
+                    day = datetime.strptime(date_str, '%Y-%m-%d').date()
+                    intervals.extend(self._clip_to_year(day, day, year))
+            
+            for year, periods in self.holidays.get('vacations', {}).items():
+                for period in periods:
+                    start = datetime.strptime(period['start'], '%Y-%m-%d').date()
+                    end = datetime.strptime(period['end'], '%Y-%m-%d').date()
+                    intervals.extend(self._clip_to_year(start, end, year))
+        
+        merged = []
+        for start, end in sorted(intervals):
+            if merged and start <= merged[-1][1] + 1:
+                merged[-1][1] = max(merged[-1][1], end)
+            else:
+                merged.append([start, end])
+        
+        # Proleptic Gregorian ordinals for bisect, datetime64[D] for masks
+        self._exclusion_starts = [start for start, _ in merged]
+        self._exclusion_ends = [end for _, end in merged]
+        epoch = date(1970, 1, 1).toordinal()
+        self._exclusion_starts_d = np.array(self._exclusion_starts, dtype=np.int64) - epoch
+        self._exclusion_ends_d = np.array(self._exclusion_ends, dtype=np.int64) - epoch
+    
+    @staticmethod
+    def _clip_to_year(start: date, end: date, year) -> List[Tuple[int, int]]:
+        """Return the (start, end) ordinal interval clipped to the given year, if any."""
+        try:
+            year = int(year)
+        except (TypeError, ValueError):
+            return []
+        start = max(start, date(year, 1, 1))
+        end = min(end, date(year, 12, 31))
+        if start > end:
+            return []
+        return [(start.toordinal(), end.toordinal())]
+    
     def is_holiday_or_vacation(self, date_to_check: date) -> bool:
         """Check if date is a holiday or vacation day.
         
@@ -80,26 +140,44 @@ class ConfigLoader:
         Returns:
             bool: True if date is a holiday or vacation day
         """
-        if not self.holidays:
-            return False
+        ordinal = date_to_check.toordinal()
+        i = bisect.bisect_right(self._exclusion_starts, ordinal) - 1
+        return i >= 0 and ordinal <= self._exclusion_ends[i]
+    
+    def holiday_mask(self, dates) -> np.ndarray:
+        """Vectorized is_holiday_or_vacation over a whole column of dates.
+        
+        Args:
+            dates: Array-like of dates or datetimes (times are ignored)
             
-        year = str(date_to_check.year)
-        date_str = date_to_check.strftime('%Y-%m-%d')
-        
-        # Check holidays
-        holidays = self.holidays.get('holidays', {}).get(int(year), [])
-        if date_str in holidays:
-            return True
-        
-        # Check vacations
-        vacations = self.holidays.get('vacations', {}).get(int(year), [])
-        for vacation in vacations:
-            start = datetime.strptime(vacation['start'], '%Y-%m-%d').date()
-            end = datetime.strptime(vacation['end'], '%Y-%m-%d').date()
-            if start <= date_to_check <= end:
-                return True
-        
-        return False
+        Returns:
+            Boolean array, True where the date is a holiday or vacation day
+        """
+        days = np.asarray(dates, dtype='datetime64[D]').astype(np.int64)
+        if not len(self._exclusion_starts_d):
+            return np.zeros(len(days), dtype=bool)
+        i = np.searchsorted(self._exclusion_starts_d, days, side='right') - 1
+        return (i >= 0) & (days <= self._exclusion_ends_d[np.maximum(i, 0)])
+    
+    def get_parsing_settings(self) -> Dict:
+        """Get parser settings (e.g. expand_recurrences) from settings.yaml."""
+        return self.settings.get('parsing') or {}
+    
+    def get_overlap_settings(self) -> Dict:
+        """Get overlap resolution settings (resolve, priority) from settings.yaml."""
+        return self.settings.get('overlap') or {}
+    
+    def get_segment_settings(self) -> Dict:
+        """Get event splitting settings (split_at) from settings.yaml."""
+        return self.settings.get('segments') or {}
+    
+    def get_export_settings(self) -> Dict:
+        """Get processed-events export settings (formats, per-format options) from settings.yaml."""
+        return self.settings.get('export') or {}
+    
+    def get_render_settings(self) -> Dict:
+        """Get figure rendering settings (mode) from settings.yaml."""
+        return self.settings.get('render') or {}
     
     def get_active_range(self) -> Dict[str, str]:
         """Get the active time range for analysis.
@@ -0,0 +1,316 @@
+import copy
+import json
+import os
+import threading
+import time
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, Optional, Tuple
+from urllib.parse import parse_qs, unquote, urlparse
+
+from calendarmetrics.cli import build_figures, resolve_overlaps
+from calendarmetrics.config_loader import ConfigLoader
+from calendarmetrics.ingest import IncrementalIngestor
+
+# Period keys of the granularities that are numbers rather than labels
+NUMERIC_PERIODS = ('week', 'month', 'fiscal_quarter', 'fiscal_year')
+
+
+class DirectoryWatcher:
+    """Detect changed, added and removed files by polling their size and mtime.
+
+    Polling keeps the watcher dependency-free and works the same on every
+    platform; a few stat calls per interval are negligible next to a reload.
+    """
+
+    def __init__(self, *directories: str):
+        self.directories = directories
+        self._snapshot = self.snapshot()
+
+    def __repr__(self) -> str:
+        return f'DirectoryWatcher({", ".join(self.directories)})'
+
+    def snapshot(self) -> Dict[str, Tuple[int, int]]:
+        files = {}
+        for directory in self.directories:
+            try:
+                entries = os.scandir(directory)
+            except FileNotFoundError:
+                continue
+            with entries:
+                for entry in entries:
+                    if entry.is_file():
+                        stat = entry.stat()
+                        files[entry.path] = (stat.st_mtime_ns, stat.st_size)
+        return files
+
+    def changes(self) -> Tuple[str, ...]:
+        """Paths changed since the previous call."""
+        current = self.snapshot()
+        changed = tuple(sorted(
+            path for path in set(current) | set(self._snapshot)
+            if current.get(path) != self._snapshot.get(path)
+        ))
+        self._snapshot = current
+        return changed
+
+
+class _Generation:
+    """One loaded state of the data with its response cache.
+
+    A reload builds a new generation and swaps it in, so requests answered
+    from the previous one never see a half-applied change.
+    """
+
+    def __init__(self, number: int, config, view, changes: Dict, loaded_at: datetime,
+                 reload_seconds: float):
+        self.number = number
+        self.config = config
+        self.view = view
+        self.changes = changes
+        self.loaded_at = loaded_at
+        self.reload_seconds = reload_seconds
+        self.responses: Dict[str, Tuple[str, bytes]] = {}
+        self.figures = None
+        self.figures_lock = threading.Lock()
+
+    def __repr__(self) -> str:
+        return f'_Generation({self.number}, events={len(self.view.df)})'
+
+
+class AnalysisDaemon:
+    """Keep the processed calendars in memory and serve them over HTTP/JSON.
+
+    Calendars are ingested once through the event store. A watcher thread
+    polls input/calendars and config/: a changed export is re-ingested
+    incrementally (only its changed events are decoded), a changed config
+    file reloads everything. Responses are cached per request until the
+    next reload, so repeated queries are answered from memory.
+
+    Endpoints (GET, all JSON except the figures):
+
+        /api/status                          events, last reload, changes
+        /api/periods                         calendar quarters and fiscal years
+        /api/weekly                          hours per ISO week and activity
+        /api/daily?start=&end=               hours per day and activity
+        /api/period/<granularity>/<period>   hours and percentages of one period
+        /api/range?start=&end=               hours and percentages of a date range
+        /api/rolling?window=28&start=&end=&average=1
+        /figures/                            list of figures
+        /figures/<name>.html                 one rendered figure
+    """
+
+    def __init__(self, config_dir: str, calendars_dir: str, store_dir: str,
+                 poll_seconds: float = 2.0):
+        """Initialize daemon.
+
+        Args:
+            config_dir: Directory of the configuration files
+            calendars_dir: Directory of the ICS files
+            store_dir: Directory of the persistent event store
+            poll_seconds: Interval between checks for changed files
+        """
+        self.config_dir = config_dir
+        self.calendars_dir = calendars_dir
+        self.store_dir = store_dir
+        self.poll_seconds = poll_seconds
+        self.config = None
+        self.ingestor = None
+        # Held only to swap generations; responses are built outside it
+        self._lock = threading.Lock()
+        # Reloads run one at a time while requests keep using the current generation
+        self._reload_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._processor = None
+        self._current: Optional[_Generation] = None
+        self.reload(config_changed=True)
+        self._watcher = DirectoryWatcher(calendars_dir, config_dir)
+
+    def __repr__(self) -> str:
+        return f'AnalysisDaemon({self.calendars_dir}, generation={self.generation})'
+
+    @property
+    def generation(self) -> int:
+        current = self._current
+        return current.number if current is not None else 0
+
+    def reload(self, config_changed: bool = False) -> None:
+        """Bring the in-memory data up to date with the files on disk.
+
+        Args:
+            config_changed: Reload the configuration and rebuild from the store
+        """
+        began = time.perf_counter()
+        with self._reload_lock:
+            if config_changed:
+                config = ConfigLoader(self.config_dir)
+                ingestor = IncrementalIngestor(config, self.store_dir)
+                processor = None
+            else:
+                config, ingestor = self.config, self.ingestor
+                # apply_changes replaces the processor's frames instead of editing
+                # them, so a shallow copy leaves the served processor untouched
+                processor = copy.copy(self._processor)
+            processor = ingestor.ingest(self.calendars_dir, processor)
+            view = resolve_overlaps(processor, config)
+            current = _Generation(self.generation + 1, config, view, dict(ingestor.last_changes),
+                                  datetime.now(), time.perf_counter() - began)
+            with self._lock:
+                self.config, self.ingestor, self._processor = config, ingestor, processor
+                self._current = current
+        print(f"Loaded {len(view.df)} events in {current.reload_seconds:.2f}s "
+              f"(generation {current.number})")
+
+    def watch(self) -> None:
+        """Poll for changed files and reload until stop is called."""
+        while not self._stop.wait(self.poll_seconds):
+            changed = self._watcher.changes()
+            if not changed:
+                continue
+            config_dir = os.path.abspath(self.config_dir)
+            config_changed = any(os.path.abspath(path).startswith(config_dir + os.sep) for path in changed)
+            print(f"Changed: {', '.join(changed)}")
+            try:
+                self.reload(config_changed=config_changed)
+            except Exception as e:
+                # Keep serving the last good data
+                print(f"Reload failed: {str(e)}")
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def respond(self, path: str) -> Tuple[int, str, bytes]:
+        """Answer one GET request.
+
+        Returns:
+            Tuple of (HTTP status, content type, body)
+        """
+        with self._lock:
+            current = self._current
+        cached = current.responses.get(path)
+        if cached is not None:
+            return (200,) + cached
+        try:
+            content_type, body = self._route(current, path)
+        except KeyError as e:
+            return 404, 'application/json', self._json({'error': f'not found: {e.args[0]}'})
+        except (TypeError, ValueError) as e:
+            return 400, 'application/json', self._json({'error': str(e)})
+        except Exception as e:
+            print(f"Error answering {path}: {type(e).__name__}: {e}")
+            return 500, 'application/json', self._json({'error': f'{type(e).__name__}: {e}'})
+        current.responses[path] = (content_type, body)
+        return 200, content_type, body
+
+    def _route(self, current: _Generation, path: str) -> Tuple[str, bytes]:
+        url = urlparse(path)
+        query = {name: values[-1] for name, values in parse_qs(url.query).items()}
+        parts = [unquote(part) for part in url.path.strip('/').split('/') if part]
+
+        if parts[:1] == ['figures']:
+            return self._figure_response(current, parts[1:])
+        if parts[:1] != ['api'] or len(parts) < 2:
+            raise KeyError(url.path)
+
+        view = current.view
+        endpoint = parts[1]
+        if endpoint == 'status':
+            payload = {
+                'generation': current.number,
+                'loaded_at': current.loaded_at.isoformat(timespec='seconds'),
+                'reload_seconds': round(current.reload_seconds, 3),
+                'events': len(view.df),
+                'changes': current.changes
+            }
+        elif endpoint == 'periods':
+            periods = view.get_unique_periods()
+            payload = {name: [str(period) if name == 'calendar_quarters' else int(period) for period in values]
+                       for name, values in periods.items()}
+        elif endpoint == 'weekly':
+            return self._frame(view.get_weekly_hours())
+        elif endpoint == 'daily':
+            daily = view.get_range_index().daily(query.get('start'), query.get('end'))
+            return self._frame(daily.reset_index())
+        elif endpoint == 'period' and len(parts) == 4:
+            granularity, period = parts[2], parts[3]
+            if granularity in NUMERIC_PERIODS:
+                period = int(period)
+            return self._frame(view.get_period_percentages(granularity, period))
+        elif endpoint == 'range':
+            return self._frame(view.get_range_percentages(query.get('start'), query.get('end')))
+        elif endpoint == 'rolling':
+            rolling = view.get_rolling_hours(int(query.get('window', 28)), query.get('start'),
+                                             query.get('end'),
+                                             average=query.get('average', '0') not in ('0', 'false', ''))
+            return self._frame(rolling.reset_index())
+        else:
+            raise KeyError(url.path)
+        return 'application/json', self._json(payload)
+
+    def _figure_response(self, current: _Generation, parts) -> Tuple[str, bytes]:
+        from calendarmetrics.visualizer import Visualizer
+
+        with current.figures_lock:
+            if current.figures is None:
+                current.figures = {spec.name: spec for spec in build_figures(current.view, current.config)}
+        if not parts:
+            return 'application/json', self._json({'figures': [f'{name}.html' for name in current.figures]})
+        if parts == ['plotly.min.js']:
+            from plotly.offline import get_plotlyjs
+
+            return 'application/javascript', get_plotlyjs().encode('utf-8')
+        name = parts[0][:-len('.html')] if parts[0].endswith('.html') else parts[0]
+        spec = current.figures[name]
+        fig = spec.build(Visualizer(current.config))
+        # plotly.js is served once from /figures/plotly.min.js
+        page = fig.to_html(include_plotlyjs='directory', post_script=Visualizer.post_script(fig))
+        return 'text/html; charset=utf-8', page.encode('utf-8')
+
+    @staticmethod
+    def _frame(df) -> Tuple[str, bytes]:
+        return 'application/json', df.to_json(orient='records', date_format='iso').encode('utf-8')
+
+    @staticmethod
+    def _json(payload) -> bytes:
+        return json.dumps(payload, default=str).encode('utf-8')
+
+
+def _make_handler(daemon: AnalysisDaemon) -> Callable:
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            status, content_type, body = daemon.respond(self.path)
+            self.send_response(status)
+            self.send_header('Content-Type', content_type)
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    return Handler
+
+
+def serve(daemon: AnalysisDaemon, host: str = '127.0.0.1', port: int = 8765,
+          ready: Optional[threading.Event] = None) -> None:
+    """Serve the daemon's API and watch for changes until interrupted.
+
+    Args:
+        daemon: Loaded AnalysisDaemon
+        host: Interface to listen on (local only by default)
+        port: TCP port
+        ready: Optional event set once the server is listening
+    """
+    server = ThreadingHTTPServer((host, port), _make_handler(daemon))
+    watcher = threading.Thread(target=daemon.watch, name='calendarmetrics-watch', daemon=True)
+    watcher.start()
+    print(f"Serving on http://{host}:{server.server_address[1]}/ (Ctrl+C to stop)")
+    if ready is not None:
+        ready.set()
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        daemon.stop()
+        server.server_close()
@@ -1,53 +1,304 @@
-from typing import List, Dict
+from typing import Dict, Iterable, List, Optional, Union
 import pandas as pd
 
+from calendarmetrics.event_table import EventTable
+from calendarmetrics.range_index import DailyActivityIndex
+from calendarmetrics.splitting import PeriodSplitter
+
 class DataProcessor:
     """Process calendar events data into analyzable formats."""
     
-    def __init__(self, events: List[Dict], config_loader):
+    # Period granularities of the aggregation cube
+    CUBE_GRANULARITIES = ('week', 'month', 'calendar_quarter', 'fiscal_quarter', 'fiscal_year')
+    
+    def __init__(self, events: Union[List[Dict], pd.DataFrame, EventTable], config_loader):
         """Initialize processor with events data.
         
         Args:
-            events: List of event dictionaries from CalendarParser
+            events: List of event dictionaries from CalendarParser, an events
+                DataFrame from CalendarIngestor, or an EventTable
             config_loader: ConfigLoader instance with time period configurations
         """
         self.events = events
         self.config = config_loader
+        self.splitter = self._make_splitter(config_loader)
         self.df = self._create_dataframe()
+        self._reset_cube()
+    
+    @classmethod
+    def from_processed(cls, df: pd.DataFrame, config_loader) -> 'DataProcessor':
+        """Create a processor from a DataFrame that already has period columns.
+        
+        Args:
+            df: DataFrame previously produced by a DataProcessor
+            config_loader: ConfigLoader instance with time period configurations
+        """
+        processor = cls.__new__(cls)
+        processor.events = df
+        processor.config = config_loader
+        processor.splitter = cls._make_splitter(config_loader)
+        processor.df = df
+        processor._reset_cube()
+        return processor
+    
+    @staticmethod
+    def _make_splitter(config_loader) -> Optional[PeriodSplitter]:
+        """Build the boundary splitter configured in settings.yaml, if any."""
+        unit = config_loader.get_segment_settings().get('split_at')
+        if not unit:
+            return None
+        fiscal_start_month = config_loader.time_periods['default_periods']['year']['start_month']
+        return PeriodSplitter(unit, fiscal_start_month)
+    
+    def _split(self, df: pd.DataFrame) -> pd.DataFrame:
+        return self.splitter.split(df) if self.splitter is not None else df
     
     def _create_dataframe(self) -> pd.DataFrame:
-        """Convert events to pandas DataFrame with calendar and custom quarters."""
-        df = pd.DataFrame(self.events)
+        """Convert events to pandas DataFrame with calendar and custom quarters.
+        
+        Events crossing a configured boundary are split into pieces first,
+        so each row lies within a single day (or week, month, fiscal year).
+        """
+        if isinstance(self.events, EventTable):
+            df = self.events.to_frame()
+        else:
+            df = pd.DataFrame(self.events)
+        return self._add_period_columns(self._split(df))
+    
+    def _add_period_columns(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Derive date, week, month, quarter and fiscal year columns from start.
+        
+        Every column is computed with whole-column arithmetic. Besides the
+        readable columns, integer period keys are emitted for grouping:
+        iso_week_key (ISO year * 100 + week), calendar_quarter_key and
+        fiscal_quarter_key (year * 10 + quarter).
+        """
+        start = df['start'].dt
+        iso = start.isocalendar()
         
         # Basic time columns
-        df['date'] = df['start'].dt.date  # Add date column for daily view
-        df['week'] = df['start'].dt.isocalendar().week
-        df['year'] = df['start'].dt.year
-        df['month'] = df['start'].dt.month
+        df['date'] = start.date  # Add date column for daily view
+        df['week'] = iso['week']
+        # ISO weeks near New Year belong to the neighbouring year
+        df['iso_year'] = iso['year']
+        df['year'] = start.year
+        df['month'] = start.month
+        df['iso_week_key'] = (df['iso_year'].astype('int64') * 100 + df['week'].astype('int64'))
         
         # Calendar quarter (Q1: Jan-Mar, Q2: Apr-Jun, Q3: Jul-Sep, Q4: Oct-Dec)
         df['calendar_quarter'] = ((df['month'] - 1) // 3 + 1).astype(int)
-        df['calendar_quarter_year'] = df.apply(
-            lambda x: f"{x['year']} Q{x['calendar_quarter']}", axis=1
-        )
+        df['calendar_quarter_key'] = df['year'].astype('int64') * 10 + df['calendar_quarter']
+        df['calendar_quarter_year'] = self._quarter_labels(df['calendar_quarter_key'])
         
         # Custom quarter based on fiscal year start
         fiscal_start_month = self.config.time_periods['default_periods']['year']['start_month']
         df['custom_quarter'] = ((df['month'] - fiscal_start_month) % 12 // 3 + 1).astype(int)
         
         # Fiscal year (e.g., if fiscal_start_month is 9, then Sept 2023 -> 2024)
-        df['fiscal_year'] = df.apply(
-            lambda x: x['year'] + (1 if x['month'] >= fiscal_start_month else 0),
-            axis=1
-        )
+        df['fiscal_year'] = (df['year'] + (df['month'] >= fiscal_start_month)).astype('int64')
+        df['fiscal_quarter_key'] = df['fiscal_year'] * 10 + df['custom_quarter']
         
         return df
     
+    @staticmethod
+    def _quarter_labels(quarter_keys: pd.Series) -> pd.Categorical:
+        """Turn year * 10 + quarter keys into "YYYY QN" labels.
+        
+        Only the distinct keys are formatted; rows share them via category codes.
+        """
+        codes, keys = pd.factorize(quarter_keys, sort=True)
+        labels = [f"{key // 10} Q{key % 10}" for key in keys]
+        return pd.Categorical.from_codes(codes, categories=labels)
+    
+    def apply_changes(self, deleted: Iterable, upserts: pd.DataFrame) -> None:
+        """Apply an incremental change set without rebuilding the DataFrame.
+        
+        Period columns are derived for the upserted rows only; all other
+        rows are kept as they are.
+        
+        Args:
+            deleted: Index labels of rows to remove (missing labels are ignored)
+            upserts: Event rows to add, indexed by their labels; rows whose
+                label already exists replace the old row. Split pieces of an
+                event share its label.
+        """
+        drop = self.df.index.intersection(pd.Index(deleted).union(upserts.index))
+        df = self.df.drop(index=drop)
+        if len(upserts):
+            added = self._add_period_columns(self._split(upserts.copy()))
+            if len(df):
+                df = pd.concat([df, added])
+                # Categories of the two parts differ, so relabel from the keys
+                df['calendar_quarter_year'] = self._quarter_labels(df['calendar_quarter_key'])
+            else:
+                df = added
+        if self._cube_base is not None:
+            # Update the cube by the contribution of the affected rows only
+            base = self._cube_base
+            if len(drop):
+                base = base.sub(self._compute_cube_base(self.df.loc[drop]), fill_value=0)
+            if len(upserts):
+                base = base.add(self._compute_cube_base(added), fill_value=0)
+            base = base[base['events'] > 0]
+            base['events'] = base['events'].astype('int64')
+            self._reset_cube()
+            self._cube_base = base
+        
+        self.df = df
+        self.events = df
+        self._range_index = None
+        
+    def _reset_cube(self) -> None:
+        self._cube_base = None
+        self._cube = None
+        self._cube_slices = None
+        self._range_index = None
+        
+    def _compute_cube_base(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Sum hours per finest period cell: ISO week x month x macro activity.
+        
+        Every cube granularity is a union of these cells, so this is the only
+        pass over the events.
+        """
+        return (df.groupby(['iso_week_key', 'year', 'month', 'macro_activities'], observed=True)['duration']
+                .agg(['sum', 'count'])
+                .rename(columns={'sum': 'hours', 'count': 'events'}))
+    
+    def get_aggregation_cube(self) -> Dict[str, pd.DataFrame]:
+        """Hours and percentages per period and macro activity for every granularity.
+        
+        Computed in one grouped pass over the events and cached until the
+        data changes; apply_changes updates it by the affected rows only.
+        
+        Returns:
+            Dictionary mapping each of CUBE_GRANULARITIES to a DataFrame
+            indexed by (period, macro_activities) with hours and percentage
+            columns. Periods are keyed by iso_week_key for weeks, year * 100 +
+            month for months, "YYYY QN" labels for calendar quarters,
+            fiscal_quarter_key for fiscal quarters and the fiscal year number.
+        """
+        if self._cube is None:
+            if self._cube_base is None:
+                self._cube_base = self._compute_cube_base(self.df)
+            self._cube = self._build_cube(self._cube_base)
+        return self._cube
+    
+    def _build_cube(self, base: pd.DataFrame) -> Dict[str, pd.DataFrame]:
+        cells = base.reset_index()
+        fiscal_start_month = self.config.time_periods['default_periods']['year']['start_month']
+        calendar_quarter = (cells['month'] - 1) // 3 + 1
+        fiscal_year = cells['year'] + (cells['month'] >= fiscal_start_month)
+        custom_quarter = (cells['month'] - fiscal_start_month) % 12 // 3 + 1
+        
+        periods = {
+            'week': cells['iso_week_key'],
+            'month': cells['year'] * 100 + cells['month'],
+            'calendar_quarter': pd.Series(
+                self._quarter_labels(cells['year'] * 10 + calendar_quarter), index=cells.index
+            ).astype(str),
+            'fiscal_quarter': fiscal_year * 10 + custom_quarter,
+            'fiscal_year': fiscal_year
+        }
+        
+        cube = {}
+        for granularity in self.CUBE_GRANULARITIES:
+            hours = cells['hours'].groupby(
+                [periods[granularity].rename('period'), cells['macro_activities']]
+            ).sum()
+            totals = hours.groupby(level='period').transform('sum')
+            cube[granularity] = pd.DataFrame({
+                'hours': hours,
+                'percentage': (hours / totals) * 100
+            })
+        return cube
+    
+    def get_period_percentages(self, granularity: str, period=None) -> pd.DataFrame:
+        """Hours and percentages per macro activity for one period.
+        
+        Args:
+            granularity: One of CUBE_GRANULARITIES
+            period: Period key as in get_aggregation_cube, or None for all data
+            
+        Returns:
+            DataFrame with macro_activities, hours and percentage columns
+        """
+        if granularity not in self.CUBE_GRANULARITIES:
+            raise ValueError(f"Unknown period granularity: {granularity}")
+        
+        if period is None:
+            cells = self.get_aggregation_cube()['fiscal_year']['hours']
+            hours = cells.groupby(level='macro_activities').sum()
+        else:
+            if self._cube_slices is None:
+                self._cube_slices = {
+                    name: {key: group.droplevel('period')['hours']
+                           for key, group in cube.groupby(level='period')}
+                    for name, cube in self.get_aggregation_cube().items()
+                }
+            hours = self._cube_slices[granularity].get(period)
+        
+        if hours is None or hours.sum() == 0:
+            return pd.DataFrame(columns=['macro_activities', 'hours', 'percentage'])
+        
+        return pd.DataFrame({
+            'hours': hours,
+            'percentage': (hours / hours.sum()) * 100
+        }).rename_axis('macro_activities').reset_index()
+    
+    def get_range_index(self) -> DailyActivityIndex:
+        """Day x macro-activity prefix sums, built on first use and cached until the data changes."""
+        if self._range_index is None:
+            self._range_index = DailyActivityIndex(self.df)
+        return self._range_index
+        
+    def get_range_hours(self, start_date=None, end_date=None) -> pd.Series:
+        """Hours per macro activity between two dates, both included, in O(activities).
+        
+        Args:
+            start_date: First day (date, datetime or "YYYY-MM-DD"), or None for the start of data
+            end_date: Last day, or None for the end of data
+        
+        Returns:
+            Series of hours indexed by macro activity
+        """
+        return self.get_range_index().hours(start_date, end_date)
+        
+    def get_range_percentages(self, start_date=None, end_date=None) -> pd.DataFrame:
+        """Hours and percentages per macro activity between two dates, both included.
+        
+        Returns:
+            DataFrame with macro_activities, hours and percentage columns, like
+            get_period_percentages
+        """
+        return self.get_range_index().percentages(start_date, end_date)
+        
+    def get_rolling_hours(self, window_days: int, start_date=None, end_date=None,
+                          average: bool = False) -> pd.DataFrame:
+        """Hours per macro activity over a trailing window ending on each day.
+        
+        Args:
+            window_days: Window length in days, e.g. 28 for a 4-week window
+            start_date: First day of the series, or None for the start of data
+            end_date: Last day of the series, or None for the end of data
+            average: Average hours per day over the window instead of the sum
+        
+        Returns:
+            DataFrame indexed by date with one column per macro activity
+        """
+        return self.get_range_index().rolling(window_days, start_date, end_date, average=average)
+        
     def get_weekly_hours(self) -> pd.DataFrame:
-        """Calculate hours per macro activities per week."""
-        return (self.df.groupby(['year', 'week', 'macro_activities'])['duration']
-                .sum()
-                .reset_index())
+        """Calculate hours per macro activities per ISO week.
+        
+        The year column of the result is the ISO year the week belongs to.
+        """
+        weekly = self.get_aggregation_cube()['week']['hours'].reset_index()
+        return pd.DataFrame({
+            'year': weekly['period'] // 100,
+            'week': weekly['period'] % 100,
+            'macro_activities': weekly['macro_activities'],
+            'duration': weekly['hours']
+        })
     
     def get_calendar_quarter_percentages(self, quarter_year: str = None) -> pd.DataFrame:
         """Calculate percentages for calendar quarters.
@@ -58,19 +309,7 @@ class DataProcessor:
         Returns:
             DataFrame with activities percentages for the specified quarter or all data
         """
-        if quarter_year:
-            filtered = self.df[self.df['calendar_quarter_year'] == quarter_year]
-        else:
-            filtered = self.df
-            
-        total_hours = filtered['duration'].sum()
-        if total_hours == 0:
-            return pd.DataFrame(columns=['macro_activities', 'hours', 'percentage'])
-            
-        return (filtered.groupby('macro_activities')['duration']
-                .agg(['sum', lambda x: (x.sum()/total_hours)*100])
-                .rename(columns={'sum': 'hours', '<lambda_0>': 'percentage'})
-                .reset_index())
+        return self.get_period_percentages('calendar_quarter', quarter_year or None)
     
     def get_fiscal_year_percentages(self, fiscal_year: int = None) -> pd.DataFrame:
         """Calculate percentages for fiscal years.
@@ -81,19 +320,7 @@ class DataProcessor:
         Returns:
             DataFrame with activities percentages for the specified fiscal year or all data
         """
-        if fiscal_year:
-            filtered = self.df[self.df['fiscal_year'] == fiscal_year]
-        else:
-            filtered = self.df
-            
-        total_hours = filtered['duration'].sum()
-        if total_hours == 0:
-            return pd.DataFrame(columns=['macro_activities', 'hours', 'percentage'])
-            
-        return (filtered.groupby('macro_activities')['duration']
-                .agg(['sum', lambda x: (x.sum()/total_hours)*100])
-                .rename(columns={'sum': 'hours', '<lambda_0>': 'percentage'})
-                .reset_index())
+        return self.get_period_percentages('fiscal_year', fiscal_year or None)
     
     def get_unique_periods(self) -> Dict[str, List]:
         """Get lists of unique calendar quarters and fiscal years in the data."""
@@ -0,0 +1,118 @@
+import json
+import os
+from pathlib import Path
+from typing import Tuple
+
+import pandas as pd
+
+from calendarmetrics.parse_cache import config_fingerprint
+
+# Bump when the layout of the stored tables changes
+STORE_VERSION = 2
+
+# Columns of the per-event version index
+INDEX_COLUMNS = ['calendar', 'uid', 'sequence', 'last_modified', 'recurring', 'included']
+
+
+class EventStore:
+    """Persistent store of processed events keyed by calendar, UID and RECURRENCE-ID.
+
+    Two tables are kept: the processed event rows (with their derived period
+    columns) and a version index of every VEVENT seen, including the ones that
+    were filtered out, so unchanged events never have to be decoded again.
+    """
+
+    def __init__(self, store_dir: str, config_loader):
+        """Initialize store.
+
+        Args:
+            store_dir: Directory holding the store files
+            config_loader: ConfigLoader instance whose settings affect stored rows
+        """
+        self.store_dir = Path(store_dir)
+        self.store_dir.mkdir(parents=True, exist_ok=True)
+        self.fingerprint = config_fingerprint(
+            config_loader,
+            store_version=STORE_VERSION,
+            default_periods=config_loader.time_periods.get('default_periods', {}),
+            segments=config_loader.get_segment_settings(),
+            calendars={
+                name: calendar['category']
+                for name, calendar in config_loader.calendars.get('calendars', {}).items()
+            }
+        )
+
+    def __repr__(self) -> str:
+        return f'EventStore({self.store_dir})'
+
+    @property
+    def _events_path(self) -> Path:
+        return self.store_dir / 'events.feather'
+
+    @property
+    def _index_path(self) -> Path:
+        return self.store_dir / 'index.feather'
+
+    @property
+    def _meta_path(self) -> Path:
+        return self.store_dir / 'meta.json'
+
+    def load(self) -> Tuple[pd.DataFrame, pd.DataFrame]:
+        """Load the stored events and version index.
+
+        Returns:
+            Tuple of (events, index), both indexed by event key. Both are empty
+            when nothing is stored yet or the configuration has changed.
+        """
+        empty = (pd.DataFrame(), self._empty_index())
+        try:
+            if not self._current():
+                return empty
+            events = pd.read_feather(self._events_path).set_index('key')
+            index = pd.read_feather(self._index_path).set_index('key')
+        except (FileNotFoundError, OSError, ValueError):
+            return empty
+        return events, index
+
+    def load_index(self) -> pd.DataFrame:
+        """Load only the version index, for callers that already hold the events.
+
+        Returns:
+            Index indexed by event key, empty when nothing is stored yet or
+            the configuration has changed
+        """
+        try:
+            if not self._current():
+                return self._empty_index()
+            return pd.read_feather(self._index_path).set_index('key')
+        except (FileNotFoundError, OSError, ValueError):
+            return self._empty_index()
+
+    def _current(self) -> bool:
+        """Whether the stored tables were written with the current configuration."""
+        with open(self._meta_path) as f:
+            return json.load(f).get('fingerprint') == self.fingerprint
+
+    @staticmethod
+    def _empty_index() -> pd.DataFrame:
+        return pd.DataFrame(columns=INDEX_COLUMNS, index=pd.Index([], name='key'))
+
+    def save(self, events: pd.DataFrame, index: pd.DataFrame) -> None:
+        """Persist the events and version index.
+
+        Args:
+            events: Processed event rows indexed by event key
+            index: Version index indexed by event key
+        """
+        self._write_frame(events, self._events_path)
+        self._write_frame(index, self._index_path)
+        tmp_path = self._meta_path.with_suffix('.tmp')
+        with open(tmp_path, 'w') as f:
+            json.dump({'fingerprint': self.fingerprint}, f)
+        os.replace(tmp_path, self._meta_path)
+
+    @staticmethod
+    def _write_frame(df: pd.DataFrame, path: Path) -> None:
+        tmp_path = path.with_suffix('.tmp')
+        df.rename_axis('key').reset_index().to_feather(tmp_path)
+        os.replace(tmp_path, path)
@@ -0,0 +1,192 @@
+from array import array
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Sequence
+
+import numpy as np
+import pandas as pd
+
+# Column order of the event records produced by CalendarParser
+EVENT_COLUMNS = ['start', 'end', 'macro_activities', 'micro_activities', 'duration', 'calendar']
+
+_EPOCH = datetime(1970, 1, 1)
+_MICROSECOND = timedelta(microseconds=1)
+
+
+class EventTable:
+    """Compact columnar container of parsed events.
+
+    Start and end are kept as int64 nanoseconds since the epoch (naive UTC),
+    summaries and categories as int32 codes into per-table dictionaries, so
+    an event costs 24 bytes instead of a six-key dict. Duration is not
+    stored: it is derived from start and end exactly as CalendarParser
+    computes it.
+
+    Events are appended one at a time while parsing; tables are combined
+    with concat and turned into an events DataFrame once, by to_frame.
+    """
+
+    def __init__(self):
+        self._start = array('q')
+        self._end = array('q')
+        self._summary_codes = array('i')
+        self._category_codes = array('i')
+        self.summaries: List[str] = []
+        self.categories: List[str] = []
+        self._summary_index: Dict[str, int] = {}
+        self._category_index: Dict[str, int] = {}
+
+    def __repr__(self) -> str:
+        return f'EventTable({len(self)} events, {len(self.summaries)} summaries)'
+
+    def __len__(self) -> int:
+        return len(self._start)
+
+    def __getstate__(self) -> Dict:
+        # The lookup dictionaries are rebuilt on unpickling
+        return {key: value for key, value in self.__dict__.items()
+                if key not in ('_summary_index', '_category_index')}
+
+    def __setstate__(self, state: Dict) -> None:
+        self.__dict__.update(state)
+        self._summary_index = {value: code for code, value in enumerate(self.summaries)}
+        self._category_index = {value: code for code, value in enumerate(self.categories)}
+
+    @staticmethod
+    def _intern(value: str, values: List[str], index: Dict[str, int]) -> int:
+        code = index.get(value)
+        if code is None:
+            code = index[value] = len(values)
+            values.append(value)
+        return code
+
+    def append(self, start: datetime, end: datetime, summary: str, category: str) -> None:
+        """Add one event.
+
+        Args:
+            start: Naive UTC start
+            end: Naive UTC end
+            summary: Event summary (micro activity)
+            category: Calendar category (macro activity)
+        """
+        self._start.append((start - _EPOCH) // _MICROSECOND * 1000)
+        self._end.append((end - _EPOCH) // _MICROSECOND * 1000)
+        self._summary_codes.append(self._intern(summary, self.summaries, self._summary_index))
+        self._category_codes.append(self._intern(category, self.categories, self._category_index))
+
+    @classmethod
+    def from_arrays(cls, start: np.ndarray, end: np.ndarray, summary_codes: np.ndarray,
+                    summaries: Sequence[str], category_codes: np.ndarray,
+                    categories: Sequence[str]) -> 'EventTable':
+        """Build a table from whole columns.
+
+        Args:
+            start: Naive UTC starts (datetime64 or int64 nanoseconds)
+            end: Naive UTC ends (datetime64 or int64 nanoseconds)
+            summary_codes: Codes into summaries, one per event
+            summaries: Distinct summaries
+            category_codes: Codes into categories, one per event
+            categories: Distinct categories
+        """
+        table = cls()
+        table._start.frombytes(cls._int64(start).tobytes())
+        table._end.frombytes(cls._int64(end).tobytes())
+        table._summary_codes.frombytes(np.asarray(summary_codes, dtype=np.int32).tobytes())
+        table._category_codes.frombytes(np.asarray(category_codes, dtype=np.int32).tobytes())
+        table.__setstate__({'summaries': list(summaries), 'categories': list(categories)})
+        return table
+
+    @staticmethod
+    def _int64(values: np.ndarray) -> np.ndarray:
+        values = np.asarray(values)
+        if values.dtype.kind == 'M':
+            values = values.astype('datetime64[ns]')
+        return np.ascontiguousarray(values.view(np.int64) if values.dtype.kind == 'M'
+                                    else values.astype(np.int64))
+
+    @property
+    def start(self) -> np.ndarray:
+        """Starts as a datetime64[ns] array."""
+        return np.array(self._start, dtype=np.int64).view('datetime64[ns]')
+
+    @property
+    def end(self) -> np.ndarray:
+        """Ends as a datetime64[ns] array."""
+        return np.array(self._end, dtype=np.int64).view('datetime64[ns]')
+
+    @property
+    def duration(self) -> np.ndarray:
+        """Durations in hours, as CalendarParser computes them."""
+        microseconds = (np.array(self._end, dtype=np.int64) -
+                        np.array(self._start, dtype=np.int64)) // 1000
+        return microseconds / 1e6 / 3600
+
+    @property
+    def summary_codes(self) -> np.ndarray:
+        return np.array(self._summary_codes, dtype=np.int32)
+
+    @property
+    def category_codes(self) -> np.ndarray:
+        return np.array(self._category_codes, dtype=np.int32)
+
+    def take(self, keep: np.ndarray) -> 'EventTable':
+        """Return a table with only the events selected by a boolean mask."""
+        if keep.all():
+            return self
+        return EventTable.from_arrays(
+            self.start[keep], self.end[keep], self.summary_codes[keep], self.summaries,
+            self.category_codes[keep], self.categories
+        )
+
+    def replace_summaries(self, replacer) -> 'EventTable':
+        """Apply text replacements to the summary dictionary instead of every event.
+
+        Args:
+            replacer: TextReplacer instance
+
+        Returns:
+            Table with replaced, re-encoded summaries
+        """
+        replaced = replacer.replace_many(self.summaries)
+        # Different raw summaries may now be equal, so encode them again
+        codes, uniques = pd.factorize(pd.Series(replaced, dtype=object))
+        return EventTable.from_arrays(
+            self.start, self.end, codes.astype(np.int32)[self.summary_codes], list(uniques),
+            self.category_codes, self.categories
+        )
+
+    @classmethod
+    def concat(cls, tables: Iterable['EventTable']) -> 'EventTable':
+        """Concatenate tables, merging their dictionaries."""
+        tables = list(tables)
+        if len(tables) == 1:
+            return tables[0]
+        merged = cls()
+        for table in tables:
+            summary_map = np.array([cls._intern(value, merged.summaries, merged._summary_index)
+                                    for value in table.summaries], dtype=np.int32)
+            category_map = np.array([cls._intern(value, merged.categories, merged._category_index)
+                                     for value in table.categories], dtype=np.int32)
+            merged._start.extend(table._start)
+            merged._end.extend(table._end)
+            if len(table):
+                merged._summary_codes.frombytes(summary_map[table.summary_codes].tobytes())
+                merged._category_codes.frombytes(category_map[table.category_codes].tobytes())
+        return merged
+
+    def to_frame(self) -> pd.DataFrame:
+        """Build an events DataFrame with the EVENT_COLUMNS.
+
+        Summary and category strings are shared between rows rather than
+        copied per event.
+        """
+        summaries = np.array(self.summaries, dtype=object)
+        categories = np.array(self.categories, dtype=object)
+        category_column = categories[self.category_codes]
+        return pd.DataFrame({
+            'start': self.start,
+            'end': self.end,
+            'macro_activities': category_column,
+            'micro_activities': summaries[self.summary_codes],
+            'duration': self.duration,
+            'calendar': category_column
+        }, columns=EVENT_COLUMNS)
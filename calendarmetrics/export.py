@@ -0,0 +1,170 @@
+import os
+from abc import ABC, abstractmethod
+from typing import Dict, Iterable, Iterator, List
+
+import pandas as pd
+
+# Rows per worksheet in an XLSX file, header included
+EXCEL_MAX_ROWS = 1048576
+
+
+class Exporter(ABC):
+    """Base class of the processed-events writers.
+
+    Subclasses set extension and implement write. Rows are always written
+    without the DataFrame index, like the original to_excel export.
+    """
+
+    extension = ''
+
+    @abstractmethod
+    def write(self, df: pd.DataFrame, path: str) -> None:
+        """Write df to path."""
+
+    @staticmethod
+    def _plain(df: pd.DataFrame) -> pd.DataFrame:
+        return df.reset_index(drop=True)
+
+
+class ParquetExporter(Exporter):
+    """Columnar Parquet file (compressed, typed, fast to read back)."""
+
+    extension = 'parquet'
+
+    def __init__(self, compression: str = 'snappy'):
+        self.compression = compression
+
+    def write(self, df: pd.DataFrame, path: str) -> None:
+        self._plain(df).to_parquet(path, index=False, compression=self.compression)
+
+
+class ArrowExporter(Exporter):
+    """Arrow IPC file (Feather v2), the fastest format to write and memory-map."""
+
+    extension = 'arrow'
+
+    def write(self, df: pd.DataFrame, path: str) -> None:
+        self._plain(df).to_feather(path)
+
+
+class CsvExporter(Exporter):
+    """CSV written in chunks, so only one chunk is ever formatted in memory."""
+
+    extension = 'csv'
+
+    def __init__(self, chunk_rows: int = 100000):
+        self.chunk_rows = max(int(chunk_rows), 1)
+
+    def write(self, df: pd.DataFrame, path: str) -> None:
+        with open(path, 'w', newline='', encoding='utf-8') as f:
+            for start in range(0, max(len(df), 1), self.chunk_rows):
+                self._plain(df.iloc[start:start + self.chunk_rows]).to_csv(
+                    f, index=False, header=start == 0
+                )
+
+
+class XlsxExporter(Exporter):
+    """Excel workbook through openpyxl, as main.py always wrote it.
+
+    Tables longer than a worksheet continue on further sheets.
+    """
+
+    extension = 'xlsx'
+
+    def write(self, df: pd.DataFrame, path: str) -> None:
+        df = self._plain(df)
+        with pd.ExcelWriter(path, engine='openpyxl') as writer:
+            for number, start in enumerate(_sheet_starts(len(df)), start=1):
+                df.iloc[start:start + EXCEL_MAX_ROWS - 1].to_excel(
+                    writer, sheet_name=f'Sheet{number}', index=False
+                )
+
+
+class StreamingXlsxExporter(Exporter):
+    """Constant-memory Excel workbook using openpyxl's write-only mode.
+
+    Rows are converted and streamed in chunks instead of building every
+    cell in memory first. Tables longer than a worksheet continue on
+    further sheets.
+    """
+
+    extension = 'xlsx'
+
+    def __init__(self, chunk_rows: int = 10000):
+        self.chunk_rows = max(int(chunk_rows), 1)
+
+    def write(self, df: pd.DataFrame, path: str) -> None:
+        from openpyxl import Workbook
+
+        df = self._plain(df)
+        workbook = Workbook(write_only=True)
+        for number, start in enumerate(_sheet_starts(len(df)), start=1):
+            sheet = workbook.create_sheet(f'Sheet{number}')
+            sheet.append([str(column) for column in df.columns])
+            stop = min(start + EXCEL_MAX_ROWS - 1, len(df))
+            for row in self._rows(df, start, stop):
+                sheet.append(row)
+        workbook.save(path)
+
+    def _rows(self, df: pd.DataFrame, start: int, stop: int) -> Iterator[List]:
+        for chunk_start in range(start, stop, self.chunk_rows):
+            chunk = df.iloc[chunk_start:min(chunk_start + self.chunk_rows, stop)]
+            # Object columns hold Python scalars (datetime, int, str) openpyxl accepts
+            chunk = chunk.astype(object).where(chunk.notna(), None)
+            yield from chunk.itertuples(index=False, name=None)
+
+
+def _sheet_starts(rows: int) -> range:
+    return range(0, max(rows, 1), EXCEL_MAX_ROWS - 1)
+
+
+# Export formats selectable in settings.yaml or with --export
+EXPORTERS = {
+    'xlsx': XlsxExporter,
+    'xlsx_stream': StreamingXlsxExporter,
+    'parquet': ParquetExporter,
+    'arrow': ArrowExporter,
+    'csv': CsvExporter
+}
+
+
+def check_formats(formats: Iterable[str]) -> None:
+    """Raise ValueError for unknown formats or formats that write the same file."""
+    formats = list(formats)
+    unknown = [name for name in formats if name not in EXPORTERS]
+    if unknown:
+        raise ValueError(f"Unknown export format(s): {', '.join(unknown)}")
+    by_extension = {}
+    for name in dict.fromkeys(formats):
+        by_extension.setdefault(EXPORTERS[name].extension, []).append(name)
+    clashes = [names for names in by_extension.values() if len(names) > 1]
+    if clashes:
+        raise ValueError("Export formats write the same file, choose one of: "
+                         + '; '.join(' or '.join(names) for names in clashes))
+
+
+def export_events(df: pd.DataFrame, formats: Iterable[str], output_dir: str,
+                  basename: str = 'processed_events', options: Dict = None) -> List[str]:
+    """Write the processed events in each requested format.
+
+    Args:
+        df: Processed events DataFrame
+        formats: Names from EXPORTERS
+        output_dir: Directory to write into
+        basename: File name without extension
+        options: Keyword arguments per format, e.g. {'csv': {'chunk_rows': 50000}}
+
+    Returns:
+        Paths of the written files
+    """
+    options = options or {}
+    formats = list(formats)
+    check_formats(formats)
+
+    paths = []
+    for name in dict.fromkeys(formats):
+        exporter = EXPORTERS[name](**(options.get(name) or {}))
+        path = os.path.join(output_dir, f'{basename}.{exporter.extension}')
+        exporter.write(df, path)
+        paths.append(path)
+    return paths
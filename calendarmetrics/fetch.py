@@ -0,0 +1,405 @@
+"""Download calendar feeds (secret iCal addresses, CalDAV collection URLs).
+
+Feeds are fetched concurrently on one asyncio event loop through a small
+HTTP/1.1 client that keeps connections alive and reuses them per host, so
+several calendars on the same server share a connection. Requests are
+conditional (If-None-Match / If-Modified-Since with the validators of the
+previous download): an unchanged feed costs one 304 and its local file is
+left untouched, so the parse cache and the event store skip it as well.
+
+Response bodies are streamed in chunks into the calendar's local file,
+written atomically, which is then parsed like any other export; the whole
+feed is never held in memory.
+"""
+import asyncio
+import base64
+import json
+import os
+import ssl
+import time
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urljoin, urlsplit
+
+# Validators of the previous downloads, kept next to the calendar files
+STATE_FILE = '.feeds.json'
+CHUNK_SIZE = 64 * 1024
+MAX_REDIRECTS = 5
+REDIRECT_STATUSES = (301, 302, 303, 307, 308)
+# Request headers dropped when a redirect leaves the feed's scheme, host and port
+ORIGIN_HEADERS = ('Authorization', 'If-None-Match', 'If-Modified-Since')
+
+
+class FetchError(Exception):
+    """A feed could not be downloaded."""
+
+
+class Feed:
+    """One calendar downloaded from a URL.
+
+    Args:
+        name: Calendar name in calendars.yaml
+        url: http(s) URL of the ICS feed
+        path: Local file the feed is saved to
+        auth_env: Optional environment variable holding "user:password"
+            for HTTP basic authentication (CalDAV servers)
+    """
+
+    def __init__(self, name: str, url: str, path: str, auth_env: Optional[str] = None):
+        self.name = name
+        self.url = url
+        self.path = path
+        self.auth_env = auth_env
+
+    def __repr__(self) -> str:
+        # The URL of a secret iCal address is a credential; only show its host
+        return f'Feed({self.name}, {urlsplit(self.url).hostname})'
+
+    def headers(self) -> Dict[str, str]:
+        if not self.auth_env:
+            return {}
+        credentials = os.environ.get(self.auth_env)
+        if credentials is None:
+            raise FetchError(f"environment variable {self.auth_env} is not set")
+        return {'Authorization': 'Basic ' + base64.b64encode(credentials.encode('utf-8')).decode('ascii')}
+
+
+def feeds_from_config(config_loader, calendars_dir: str) -> List[Feed]:
+    """List the calendars of calendars.yaml that have a url."""
+    return [
+        Feed(name, calendar_config['url'], os.path.join(calendars_dir, calendar_config['file']),
+             calendar_config.get('auth_env'))
+        for name, calendar_config in config_loader.calendars.get('calendars', {}).items()
+        if calendar_config.get('url')
+    ]
+
+
+def _origin(url: str) -> Tuple[str, str, int]:
+    parts = urlsplit(url)
+    return parts.scheme, parts.hostname, parts.port or (443 if parts.scheme == 'https' else 80)
+
+
+class _Response:
+    def __init__(self, version: str, status: int, headers: Dict[str, str], reader: asyncio.StreamReader,
+                 timeout: float):
+        self.status = status
+        self.headers = headers
+        self.reader = reader
+        self.timeout = timeout
+        # HTTP/1.0 closes after each response unless it asks to keep the connection alive
+        connection = headers.get('connection', '').lower()
+        if version == 'HTTP/1.0':
+            self.reusable = connection == 'keep-alive'
+        else:
+            self.reusable = connection != 'close'
+
+    async def _read(self, size: int) -> bytes:
+        # The timeout applies to each read, so a slow but steady download never times out
+        return await asyncio.wait_for(self.reader.read(size), self.timeout)
+
+    async def _readline(self) -> bytes:
+        return await asyncio.wait_for(self.reader.readline(), self.timeout)
+
+    async def iter_body(self):
+        """Yield the body in chunks (chunked transfer, Content-Length or until close)."""
+        if self.status == 304 or self.status == 204 or 100 <= self.status < 200:
+            return
+        if self.headers.get('transfer-encoding', '').lower() == 'chunked':
+            while True:
+                size = int((await self._readline()).split(b';', 1)[0].strip() or b'0', 16)
+                if size == 0:
+                    # Trailers end with an empty line
+                    while (await self._readline()).strip():
+                        pass
+                    return
+                while size:
+                    chunk = await self._read(min(size, CHUNK_SIZE))
+                    if not chunk:
+                        raise FetchError("connection closed in the middle of a chunk")
+                    size -= len(chunk)
+                    yield chunk
+                await self._readline()
+        elif 'content-length' in self.headers:
+            remaining = int(self.headers['content-length'])
+            while remaining:
+                chunk = await self._read(min(remaining, CHUNK_SIZE))
+                if not chunk:
+                    raise FetchError("connection closed before the end of the body")
+                remaining -= len(chunk)
+                yield chunk
+        else:
+            self.reusable = False
+            while True:
+                chunk = await self._read(CHUNK_SIZE)
+                if not chunk:
+                    return
+                yield chunk
+
+    async def drain(self) -> None:
+        async for _ in self.iter_body():
+            pass
+
+
+class ConnectionPool:
+    """Keep-alive HTTP/1.1 connections, reused per (scheme, host, port).
+
+    At most max_connections requests are in flight at once; idle
+    connections are kept until close.
+    """
+
+    def __init__(self, max_connections: int = 8, timeout: float = 30.0):
+        self.max_connections = max_connections
+        self.timeout = timeout
+        self.opened = 0
+        self._idle: Dict[Tuple[str, str, int], List[Tuple[asyncio.StreamReader, asyncio.StreamWriter]]] = {}
+        self._slots = asyncio.Semaphore(max_connections)
+        self._ssl = None
+
+    def __repr__(self) -> str:
+        return f'ConnectionPool(max_connections={self.max_connections}, opened={self.opened})'
+
+    async def _connect(self, key: Tuple[str, str, int]):
+        scheme, host, port = key
+        if scheme == 'https' and self._ssl is None:
+            self._ssl = ssl.create_default_context()
+        self.opened += 1
+        return await asyncio.wait_for(
+            asyncio.open_connection(host, port, ssl=self._ssl if scheme == 'https' else None),
+            self.timeout
+        )
+
+    def _release(self, key, connection, reusable: bool) -> None:
+        if reusable:
+            self._idle.setdefault(key, []).append(connection)
+        else:
+            connection[1].close()
+
+    async def get(self, url: str, headers: Dict[str, str], handle):
+        """Send a GET and pass the response to the coroutine function handle.
+
+        The connection goes back to the pool once handle returns, so handle
+        must consume the body. A reused connection that the server closed
+        in the meantime is retried once on a fresh one.
+
+        Returns:
+            What handle returns
+        """
+        parts = urlsplit(url)
+        if parts.scheme not in ('http', 'https'):
+            raise FetchError(f"unsupported URL scheme: {parts.scheme}")
+        key = _origin(url)
+        target = (parts.path or '/') + (f'?{parts.query}' if parts.query else '')
+        host = parts.hostname if parts.port is None else f'{parts.hostname}:{parts.port}'
+        lines = [f'GET {target} HTTP/1.1', f'Host: {host}', 'Accept: text/calendar, */*',
+                 'Accept-Encoding: identity', 'User-Agent: CalendarMetrics']
+        lines += [f'{name}: {value}' for name, value in headers.items()]
+        request = ('\r\n'.join(lines) + '\r\n\r\n').encode('latin-1')
+
+        async with self._slots:
+            idle = self._idle.get(key) or []
+            while True:
+                reused = bool(idle)
+                connection = idle.pop() if reused else await self._connect(key)
+                reader, writer = connection
+                try:
+                    writer.write(request)
+                    await writer.drain()
+                    status_line = await asyncio.wait_for(reader.readline(), self.timeout)
+                    if not status_line:
+                        raise ConnectionResetError("connection closed by the server")
+                except (ConnectionError, OSError):
+                    writer.close()
+                    if reused:
+                        continue
+                    raise
+                break
+
+            try:
+                version, status = status_line.decode('latin-1').split()[:2]
+                response = _Response(version, int(status),
+                                     await asyncio.wait_for(self._read_headers(reader), self.timeout),
+                                     reader, self.timeout)
+                result = await handle(response)
+            except BaseException:
+                writer.close()
+                raise
+            self._release(key, connection, response.reusable)
+            return result
+
+    @staticmethod
+    async def _read_headers(reader: asyncio.StreamReader) -> Dict[str, str]:
+        headers = {}
+        while True:
+            line = (await reader.readline()).decode('latin-1').strip()
+            if not line:
+                return headers
+            name, _, value = line.partition(':')
+            headers[name.strip().lower()] = value.strip()
+
+    async def close(self) -> None:
+        for connections in self._idle.values():
+            for _, writer in connections:
+                writer.close()
+        self._idle.clear()
+
+
+class FeedFetcher:
+    """Fetch calendar feeds concurrently with conditional requests.
+
+    ETag and Last-Modified of each download are kept in STATE_FILE in the
+    calendars directory and sent back on the next fetch. The state of a
+    feed is dropped when its URL changes or its local file is missing.
+    """
+
+    def __init__(self, calendars_dir: str, max_connections: int = 8, timeout: float = 30.0):
+        """Initialize fetcher.
+
+        Args:
+            calendars_dir: Directory of the local calendar files and fetch state
+            max_connections: Maximum number of requests in flight
+            timeout: Seconds to wait for a connection, the headers or each
+                read of the body; a large feed may take longer in total
+        """
+        self.calendars_dir = calendars_dir
+        self.max_connections = max_connections
+        self.timeout = timeout
+        self.state_path = os.path.join(calendars_dir, STATE_FILE)
+        # Connections opened by the last fetch, lower than the feeds when they were reused
+        self.connections_opened = 0
+
+    def __repr__(self) -> str:
+        return f'FeedFetcher({self.calendars_dir})'
+
+    def _load_state(self) -> Dict[str, Dict]:
+        try:
+            with open(self.state_path) as f:
+                return json.load(f)
+        except (FileNotFoundError, ValueError):
+            return {}
+
+    def _save_state(self, state: Dict[str, Dict]) -> None:
+        tmp_path = self.state_path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(state, f, indent=2, sort_keys=True)
+        os.replace(tmp_path, self.state_path)
+
+    def fetch(self, feeds: List[Feed]) -> Dict[str, Dict]:
+        """Fetch every feed and update its local file if it changed.
+
+        A feed that fails is reported and keeps its previous local file.
+
+        Returns:
+            Dictionary mapping each feed name to its outcome: status
+            ("updated", "not_modified" or "error"), bytes written, seconds,
+            and the error message for failures
+        """
+        if not feeds:
+            return {}
+        os.makedirs(self.calendars_dir, exist_ok=True)
+        state = self._load_state()
+        results = asyncio.run(self._fetch_all(feeds, state))
+        names = {feed.name for feed in feeds}
+        new_state = {name: entry for name, entry in state.items() if name in names}
+        if new_state != self._load_state():
+            self._save_state(new_state)
+        return results
+
+    async def _fetch_all(self, feeds: List[Feed], state: Dict[str, Dict]) -> Dict[str, Dict]:
+        pool = ConnectionPool(self.max_connections, self.timeout)
+        try:
+            outcomes = await asyncio.gather(*(self._fetch_feed(pool, feed, state) for feed in feeds),
+                                            return_exceptions=True)
+        finally:
+            await pool.close()
+        self.connections_opened = pool.opened
+
+        results = {}
+        for feed, outcome in zip(feeds, outcomes):
+            if isinstance(outcome, BaseException):
+                reason = str(outcome) or type(outcome).__name__
+                results[feed.name] = {'status': 'error', 'error': reason}
+            else:
+                results[feed.name] = outcome
+        return results
+
+    async def _fetch_feed(self, pool: ConnectionPool, feed: Feed, state: Dict[str, Dict]) -> Dict:
+        began = time.perf_counter()
+        previous = state.get(feed.name) or {}
+        if previous.get('url') != feed.url or not os.path.exists(feed.path):
+            previous = {}
+
+        headers = feed.headers()
+        if previous.get('etag'):
+            headers['If-None-Match'] = previous['etag']
+        if previous.get('last_modified'):
+            headers['If-Modified-Since'] = previous['last_modified']
+
+        url = feed.url
+        for _ in range(MAX_REDIRECTS + 1):
+            outcome = await pool.get(url, headers, lambda response: self._save_body(response, feed.path))
+            if outcome['status'] not in REDIRECT_STATUSES:
+                break
+            target = urljoin(url, outcome['location'])
+            if urlsplit(url).scheme == 'https' and urlsplit(target).scheme != 'https':
+                raise FetchError(f"refusing redirect from https to {urlsplit(target).scheme} for {feed.name}")
+            if _origin(target) != _origin(url):
+                # Credentials and validators are only sent to the server they belong to
+                headers = {name: value for name, value in headers.items()
+                           if name not in ORIGIN_HEADERS}
+            url = target
+        else:
+            raise FetchError(f"too many redirects for {feed.name}")
+
+        if outcome['status'] == 304:
+            return {'status': 'not_modified', 'bytes': 0, 'seconds': round(time.perf_counter() - began, 3)}
+        if outcome['status'] != 200:
+            raise FetchError(f"HTTP {outcome['status']}")
+
+        state[feed.name] = {'url': feed.url, 'etag': outcome.get('etag'),
+                            'last_modified': outcome.get('last-modified')}
+        return {'status': 'updated', 'bytes': outcome['bytes'], 'seconds': round(time.perf_counter() - began, 3)}
+
+    @staticmethod
+    async def _save_body(response: _Response, path: str) -> Dict:
+        """Stream a 200 body into path atomically; consume and drop any other body."""
+        outcome = {'status': response.status, 'bytes': 0,
+                   'location': response.headers.get('location', ''),
+                   'etag': response.headers.get('etag'),
+                   'last-modified': response.headers.get('last-modified')}
+        if response.status != 200:
+            await response.drain()
+            return outcome
+
+        tmp_path = f'{path}.{os.getpid()}.part'
+        try:
+            with open(tmp_path, 'wb') as f:
+                async for chunk in response.iter_body():
+                    f.write(chunk)
+                    outcome['bytes'] += len(chunk)
+            os.replace(tmp_path, path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+        return outcome
+
+
+def fetch_calendars(config_loader, calendars_dir: str, max_connections: int = 8,
+                    timeout: float = 30.0) -> Dict[str, Dict]:
+    """Fetch every calendar of calendars.yaml that has a url and report each result.
+
+    Returns:
+        Outcome per feed, see FeedFetcher.fetch
+    """
+    feeds = feeds_from_config(config_loader, calendars_dir)
+    if not feeds:
+        return {}
+    fetcher = FeedFetcher(calendars_dir, max_connections, timeout)
+    results = fetcher.fetch(feeds)
+    for name, result in results.items():
+        if result['status'] == 'error':
+            print(f"Could not fetch {name} calendar ({result['error']}); using the local copy if any")
+        elif result['status'] == 'not_modified':
+            print(f"{name} calendar not modified")
+        else:
+            print(f"{name} calendar downloaded ({result['bytes'] / 1024:.0f} KB)")
+    print(f"Fetched {len(feeds)} feed(s) over {fetcher.connections_opened} connection(s)")
+    return results
@@ -0,0 +1,364 @@
+import hashlib
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Dict, List, Optional, Tuple
+
+import icalendar
+import pandas as pd
+
+from calendarmetrics.calendar_parser import CalendarParser
+from calendarmetrics.data_processor import DataProcessor
+from calendarmetrics.event_store import INDEX_COLUMNS, EventStore
+from calendarmetrics.event_table import EVENT_COLUMNS, EventTable
+from calendarmetrics.instrumentation import peak_rss_mb
+from calendarmetrics.parse_cache import ParseCache
+from calendarmetrics.recurrence import overridden_instants
+
+# Parser and cache owned by each worker process, built once by _init_worker
+_worker_parser = None
+_worker_cache = None
+
+
+def _init_worker(config_loader, cache_dir: Optional[str] = None,
+                 cache_max_bytes: int = 512 * 1024 * 1024) -> None:
+    """Build the per-process parser and cache used by _parse_calendar."""
+    global _worker_parser, _worker_cache
+    _worker_parser = CalendarParser(config_loader)
+    _worker_cache = ParseCache(cache_dir, config_loader, cache_max_bytes) if cache_dir else None
+
+
+def _parse_calendar(ics_path: str, calendar_category: str, stream: bool) -> Tuple[EventTable, Dict]:
+    """Parse one ICS file in a worker.
+
+    Returns:
+        Tuple of (EventTable of the file's events, measurements of the parse:
+        event count, wall and CPU seconds, the worker's peak RSS, whether the
+        cache was hit, and the parser's per-phase seconds)
+    """
+    began, began_cpu = time.perf_counter(), time.process_time()
+    table, cached = None, False
+    if _worker_cache is not None:
+        table = _worker_cache.load(ics_path, calendar_category)
+        cached = table is not None
+
+    phases = {}
+    if table is None:
+        table = _worker_parser.parse_table(ics_path, calendar_category, stream=stream)
+        phases = dict(_worker_parser.last_timings)
+        if _worker_cache is not None:
+            _worker_cache.store(ics_path, table)
+
+    peak = peak_rss_mb()
+    stats = {
+        'events': len(table),
+        'wall_seconds': time.perf_counter() - began,
+        'cpu_seconds': time.process_time() - began_cpu,
+        'peak_rss_mb': round(peak, 1) if peak is not None else None,
+        'cached': cached,
+        'phases': {name: round(seconds, 4) for name, seconds in phases.items()}
+    }
+    return table, stats
+
+
+class CalendarIngestor:
+    """Parse all configured calendars, optionally across a process pool."""
+
+    def __init__(self, config_loader, workers: int = 1, stream: bool = False,
+                 cache_dir: Optional[str] = None, cache_max_bytes: int = 512 * 1024 * 1024):
+        """Initialize ingestor.
+
+        Args:
+            config_loader: ConfigLoader instance with calendars configuration
+            workers: Number of worker processes (1 parses in-process, 0 uses all cores)
+            stream: Use the streaming parser for each file
+            cache_dir: Optional directory for the parsed-events cache
+            cache_max_bytes: Size limit of the parsed-events cache
+        """
+        self.config = config_loader
+        self.workers = workers if workers > 0 else (os.cpu_count() or 1)
+        self.stream = stream
+        self.cache_dir = cache_dir
+        self.cache_max_bytes = cache_max_bytes
+        # Measurements of each calendar parsed by the last ingest (see _parse_calendar)
+        self.file_stats: Dict[str, Dict] = {}
+        # Calendars the last ingest could not parse, with the error
+        self.failed: Dict[str, str] = {}
+
+    def _calendar_jobs(self, calendars_dir: str) -> List[Tuple[str, str, str]]:
+        """List (name, ics_path, category) for each configured calendar."""
+        return [
+            (calendar_name, os.path.join(calendars_dir, calendar_config['file']),
+             calendar_config['category'])
+            for calendar_name, calendar_config in self.config.calendars.get('calendars', {}).items()
+        ]
+
+    def ingest(self, calendars_dir: str) -> pd.DataFrame:
+        """Parse every configured calendar file.
+
+        A file that fails to parse is reported and skipped without affecting
+        the others.
+
+        Args:
+            calendars_dir: Directory containing the ICS files
+
+        Returns:
+            DataFrame of all events, in calendar configuration order
+        """
+        return self.ingest_table(calendars_dir).to_frame()
+
+    def ingest_table(self, calendars_dir: str) -> EventTable:
+        """Parse every configured calendar file into one compact EventTable.
+
+        Same as ingest, without building the DataFrame; DataProcessor
+        accepts the table directly.
+
+        Args:
+            calendars_dir: Directory containing the ICS files
+
+        Returns:
+            EventTable of all events, in calendar configuration order
+        """
+        jobs = self._calendar_jobs(calendars_dir)
+        results = {}
+        self.file_stats = {}
+        self.failed = {}
+
+        if self.workers == 1:
+            _init_worker(*self._worker_args())
+            for calendar_name, ics_path, category in jobs:
+                print(f"\nProcessing {calendar_name} calendar from {ics_path}...")
+                try:
+                    results[calendar_name], self.file_stats[calendar_name] = _parse_calendar(
+                        ics_path, category, self.stream
+                    )
+                    self._report(calendar_name, results[calendar_name])
+                except Exception as e:
+                    self.failed[calendar_name] = str(e)
+                    print(f"Error processing {calendar_name} calendar: {str(e)}")
+        else:
+            # Largest files first so the slowest file never starts last
+            ordered = sorted(jobs, key=lambda job: self._file_size(job[1]), reverse=True)
+            with ProcessPoolExecutor(max_workers=min(self.workers, len(jobs) or 1),
+                                     initializer=_init_worker,
+                                     initargs=self._worker_args()) as executor:
+                futures = {}
+                for calendar_name, ics_path, category in ordered:
+                    print(f"\nProcessing {calendar_name} calendar from {ics_path}...")
+                    futures[executor.submit(_parse_calendar, ics_path, category, self.stream)] = calendar_name
+
+                for future in as_completed(futures):
+                    calendar_name = futures[future]
+                    try:
+                        results[calendar_name], self.file_stats[calendar_name] = future.result()
+                        self._report(calendar_name, results[calendar_name])
+                    except Exception as e:
+                        self.failed[calendar_name] = str(e)
+                        print(f"Error processing {calendar_name} calendar: {str(e)}")
+
+        tables = [results[calendar_name] for calendar_name, _, _ in jobs if calendar_name in results]
+        return EventTable.concat(tables) if tables else EventTable()
+
+    def _worker_args(self) -> Tuple:
+        return self.config, self.cache_dir, self.cache_max_bytes
+
+    def _report(self, calendar_name: str, table: EventTable) -> None:
+        print(f"Found {len(table)} events in {calendar_name} calendar")
+
+    @staticmethod
+    def _file_size(path: str) -> int:
+        try:
+            return os.path.getsize(path)
+        except OSError:
+            return 0
+
+
+class IncrementalIngestor:
+    """Re-ingest calendars by applying only the events that changed.
+
+    Events are identified by calendar, UID and RECURRENCE-ID. An event whose
+    SEQUENCE and LAST-MODIFIED match the stored version is not decoded again;
+    new and changed events are decoded and events missing from the export are
+    deleted. The resulting change set is applied to a DataProcessor so period
+    columns are derived for the affected rows only.
+    """
+
+    def __init__(self, config_loader, store_dir: str):
+        """Initialize ingestor.
+
+        Args:
+            config_loader: ConfigLoader instance with calendars configuration
+            store_dir: Directory of the persistent event store
+        """
+        self.config = config_loader
+        self.parser = CalendarParser(config_loader)
+        self.store = EventStore(store_dir, config_loader)
+        self.last_changes = {}
+
+    def ingest(self, calendars_dir: str, processor: Optional[DataProcessor] = None) -> DataProcessor:
+        """Bring a processor up to date with the current calendar exports.
+
+        A calendar that fails to parse is reported and keeps its stored events.
+        The store is only rewritten when something changed.
+
+        Args:
+            calendars_dir: Directory containing the ICS files
+            processor: Processor to update in place; loaded from the store if omitted
+
+        Returns:
+            The updated DataProcessor
+        """
+        if processor is None:
+            stored_events, stored_index = self.store.load()
+            processor = DataProcessor.from_processed(stored_events, self.config)
+        else:
+            # The processor already holds the events; only the versions are needed
+            stored_index = self.store.load_index()
+
+        deleted, delete_prefixes, upsert_keys, upsert_records, index_frames = [], [], [], [], []
+        self.last_changes = {}
+
+        for calendar_name, calendar_config in self.config.calendars.get('calendars', {}).items():
+            ics_path = os.path.join(calendars_dir, calendar_config['file'])
+            old_index = stored_index[stored_index['calendar'] == calendar_name]
+            print(f"\nProcessing {calendar_name} calendar from {ics_path}...")
+            try:
+                changes = self._diff_calendar(calendar_name, ics_path, calendar_config['category'], old_index)
+            except Exception as e:
+                print(f"Error processing {calendar_name} calendar: {str(e)}")
+                index_frames.append(old_index)
+                continue
+
+            deleted.extend(changes['deleted'])
+            delete_prefixes.extend(changes['delete_prefixes'])
+            upsert_keys.extend(changes['upsert_keys'])
+            upsert_records.extend(changes['upsert_records'])
+            index_frames.append(changes['index'])
+            self.last_changes[calendar_name] = {
+                name: len(changes[name]) for name in ('inserted', 'updated', 'deleted')
+            }
+            print(f"{calendar_name} calendar: {len(changes['inserted'])} inserted, "
+                  f"{len(changes['updated'])} updated, {len(changes['deleted'])} deleted")
+
+        if delete_prefixes and len(processor.df):
+            # Occurrence rows of re-expanded or removed recurring series
+            keys = processor.df.index
+            deleted.extend(keys[keys.str.startswith(tuple(delete_prefixes))])
+
+        index_frames = [frame for frame in index_frames if len(frame)]
+        index = (pd.concat(index_frames) if index_frames
+                 else pd.DataFrame(columns=INDEX_COLUMNS, index=pd.Index([], name='key')))
+        if not (deleted or upsert_keys) and index.equals(stored_index):
+            # Nothing changed: keep the processor and the store as they are
+            return processor
+
+        upserts = pd.DataFrame(upsert_records, index=pd.Index(upsert_keys, name='key'),
+                               columns=EVENT_COLUMNS)
+        processor.apply_changes(deleted, upserts)
+        self.store.save(processor.df, index)
+        return processor
+
+    def _diff_calendar(self, calendar_name: str, ics_path: str, calendar_category: str,
+                       old_index: pd.DataFrame) -> Dict:
+        """Compare one export against its stored version index.
+
+        With recurrence expansion enabled, a recurring master is stored as one
+        row per occurrence, keyed "<master key>@<start>". Its occurrences are
+        re-expanded only when the master or any override of its UID changed.
+
+        Returns:
+            Dictionary with inserted/updated/deleted key lists, key prefixes
+            whose rows must be deleted, the upserted keys and records, and
+            the new version index for the calendar
+        """
+        old_versions = dict(zip(old_index.index, zip(old_index['sequence'], old_index['last_modified'])))
+        old_included = dict(zip(old_index.index, old_index['included']))
+        expand = self.parser.expand_recurrences
+        occurrences = {}
+        series = {}
+        changed_uids = set()
+        inserted, updated, deleted, delete_prefixes = [], [], [], []
+        upsert_keys, upsert_records, index_rows = [], [], []
+
+        for identity, block in self.parser.iter_raw_events(ics_path):
+            base_key = f"{calendar_name}|{identity['uid']}|{identity['recurrence_id']}"
+            # Repeated identities (rare, but legal in exports) get their own keys
+            occurrences[base_key] = occurrences.get(base_key, 0) + 1
+            key = base_key if occurrences[base_key] == 1 else f'{base_key}#{occurrences[base_key]}'
+
+            # Without LAST-MODIFIED, the block content itself is the version
+            last_modified = identity['last_modified'] or (
+                'sha1:' + hashlib.sha1(block.encode('utf-8')).hexdigest()
+            )
+            version = (identity['sequence'], last_modified)
+            unchanged = old_versions.get(key) == version
+
+            if expand and (identity['recurring'] or identity['recurrence_id']):
+                series.setdefault(identity['uid'], []).append((key, version, identity, block))
+                if not unchanged:
+                    changed_uids.add(identity['uid'])
+                if identity['recurring']:
+                    # Expanded once all overrides of the UID are known
+                    continue
+
+            if unchanged:
+                index_rows.append((key, calendar_name, identity['uid'], version[0], version[1],
+                                   identity['recurring'], old_included[key]))
+                continue
+
+            record = self.parser.parse_event_block(block, calendar_category)
+            if record is not None:
+                (updated if key in old_versions else inserted).append(key)
+                upsert_keys.append(key)
+                upsert_records.append(record)
+            elif old_included.get(key):
+                # Changed so that it is now filtered out
+                deleted.append(key)
+            index_rows.append((key, calendar_name, identity['uid'], version[0], version[1],
+                               identity['recurring'], record is not None))
+
+        seen = {row[0] for row in index_rows}
+        seen.update(member[0] for members in series.values() for member in members)
+        for key in old_versions:
+            if key in seen:
+                continue
+            if old_included[key]:
+                deleted.append(key)
+            if old_index.at[key, 'recurring']:
+                delete_prefixes.append(f'{key}@')
+            # A vanished override changes the expansion of its master
+            changed_uids.add(old_index.at[key, 'uid'])
+
+        for uid, members in series.items():
+            overrides = [member for member in members if not member[2]['recurring']]
+            for key, version, identity, block in members:
+                if not identity['recurring']:
+                    continue
+                if uid not in changed_uids:
+                    index_rows.append((key, calendar_name, uid, version[0], version[1],
+                                       True, old_included[key]))
+                    continue
+
+                master = icalendar.Event.from_ical(block)
+                overridden = overridden_instants(
+                    (icalendar.Event.from_ical(override[3]) for override in overrides),
+                    self.parser.normalizer
+                )
+                records = list(self.parser.expand_series(master, overridden, calendar_category))
+                delete_prefixes.append(f'{key}@')
+                (updated if key in old_versions else inserted).append(key)
+                upsert_keys.extend(f"{key}@{record['start'].isoformat()}" for record in records)
+                upsert_records.extend(records)
+                index_rows.append((key, calendar_name, uid, version[0], version[1],
+                                   True, bool(records)))
+
+        index = pd.DataFrame(index_rows, columns=['key'] + INDEX_COLUMNS).set_index('key')
+        return {
+            'inserted': inserted,
+            'updated': updated,
+            'deleted': deleted,
+            'delete_prefixes': delete_prefixes,
+            'upsert_keys': upsert_keys,
+            'upsert_records': upsert_records,
+            'index': index
+        }
@@ -0,0 +1,208 @@
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+# Functions shown in the hot-function section of the profile summary
+HOT_FUNCTIONS = (
+    'parse_table', 'parse_ics', 'iter_raw_events', '_event_times', 'to_utc_values',
+    'holiday_mask', 'is_holiday_or_vacation', 'replace_summaries', 'replace_many',
+    '_apply_replacements', '_create_dataframe', '_add_period_columns'
+)
+
+
+def peak_rss_mb() -> Optional[float]:
+    """Peak resident set size of this process so far in MB, or None where unavailable."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in KB on Linux and in bytes on macOS
+    return peak / 1024 / 1024 if sys.platform == 'darwin' else peak / 1024
+
+
+class StageRecord:
+    """Measurements of one pipeline stage.
+
+    Args:
+        name: Stage name, e.g. "parse" or "parse:work" for one calendar
+        events: Number of events the stage handled, for the throughput
+    """
+
+    def __init__(self, name: str, events: Optional[int] = None):
+        self.name = name
+        self.events = events
+        self.wall_seconds = 0.0
+        self.cpu_seconds = 0.0
+        self.peak_rss_mb = None
+        self.rss_growth_mb = None
+        self.traced_peak_mb = None
+        self.details = {}
+
+    def __repr__(self) -> str:
+        return f'StageRecord({self.name}, {self.wall_seconds:.3f}s)'
+
+    @property
+    def events_per_second(self) -> Optional[float]:
+        if not self.events or not self.wall_seconds:
+            return None
+        return self.events / self.wall_seconds
+
+    def to_dict(self) -> Dict:
+        record = {
+            'name': self.name,
+            'wall_seconds': round(self.wall_seconds, 4),
+            'cpu_seconds': round(self.cpu_seconds, 4),
+            'peak_rss_mb': self.peak_rss_mb,
+            'rss_growth_mb': self.rss_growth_mb,
+            'traced_peak_mb': self.traced_peak_mb,
+            'events': self.events,
+            'events_per_second': round(self.events_per_second, 1) if self.events_per_second else None
+        }
+        record.update(self.details)
+        return record
+
+
+class RunReport:
+    """Time and memory of each pipeline stage, written as a JSON run report.
+
+    Each stage records wall time, CPU time, the process's peak RSS at the
+    end of the stage and how much the stage raised it, and the number of
+    events handled. With trace_memory, the peak of Python allocations
+    during the stage (tracemalloc) is recorded too; tracing makes the run
+    noticeably slower, so it is off by default.
+
+    Stages are recorded in the order they finish and are not nested.
+    """
+
+    def __init__(self, command: str = '', trace_memory: bool = False):
+        """Initialize report.
+
+        Args:
+            command: What was run, stored in the report
+            trace_memory: Also record tracemalloc peaks per stage
+        """
+        self.command = command
+        self.trace_memory = trace_memory
+        self.stages: List[StageRecord] = []
+        self.started = datetime.now()
+        self._began = time.perf_counter()
+        self._began_cpu = time.process_time()
+        if trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    def __repr__(self) -> str:
+        return f'RunReport({self.command}, stages={len(self.stages)})'
+
+    @contextmanager
+    def stage(self, name: str, events: Optional[int] = None) -> Iterator[StageRecord]:
+        """Measure the code in the with block as one stage.
+
+        The yielded StageRecord's events and details can be filled in inside
+        the block once they are known.
+        """
+        record = StageRecord(name, events)
+        rss_before = peak_rss_mb()
+        if self.trace_memory:
+            tracemalloc.reset_peak()
+        began, began_cpu = time.perf_counter(), time.process_time()
+        try:
+            yield record
+        finally:
+            record.wall_seconds = time.perf_counter() - began
+            record.cpu_seconds = time.process_time() - began_cpu
+            rss_after = peak_rss_mb()
+            if rss_after is not None:
+                record.peak_rss_mb = round(rss_after, 1)
+                record.rss_growth_mb = round(rss_after - rss_before, 1)
+            if self.trace_memory:
+                record.traced_peak_mb = round(tracemalloc.get_traced_memory()[1] / 1024 / 1024, 1)
+            self.stages.append(record)
+
+    def add(self, name: str, wall_seconds: float, cpu_seconds: float = 0.0,
+            events: Optional[int] = None, **details) -> StageRecord:
+        """Record a stage measured elsewhere, e.g. one calendar parsed in a worker.
+
+        Args:
+            name: Stage name
+            wall_seconds: Wall time of the stage
+            cpu_seconds: CPU time of the stage
+            events: Number of events the stage handled
+            **details: Extra fields stored with the stage (peak_rss_mb is
+                used as the stage's peak RSS)
+        """
+        record = StageRecord(name, events)
+        record.wall_seconds = wall_seconds
+        record.cpu_seconds = cpu_seconds
+        record.peak_rss_mb = details.pop('peak_rss_mb', None)
+        record.details = details
+        self.stages.append(record)
+        return record
+
+    def to_dict(self) -> Dict:
+        peak = peak_rss_mb()
+        return {
+            'command': self.command,
+            'started': self.started.isoformat(timespec='seconds'),
+            'wall_seconds': round(time.perf_counter() - self._began, 4),
+            'cpu_seconds': round(time.process_time() - self._began_cpu, 4),
+            'peak_rss_mb': round(peak, 1) if peak is not None else None,
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'stages': [record.to_dict() for record in self.stages]
+        }
+
+    def write(self, path: str) -> None:
+        """Write the report as JSON."""
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(self.to_dict(), f, indent=2)
+        os.replace(tmp_path, path)
+
+    def summary(self) -> str:
+        """One line per stage, for printing at the end of a run."""
+        lines = [f"{'stage':24} {'wall s':>9} {'cpu s':>9} {'peak MB':>9} {'events/s':>11}"]
+        for record in self.stages:
+            rate = record.events_per_second
+            lines.append(f"{record.name:24} {record.wall_seconds:9.3f} {record.cpu_seconds:9.3f} "
+                         f"{record.peak_rss_mb if record.peak_rss_mb is not None else '':>9} "
+                         f"{f'{rate:.0f}' if rate else '':>11}")
+        return '\n'.join(lines)
+
+
+def write_profile(profiler, output_dir: str, top: int = 40) -> List[str]:
+    """Dump a cProfile.Profile as pstats plus a readable summary.
+
+    Args:
+        profiler: Stopped cProfile.Profile
+        output_dir: Directory to write profile.pstats and profile.txt into
+        top: Number of functions listed by cumulative time
+
+    Returns:
+        Paths of the written files
+    """
+    import io
+    import pstats
+
+    stats_path = os.path.join(output_dir, 'profile.pstats')
+    text_path = os.path.join(output_dir, 'profile.txt')
+    profiler.dump_stats(stats_path)
+
+    buffer = io.StringIO()
+    stats = pstats.Stats(stats_path, stream=buffer).strip_dirs()
+    buffer.write(f"Top {top} functions by cumulative time\n")
+    stats.sort_stats('cumulative').print_stats(top)
+    buffer.write("\nHot functions\n")
+    stats.sort_stats('cumulative').print_stats('|'.join(rf'\b{name}\b' for name in HOT_FUNCTIONS))
+    with open(text_path, 'w') as f:
+        f.write(buffer.getvalue())
+    return [stats_path, text_path]
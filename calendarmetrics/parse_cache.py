@@ -0,0 +1,175 @@
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+from calendarmetrics.event_table import EventTable
+
+# Bump when the parser output or the on-disk layout changes
+CACHE_VERSION = 4
+
+
+def config_fingerprint(config_loader, **extra) -> str:
+    """Hash the configuration sections that change parser output.
+
+    Args:
+        config_loader: ConfigLoader instance
+        **extra: Additional settings to fold into the fingerprint
+
+    Returns:
+        Hex digest identifying the configuration
+    """
+    relevant = {
+        'version': CACHE_VERSION,
+        'active_range': config_loader.get_active_range(),
+        'holidays': config_loader.holidays,
+        'replacements': config_loader.get_text_replacements(),
+        'replacement_mode': config_loader.get_text_replacement_mode(),
+        'parsing': config_loader.get_parsing_settings(),
+        **extra
+    }
+    payload = json.dumps(relevant, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+class ParseCache:
+    """On-disk Feather cache of parsed calendar events.
+
+    Entries are keyed by the ICS file content and a fingerprint of the config
+    that affects parsing (active range, holidays and text replacements), so a
+    changed export or config never serves stale events. File size and mtime
+    are remembered per file so unchanged files are not re-hashed.
+    """
+
+    def __init__(self, cache_dir: str, config_loader, max_bytes: int = 512 * 1024 * 1024):
+        """Initialize cache.
+
+        Args:
+            cache_dir: Directory holding cache entries
+            config_loader: ConfigLoader instance whose settings affect parsing
+            max_bytes: Total size of entries kept before the least recently
+                used ones are evicted
+        """
+        self.cache_dir = Path(cache_dir)
+        self.stamps_dir = self.cache_dir / 'stamps'
+        self.stamps_dir.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.config_fingerprint = config_fingerprint(config_loader)
+
+    def __repr__(self) -> str:
+        return f'ParseCache({self.cache_dir})'
+
+    def _content_hash(self, ics_path: str) -> str:
+        """Return the content hash of a file, reusing it while size and mtime match."""
+        stat = os.stat(ics_path)
+        path_key = hashlib.sha1(os.path.abspath(ics_path).encode('utf-8')).hexdigest()
+        stamp_path = self.stamps_dir / f'{path_key}.json'
+
+        try:
+            with open(stamp_path) as f:
+                stamp = json.load(f)
+            if stamp['size'] == stat.st_size and stamp['mtime_ns'] == stat.st_mtime_ns:
+                return stamp['sha256']
+        except (FileNotFoundError, ValueError, KeyError):
+            pass
+
+        digest = hashlib.sha256()
+        with open(ics_path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b''):
+                digest.update(chunk)
+        content_hash = digest.hexdigest()
+
+        self._write_atomic(stamp_path, json.dumps({
+            'size': stat.st_size,
+            'mtime_ns': stat.st_mtime_ns,
+            'sha256': content_hash
+        }).encode('utf-8'))
+        return content_hash
+
+    def _entry_path(self, ics_path: str) -> Path:
+        key = hashlib.sha256(
+            f'{self._content_hash(ics_path)}:{self.config_fingerprint}'.encode('utf-8')
+        ).hexdigest()
+        return self.cache_dir / f'{key}.feather'
+
+    def load(self, ics_path: str, calendar_category: str) -> Optional[EventTable]:
+        """Return the cached events of a file, or None on a miss.
+
+        Args:
+            ics_path: Path to the ICS file
+            calendar_category: Category of the calendar the file belongs to
+
+        Returns:
+            EventTable, or None
+        """
+        entry = self._entry_path(ics_path)
+        try:
+            df = pd.read_feather(entry)
+        except (FileNotFoundError, OSError):
+            return None
+
+        # Mark as recently used for eviction
+        try:
+            os.utime(entry)
+        except OSError:
+            pass
+
+        summaries = df['micro_activities'].cat
+        return EventTable.from_arrays(
+            df['start'].to_numpy(dtype='datetime64[ns]'),
+            df['end'].to_numpy(dtype='datetime64[ns]'),
+            summaries.codes.to_numpy(dtype=np.int32),
+            list(summaries.categories),
+            np.zeros(len(df), dtype=np.int32),
+            [calendar_category]
+        )
+
+    def store(self, ics_path: str, table: EventTable) -> None:
+        """Write the events of a file and evict old entries if needed.
+
+        Args:
+            ics_path: Path to the ICS file
+            table: EventTable of the file's events (all of one category)
+        """
+        entry = self._entry_path(ics_path)
+        df = pd.DataFrame({
+            'start': table.start,
+            'end': table.end,
+            'micro_activities': pd.Categorical.from_codes(
+                table.summary_codes, categories=pd.Index(table.summaries, dtype=object)
+            )
+        })
+        tmp_path = entry.with_suffix(f'.{os.getpid()}.tmp')
+        df.to_feather(tmp_path)
+        os.replace(tmp_path, entry)
+        self.evict()
+
+    def evict(self) -> None:
+        """Remove least recently used entries until the cache fits in max_bytes."""
+        entries = []
+        for path in self.cache_dir.glob('*.feather'):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                pass
+            total -= size
+
+    def _write_atomic(self, path: Path, data: bytes) -> None:
+        tmp_path = path.with_suffix(f'.{os.getpid()}.tmp')
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
@@ -0,0 +1,147 @@
+from typing import List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+
+class DailyActivityIndex:
+    """Day x macro-activity prefix sums for arbitrary date-range queries.
+
+    Hours are summed once per day and macro activity into a matrix, and its
+    cumulative sum along the days is kept with a leading row of zeros, so
+    the hours of any range of days are one row subtraction: O(activities)
+    per query, whatever the number of events. Series over many ranges, such
+    as rolling windows, cost O(days).
+
+    Events count towards the day they start on, like every other
+    aggregation; with segments.split_at set to "day" this is exact.
+    Dates outside the data are clipped, so they simply contribute no hours.
+    """
+
+    # Differences below this are float noise from the cumulative sums
+    TOLERANCE = 1e-9
+
+    def __init__(self, df: pd.DataFrame):
+        """Build the index from processed events.
+
+        Args:
+            df: DataFrame with date, macro_activities and duration columns
+        """
+        days = np.asarray(pd.to_datetime(df['date']).to_numpy(), dtype='datetime64[D]')
+        codes, activities = pd.factorize(df['macro_activities'].astype(str), sort=True)
+        self.activities: List[str] = list(activities)
+
+        if len(days):
+            self.first_day = days.min()
+            day_numbers = (days - self.first_day).astype(np.int64)
+            n_days = int(day_numbers.max()) + 1
+        else:
+            self.first_day = np.datetime64('1970-01-01', 'D')
+            day_numbers = np.zeros(0, dtype=np.int64)
+            n_days = 0
+
+        width = len(self.activities)
+        hours = np.bincount(day_numbers * width + codes,
+                            weights=df['duration'].to_numpy(dtype=float),
+                            minlength=n_days * width).reshape(n_days, width)
+        self._cumulative = np.zeros((n_days + 1, width))
+        np.cumsum(hours, axis=0, out=self._cumulative[1:])
+
+    def __repr__(self) -> str:
+        return f'DailyActivityIndex(days={self.days}, activities={len(self.activities)})'
+
+    def __len__(self) -> int:
+        return self.days
+
+    @property
+    def days(self) -> int:
+        return len(self._cumulative) - 1
+
+    @property
+    def last_day(self) -> np.datetime64:
+        return self.first_day + max(self.days - 1, 0)
+
+    def _bounds(self, start, end) -> Tuple[int, int]:
+        """Rows of the cumulative matrix delimiting [start, end], clipped to the data."""
+        lo = 0 if start is None else self._offset(start)
+        hi = self.days if end is None else self._offset(end) + 1
+        lo = min(max(lo, 0), self.days)
+        hi = min(max(hi, lo), self.days)
+        return lo, hi
+
+    def _offset(self, day) -> int:
+        return int((np.datetime64(pd.Timestamp(day).date(), 'D') - self.first_day).astype(np.int64))
+
+    def _clean(self, hours: np.ndarray) -> np.ndarray:
+        return np.where(np.abs(hours) < self.TOLERANCE, 0.0, hours)
+
+    def hours(self, start=None, end=None) -> pd.Series:
+        """Hours per macro activity between two dates, both included.
+
+        Args:
+            start: First day (date, datetime or ISO string), or None for the first day of data
+            end: Last day, or None for the last day of data
+
+        Returns:
+            Series of hours indexed by macro activity (every activity, zeros included)
+        """
+        lo, hi = self._bounds(start, end)
+        return pd.Series(self._clean(self._cumulative[hi] - self._cumulative[lo]),
+                         index=pd.Index(self.activities, name='macro_activities'), name='hours')
+
+    def percentages(self, start=None, end=None) -> pd.DataFrame:
+        """Hours and percentages per macro activity between two dates, both included.
+
+        Returns:
+            DataFrame with macro_activities, hours and percentage columns, in
+            the format of DataProcessor.get_period_percentages; activities
+            without hours in the range are left out
+        """
+        hours = self.hours(start, end)
+        hours = hours[hours > 0]
+        if not len(hours):
+            return pd.DataFrame(columns=['macro_activities', 'hours', 'percentage'])
+        return pd.DataFrame({
+            'hours': hours,
+            'percentage': (hours / hours.sum()) * 100
+        }).rename_axis('macro_activities').reset_index()
+
+    def daily(self, start=None, end=None) -> pd.DataFrame:
+        """Hours per day and macro activity, with zeros for days without events.
+
+        Returns:
+            DataFrame indexed by date with one column per macro activity
+        """
+        return self.rolling(1, start, end)
+
+    def rolling(self, window_days: int, start=None, end=None, average: bool = False) -> pd.DataFrame:
+        """Hours of the trailing window ending on each day, per macro activity.
+
+        Args:
+            window_days: Window length in days (28 for four weeks)
+            start: First day of the series, or None for the first day of data
+            end: Last day of the series, or None for the last day of data
+            average: Divide by the window length, giving average hours per day
+
+        Returns:
+            DataFrame indexed by date with one column per macro activity.
+            Windows reaching before the first day of data only count the
+            days that have data.
+        """
+        if window_days < 1:
+            raise ValueError(f"Invalid window length: {window_days}")
+        lo, hi = self._bounds(start, end)
+        ends = np.arange(lo, hi) + 1
+        starts = np.maximum(ends - window_days, 0)
+        values = self._clean(self._cumulative[ends] - self._cumulative[starts])
+        if average:
+            values = values / window_days
+        dates = pd.Index((self.first_day + np.arange(lo, hi)).astype('datetime64[ns]'), name='date')
+        return pd.DataFrame(values, index=dates, columns=pd.Index(self.activities, name='macro_activities'))
+
+    def total(self, start=None, end=None, activity: Optional[str] = None) -> float:
+        """Total hours between two dates, both included, optionally for one activity."""
+        hours = self.hours(start, end)
+        if activity is None:
+            return float(hours.sum())
+        return float(hours.get(activity, 0.0))
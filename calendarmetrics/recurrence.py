@@ -0,0 +1,281 @@
+from datetime import date, datetime, timedelta
+from typing import Iterable, List, Optional, Set, Tuple
+
+import icalendar
+import numpy as np
+import pytz
+from dateutil import rrule
+
+from calendarmetrics.timezones import TimezoneNormalizer
+
+# RRULE weekday codes in Python weekday order
+WEEKDAYS = ('MO', 'TU', 'WE', 'TH', 'FR', 'SA', 'SU')
+
+
+class RecurrenceExpander:
+    """Expand recurring VEVENTs into occurrences inside a time window.
+
+    RRULE instances are generated lazily and clipped to the window, so
+    unbounded series cost only the occurrences that are actually in range.
+    Plain FREQ=DAILY and FREQ=WEEKLY rules (optionally with INTERVAL, COUNT,
+    UNTIL, BYDAY and WKST) are expanded with array arithmetic; other rules go
+    through dateutil. RDATE adds instances and EXDATE or overridden
+    RECURRENCE-IDs remove them.
+
+    Occurrences follow the wall-clock time of DTSTART in its own timezone,
+    so a 9:00 meeting stays at 9:00 local time across DST changes.
+    """
+
+    FAST_FREQS = ('DAILY', 'WEEKLY')
+    FAST_PARTS = {'FREQ', 'INTERVAL', 'COUNT', 'UNTIL', 'BYDAY', 'WKST'}
+
+    # Slack for reading the UTC window in local wall time (max UTC offset is 14h)
+    LOCAL_MARGIN = timedelta(days=1)
+
+    # How far past today unbounded series are expanded without an end date
+    DEFAULT_HORIZON = timedelta(days=366)
+
+    def __init__(self, window_start: Optional[datetime], window_end: Optional[datetime],
+                 normalizer: Optional[TimezoneNormalizer] = None):
+        """Initialize expander.
+
+        Args:
+            window_start: Naive UTC start of the window, or None
+            window_end: Naive UTC end of the window, or None for today plus
+                DEFAULT_HORIZON
+            normalizer: Timezone rules shared with CalendarParser (floating
+                times, all-day ends); defaults to TimezoneNormalizer()
+        """
+        self.window_start = window_start
+        self.window_end = window_end or (
+            datetime.now(pytz.UTC).replace(tzinfo=None) + self.DEFAULT_HORIZON
+        )
+        self.normalizer = normalizer or TimezoneNormalizer()
+
+    @staticmethod
+    def is_recurring(event: icalendar.Event) -> bool:
+        return 'rrule' in event or 'rdate' in event
+
+    def expand(self, event: icalendar.Event,
+               overridden: Iterable[datetime] = ()) -> Tuple[np.ndarray, np.ndarray]:
+        """Expand one recurring event.
+
+        Args:
+            event: VEVENT with RRULE and/or RDATE
+            overridden: Naive UTC instants of instances replaced by
+                RECURRENCE-ID overrides
+
+        Returns:
+            Tuple of (starts, ends) as naive UTC datetime64[ns] arrays, sorted
+            by start, holding only occurrences that overlap the window
+        """
+        return self.expand_many([(event, overridden)])[0]
+
+    def expand_many(self, series: Iterable[Tuple[icalendar.Event, Iterable[datetime]]]
+                    ) -> List[Tuple[np.ndarray, np.ndarray]]:
+        """Expand many recurring events, converting their occurrences to UTC together.
+
+        The local starts of every series are converted in one batch per
+        timezone instead of one batch per series.
+
+        Args:
+            series: (event, overridden) pairs, as taken by expand
+
+        Returns:
+            (starts, ends) of each series, in input order, as expand returns them
+        """
+        plans = [self._local_plan(event, overridden) for event, overridden in series]
+        if not plans:
+            return []
+        sizes = [len(plan[0]) for plan in plans]
+        local = np.concatenate([plan[0] for plan in plans])
+        zones = np.empty(len(plans), dtype=object)
+        zones[:] = [plan[1] for plan in plans]
+        if all(zone is zones[0] for zone in zones):
+            utc = self.normalizer.localize_many(local, zones[0])
+        else:
+            utc = self.normalizer.to_utc_many(local, np.repeat(zones, sizes))
+        return [self._finish(starts, *plan[2:])
+                for starts, plan in zip(np.split(utc, np.cumsum(sizes)[:-1]), plans)]
+
+    def _local_plan(self, event: icalendar.Event, overridden: Iterable[datetime]) -> Tuple:
+        """Local wall-clock starts of a series and what _finish needs after UTC conversion.
+
+        Returns:
+            Tuple of (local starts, tzinfo, excluded UTC instants, length, all-day flag)
+        """
+        dtstart = event['dtstart'].dt
+        all_day = isinstance(dtstart, date) and not isinstance(dtstart, datetime)
+        if 'dtend' in event:
+            length = event['dtend'].dt - dtstart
+        elif 'duration' in event:
+            length = event['duration'].dt
+        else:
+            length = timedelta(0)
+
+        # All-day series are taken as they are, floating ones in the floating zone
+        tz = pytz.UTC if all_day else dtstart.tzinfo
+        local_start = (datetime.combine(dtstart, datetime.min.time()) if all_day
+                       else dtstart.replace(tzinfo=None))
+
+        # Window in local wall time, widened so the exact UTC check decides
+        local_lo = None
+        if self.window_start is not None:
+            local_lo = self.window_start - max(length, timedelta(0)) - self.LOCAL_MARGIN
+            if all_day:
+                local_lo -= timedelta(days=1)
+        local_hi = self.window_end + self.LOCAL_MARGIN
+
+        rules = self._as_list(event.get('rrule'))
+        local = [self._expand_rule(rule, local_start, tz, local_lo, local_hi) for rule in rules]
+        # DTSTART is the first instance even if the rule does not match it,
+        # unless every rule already ended before it
+        untils = [self._local_until(rule, tz) for rule in rules]
+        if not rules or any(until is None or local_start <= until for until in untils):
+            local.append(np.array([local_start], dtype='datetime64[ns]'))
+        rdates = [self._local_value(value, tz)
+                  for value in self._date_values(event.get('rdate'))]
+        local.append(np.array([d for d in rdates if local_lo is None or d >= local_lo],
+                              dtype='datetime64[ns]'))
+        # Sorted and deduplicated; cheaper than np.unique on these mostly sorted arrays
+        local = np.sort(np.concatenate(local))
+        if len(local) > 1:
+            local = local[np.concatenate(([True], local[1:] != local[:-1]))]
+
+        excluded = {self.normalizer.to_utc(value) for value in self._date_values(event.get('exdate'))}
+        excluded.update(overridden)
+        return local, tz, excluded, length, all_day
+
+    def _finish(self, starts: np.ndarray, excluded: Set[datetime], length: timedelta,
+                all_day: bool) -> Tuple[np.ndarray, np.ndarray]:
+        """Drop excluded instances, add the ends and clip the UTC starts to the window."""
+        if excluded and len(starts):
+            starts = starts[~np.isin(starts, np.array(sorted(excluded), dtype='datetime64[ns]'))]
+
+        if all_day:
+            # Same all-day end rule as CalendarParser
+            ends = starts + (np.timedelta64(length) + np.timedelta64(
+                self.normalizer.all_day_extension, 'us'
+            )).astype('timedelta64[ns]')
+        else:
+            ends = starts + np.timedelta64(length).astype('timedelta64[ns]')
+
+        keep = starts <= np.datetime64(self.window_end)
+        if self.window_start is not None:
+            keep &= ends >= np.datetime64(self.window_start)
+        return starts[keep], ends[keep]
+
+    def _expand_rule(self, rule: icalendar.vRecur, local_start: datetime, tz,
+                     local_lo: Optional[datetime], local_hi: datetime) -> np.ndarray:
+        """Expand one RRULE to local wall-clock starts within [local_lo, local_hi]."""
+        until = self._local_until(rule, tz)
+        count = int(rule['COUNT'][0]) if 'COUNT' in rule else None
+        interval = int(rule.get('INTERVAL', [1])[0])
+        if until is not None:
+            local_hi = min(local_hi, until)
+        if local_lo is not None and local_lo < local_start:
+            local_lo = None
+
+        freq = rule['FREQ'][0].upper()
+        if (freq in self.FAST_FREQS and set(rule) <= self.FAST_PARTS and
+                all(day in WEEKDAYS for day in rule.get('BYDAY', []))):
+            if freq == 'DAILY' and 'BYDAY' not in rule:
+                return self._expand_daily(local_start, interval, count, local_lo, local_hi)
+            if freq == 'WEEKLY':
+                return self._expand_weekly(rule, local_start, interval, count, local_lo, local_hi)
+
+        parts = {key: value for key, value in rule.items() if key != 'UNTIL'}
+        generic = rrule.rrulestr(icalendar.vRecur(parts).to_ical().decode(), dtstart=local_start)
+        if local_hi < local_start:
+            return np.array([], dtype='datetime64[ns]')
+        instances = generic.between(local_lo or local_start, local_hi, inc=True)
+        return np.array(instances, dtype='datetime64[ns]')
+
+    @staticmethod
+    def _expand_daily(local_start: datetime, interval: int, count: Optional[int],
+                      local_lo: Optional[datetime], local_hi: datetime) -> np.ndarray:
+        step = np.timedelta64(interval, 'D')
+        first = 0 if local_lo is None else -(-(local_lo - local_start) // timedelta(days=interval))
+        last = (local_hi - local_start) // timedelta(days=interval)
+        if count is not None:
+            last = min(last, count - 1)
+        if last < first:
+            return np.array([], dtype='datetime64[ns]')
+        index = np.arange(first, last + 1)
+        return np.datetime64(local_start, 'ns') + index * step.astype('timedelta64[ns]')
+
+    @staticmethod
+    def _expand_weekly(rule: icalendar.vRecur, local_start: datetime, interval: int,
+                       count: Optional[int], local_lo: Optional[datetime],
+                       local_hi: datetime) -> np.ndarray:
+        week_start = WEEKDAYS.index(rule.get('WKST', ['MO'])[0].upper())
+        days = rule.get('BYDAY') or [WEEKDAYS[local_start.weekday()]]
+        offsets = np.array(sorted({(WEEKDAYS.index(day.upper()) - week_start) % 7 for day in days}))
+
+        # Start of the week containing DTSTART, keeping DTSTART's time of day
+        first_week = local_start - timedelta(days=(local_start.weekday() - week_start) % 7)
+        period = timedelta(days=7 * interval)
+        first = 0 if local_lo is None else max(0, (local_lo - first_week) // period)
+        last = (local_hi - first_week) // period
+        if last < first:
+            return np.array([], dtype='datetime64[ns]')
+
+        base = np.datetime64(first_week, 'ns')
+        weeks = np.arange(first, last + 1)[:, None]
+        starts = (base + (weeks * 7 * interval + offsets[None, :]).astype('timedelta64[D]')
+                  .astype('timedelta64[ns]'))
+        keep = starts >= np.datetime64(local_start, 'ns')
+        if count is not None:
+            # Instances before DTSTART in its own week do not count
+            skipped = int((base + offsets.astype('timedelta64[D]').astype('timedelta64[ns]')
+                           < np.datetime64(local_start, 'ns')).sum())
+            index = weeks * len(offsets) + np.arange(len(offsets))[None, :] - skipped
+            keep &= index < count
+        keep &= starts <= np.datetime64(local_hi, 'ns')
+        if local_lo is not None:
+            keep &= starts >= np.datetime64(local_lo, 'ns')
+        return starts[keep]
+
+    def _local_until(self, rule: icalendar.vRecur, tz) -> Optional[datetime]:
+        if 'UNTIL' not in rule:
+            return None
+        until = rule['UNTIL'][0]
+        if isinstance(until, date) and not isinstance(until, datetime):
+            return datetime.combine(until, datetime.max.time())
+        return self._local_value(until, tz)
+
+    def _local_value(self, value, tz) -> datetime:
+        """Express a date or datetime in the series' local wall time."""
+        if isinstance(value, date) and not isinstance(value, datetime):
+            return datetime.combine(value, datetime.min.time())
+        if value.tzinfo is not None:
+            value = value.astimezone(tz or self.normalizer.floating_zone)
+        return value.replace(tzinfo=None)
+
+    @staticmethod
+    def _as_list(value) -> List:
+        if value is None:
+            return []
+        return value if isinstance(value, list) else [value]
+
+    def _date_values(self, prop) -> List:
+        """Flatten RDATE/EXDATE properties into dates and datetimes."""
+        values = []
+        for entry in self._as_list(prop):
+            for item in getattr(entry, 'dts', []):
+                value = item.dt
+                if isinstance(value, tuple):
+                    # PERIOD values: only the start matters here
+                    value = value[0]
+                values.append(value)
+        return values
+
+
+def overridden_instants(events: Iterable[icalendar.Event],
+                        normalizer: Optional[TimezoneNormalizer] = None) -> Set[datetime]:
+    """Collect the naive UTC RECURRENCE-ID instants of override events."""
+    normalizer = normalizer or TimezoneNormalizer()
+    return {
+        normalizer.to_utc(event['recurrence-id'].dt)
+        for event in events if 'recurrence-id' in event
+    }
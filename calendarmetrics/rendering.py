@@ -0,0 +1,209 @@
+import hashlib
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Dict, List, Optional
+
+import pandas as pd
+import plotly
+
+from calendarmetrics.visualizer import Visualizer
+
+MANIFEST_NAME = 'render_manifest.json'
+
+# Bump when the manifest layout or the hashed inputs change
+MANIFEST_VERSION = 2
+
+# Visualizer owned by each worker process, built once by _init_worker
+_worker_visualizer = None
+
+
+def _init_worker(config_loader) -> None:
+    """Build the per-process Visualizer used by _build_figure and _render_figure."""
+    global _worker_visualizer
+    _worker_visualizer = Visualizer(config_loader)
+
+
+def _build_figure(spec: 'FigureSpec'):
+    """Build the figure of one spec in a worker."""
+    return spec.build(_worker_visualizer)
+
+
+def _render_figure(spec: 'FigureSpec', path: str, mode: str) -> str:
+    """Build one figure and write it to its HTML file in a worker."""
+    Visualizer.write_figure(_build_figure(spec), path, mode)
+    return path
+
+
+class FigureSpec:
+    """The inputs of one output figure: a Visualizer plot method and its data.
+
+    Args:
+        name: Output name (file name without extension)
+        plot: Name of the Visualizer method that builds the figure
+        data: DataFrame passed to the plot method; only what the figure
+            shows should be included, since it decides when the figure is
+            rendered again
+        title: Optional title passed to the plot method
+    """
+
+    def __init__(self, name: str, plot: str, data: pd.DataFrame, title: Optional[str] = None):
+        self.name = name
+        self.plot = plot
+        self.data = data
+        self.title = title
+
+    def __repr__(self) -> str:
+        return f'FigureSpec({self.name}, {self.plot}, rows={len(self.data)})'
+
+    def build(self, visualizer: Visualizer):
+        """Build the figure with the given Visualizer."""
+        plot = getattr(visualizer, self.plot)
+        if self.title is None:
+            return plot(self.data.copy())
+        return plot(self.data.copy(), self.title)
+
+    def digest(self, context: str = '') -> str:
+        """Hash of everything the figure is built from."""
+        h = hashlib.sha256()
+        h.update(json.dumps([self.plot, self.title, context]).encode())
+        h.update(json.dumps([str(column) for column in self.data.columns]).encode())
+        h.update(pd.util.hash_pandas_object(self.data, index=True).to_numpy().tobytes())
+        return h.hexdigest()
+
+
+class FigureRenderer:
+    """Render figures in parallel, skipping those whose inputs did not change.
+
+    The hash of each figure's input slice is kept in a manifest in the
+    output directory. On the next run a figure whose hash matches and whose
+    file still exists is not built again, so a steady-state run only
+    rewrites the figures of periods that received new events. The rest are
+    built and written on a process pool.
+
+    In dashboard mode all figures share one file: it is skipped only when
+    no figure changed, and otherwise rebuilt from every figure.
+    """
+
+    def __init__(self, config_loader, output_dir: str, mode: str = 'standalone', workers: int = 1):
+        """Initialize renderer.
+
+        Args:
+            config_loader: ConfigLoader instance used to build the Visualizer
+            output_dir: Directory the HTML files and the manifest are written to
+            mode: One of Visualizer.RENDER_MODES
+            workers: Number of worker processes (1 renders in-process, 0 uses all cores)
+        """
+        if mode not in Visualizer.RENDER_MODES:
+            raise ValueError(f"Invalid render mode: {mode}")
+        self.config = config_loader
+        self.output_dir = output_dir
+        self.mode = mode
+        self.workers = workers if workers > 0 else (os.cpu_count() or 1)
+        self.manifest_path = os.path.join(output_dir, MANIFEST_NAME)
+
+    def __repr__(self) -> str:
+        return f'FigureRenderer({self.output_dir}, mode={self.mode}, workers={self.workers})'
+
+    def render(self, specs: List[FigureSpec]) -> List[str]:
+        """Write the figures that changed since the last run.
+
+        Args:
+            specs: Figures to render
+
+        Returns:
+            Paths of the HTML files written by this run
+        """
+        context = self._context()
+        hashes = {spec.name: spec.digest(context) for spec in specs}
+        previous = self._load_manifest()
+
+        if self.mode == 'dashboard':
+            written = self._render_dashboard(specs, hashes, previous)
+        else:
+            stale = [spec for spec in specs
+                     if previous.get(spec.name) != hashes[spec.name]
+                     or not os.path.exists(self._path(spec.name))]
+            written = self._render_files(stale)
+
+        self._save_manifest(hashes)
+        return written
+
+    def _render_files(self, specs: List[FigureSpec]) -> List[str]:
+        if self.workers == 1 or len(specs) <= 1:
+            _init_worker(self.config)
+            return [_render_figure(spec, self._path(spec.name), self.mode) for spec in specs]
+
+        if self.mode == 'shared':
+            # Copy plotly.min.js once instead of racing the workers on it
+            self._write_plotlyjs()
+
+        written = []
+        with ProcessPoolExecutor(max_workers=min(self.workers, len(specs)),
+                                 initializer=_init_worker,
+                                 initargs=(self.config,)) as executor:
+            futures = [executor.submit(_render_figure, spec, self._path(spec.name), self.mode)
+                       for spec in specs]
+            for future in as_completed(futures):
+                written.append(future.result())
+        return written
+
+    def _render_dashboard(self, specs: List[FigureSpec], hashes: Dict[str, str],
+                          previous: Dict[str, str]) -> List[str]:
+        path = self._path('dashboard')
+        if previous == hashes and os.path.exists(path):
+            return []
+
+        if self.workers == 1 or len(specs) <= 1:
+            _init_worker(self.config)
+            figures = [_build_figure(spec) for spec in specs]
+        else:
+            with ProcessPoolExecutor(max_workers=min(self.workers, len(specs)),
+                                     initializer=_init_worker,
+                                     initargs=(self.config,)) as executor:
+                figures = list(executor.map(_build_figure, specs))
+
+        Visualizer(self.config).write_dashboard(
+            {spec.name: fig for spec, fig in zip(specs, figures)}, path
+        )
+        return [path]
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.output_dir, f'{name}.html')
+
+    def _write_plotlyjs(self) -> None:
+        from plotly.offline import get_plotlyjs
+
+        path = os.path.join(self.output_dir, 'plotly.min.js')
+        if not os.path.exists(path):
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write(get_plotlyjs())
+
+    def _context(self) -> str:
+        """Settings that change every figure: mode, colors, theme and plotly version."""
+        visualizer = Visualizer(self.config)
+        return json.dumps({
+            'mode': self.mode,
+            'plotly': plotly.__version__,
+            'colors': visualizer.colors,
+            'layout': visualizer.layout_settings,
+            'daily_view_range': self.config.time_periods.get('daily_view_range'),
+            'daily': visualizer.daily_settings()
+        }, sort_keys=True, default=str)
+
+    def _load_manifest(self) -> Dict[str, str]:
+        try:
+            with open(self.manifest_path) as f:
+                manifest = json.load(f)
+        except (FileNotFoundError, ValueError):
+            return {}
+        if manifest.get('version') != MANIFEST_VERSION or manifest.get('mode') != self.mode:
+            return {}
+        return manifest.get('figures', {})
+
+    def _save_manifest(self, hashes: Dict[str, str]) -> None:
+        tmp_path = self.manifest_path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump({'version': MANIFEST_VERSION, 'mode': self.mode, 'figures': hashes},
+                      f, indent=2, sort_keys=True)
+        os.replace(tmp_path, self.manifest_path)
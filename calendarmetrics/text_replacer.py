@@ -0,0 +1,97 @@
+import re
+from collections import OrderedDict
+from typing import Dict, Iterable, List
+
+import pandas as pd
+
+
+class TextReplacer:
+    """Compiled single-pass text replacement engine.
+
+    All rules are combined into one regular expression and applied in a
+    single left-to-right scan:
+
+    - At each position the longest matching rule wins, regardless of the
+      order rules are listed in.
+    - Replaced text is never scanned again, so rules do not chain (with
+      "dev" -> "development", "development" stays "development").
+    - In "word" mode a rule only matches when it is not surrounded by
+      letters, digits or underscores; in "substring" mode it matches anywhere.
+
+    Results are memoized per raw string, since calendar summaries repeat
+    heavily.
+    """
+
+    MATCH_MODES = ('substring', 'word')
+
+    def __init__(self, replacements: Dict[str, str], match: str = 'substring',
+                 cache_size: int = 65536):
+        """Compile replacement rules.
+
+        Args:
+            replacements: Mapping of text to replace to its replacement
+            match: "substring" or "word"
+            cache_size: Maximum number of memoized summaries
+        """
+        if match not in self.MATCH_MODES:
+            raise ValueError(f"Invalid replacement match mode: {match}")
+
+        self.replacements = {str(old): str(new) for old, new in replacements.items() if old}
+        self.match = match
+        self._pattern = self._compile()
+        self.cache_size = cache_size
+        # Least recently used first; a plain dict keeps the instance picklable for worker processes
+        self._cache: OrderedDict = OrderedDict()
+
+    def __repr__(self) -> str:
+        return f'TextReplacer({len(self.replacements)} rules, match={self.match})'
+
+    def __getstate__(self) -> Dict:
+        # Workers start with an empty cache instead of a copy of the parent's
+        state = self.__dict__.copy()
+        state['_cache'] = OrderedDict()
+        return state
+
+    def _compile(self):
+        if not self.replacements:
+            return None
+        # Python alternation is leftmost-first, so longest keys go first
+        alternatives = '|'.join(
+            re.escape(old) for old in sorted(self.replacements, key=len, reverse=True)
+        )
+        if self.match == 'word':
+            alternatives = rf'(?<!\w)(?:{alternatives})(?!\w)'
+        return re.compile(alternatives)
+
+    def replace(self, text: str) -> str:
+        """Apply the replacements to one string, memoized."""
+        cache = self._cache
+        if text in cache:
+            cache.move_to_end(text)
+            return cache[text]
+        result = self._replace(text)
+        if self.cache_size:
+            cache[text] = result
+            if len(cache) > self.cache_size:
+                cache.popitem(last=False)
+        return result
+
+    def _replace(self, text: str) -> str:
+        if self._pattern is None:
+            return text
+        return self._pattern.sub(lambda m: self.replacements[m.group(0)], text)
+
+    def replace_many(self, values: Iterable[str]) -> List[str]:
+        """Apply the replacements to a whole column of strings.
+
+        Each distinct value is replaced once.
+
+        Args:
+            values: Strings to transform
+
+        Returns:
+            List of replaced strings, in input order
+        """
+        codes, uniques = pd.factorize(pd.Series(list(values), dtype=object))
+        replaced = pd.Series([self.replace(value) for value in uniques], dtype=object)
+        return replaced.to_numpy()[codes].tolist() if len(codes) else []
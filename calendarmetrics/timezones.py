@@ -0,0 +1,209 @@
+from datetime import date, datetime, timedelta, timezone, tzinfo
+from typing import Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+import pytz
+
+
+class TimezoneNormalizer:
+    """Convert event times to naive UTC, one timezone at a time.
+
+    Times are collected as naive local wall-clock values together with their
+    tzinfo and converted per zone with a single pandas tz_localize call, which
+    works on the zone's transition table instead of one astimezone call per
+    value. Resolved zones are cached per tzinfo.
+
+    The cases the ICS format leaves open are handled explicitly:
+
+    - Floating times (no TZID and no "Z") are read in floating_timezone,
+      UTC unless configured otherwise.
+    - All-day dates are never shifted by a timezone: they start at midnight
+      of their date and, depending on all_day_end, end either at the end of
+      their DTEND date ("end_of_day", the historical behaviour) or at DTEND
+      midnight ("exclusive", as RFC 5545 defines it).
+    - Wall times that occur twice when clocks go back resolve to the first
+      occurrence, and wall times skipped when clocks go forward are read
+      with the offset from before the change, as Python's zoneinfo does.
+    """
+
+    ALL_DAY_ENDS = ('end_of_day', 'exclusive')
+
+    # Offset from DTEND midnight to the end of that day
+    END_OF_DAY = datetime.combine(date.min, datetime.max.time()) - datetime.min
+
+    def __init__(self, floating_timezone: str = 'UTC', all_day_end: str = 'end_of_day'):
+        """Initialize normalizer.
+
+        Args:
+            floating_timezone: IANA name of the zone floating times are read in
+            all_day_end: One of ALL_DAY_ENDS
+        """
+        if all_day_end not in self.ALL_DAY_ENDS:
+            raise ValueError(f"Invalid all_day_end: {all_day_end}")
+        try:
+            self.floating_zone = pytz.timezone(floating_timezone)
+        except pytz.UnknownTimeZoneError:
+            raise ValueError(f"Unknown floating_timezone: {floating_timezone}")
+        self.all_day_end = all_day_end
+        self._zones = {}
+
+    def __repr__(self) -> str:
+        return (f'TimezoneNormalizer(floating_timezone={self.floating_zone.zone}, '
+                f'all_day_end={self.all_day_end})')
+
+    @classmethod
+    def from_config(cls, config_loader) -> 'TimezoneNormalizer':
+        """Build a normalizer from the parsing section of settings.yaml."""
+        parsing = config_loader.get_parsing_settings()
+        return cls(parsing.get('floating_timezone', 'UTC'),
+                   parsing.get('all_day_end', 'end_of_day'))
+
+    @property
+    def all_day_extension(self) -> timedelta:
+        """Time added to DTEND midnight to get the end of an all-day event."""
+        return self.END_OF_DAY if self.all_day_end == 'end_of_day' else timedelta(0)
+
+    @staticmethod
+    def is_all_day(value) -> bool:
+        return isinstance(value, date) and not isinstance(value, datetime)
+
+    def split(self, value, end: bool = False) -> Tuple[datetime, Optional[object]]:
+        """Split a DTSTART/DTEND value into naive local wall time and its zone.
+
+        Args:
+            value: date or datetime from icalendar
+            end: Whether value is an end, for the all-day end rule
+
+        Returns:
+            Tuple of (naive wall time, tzinfo). The tzinfo is None for floating
+            times, and UTC for all-day dates so they are taken as they are.
+        """
+        if self.is_all_day(value):
+            midnight = datetime.combine(value, datetime.min.time())
+            return (midnight + self.all_day_extension if end else midnight), pytz.UTC
+        return value.replace(tzinfo=None), value.tzinfo
+
+    def to_utc(self, value, end: bool = False) -> datetime:
+        """Convert one date or datetime to naive UTC.
+
+        Args:
+            value: date or datetime from icalendar
+            end: Whether value is an end, for the all-day end rule
+        """
+        if self.is_all_day(value):
+            return self.split(value, end)[0]
+        if value.tzinfo is None:
+            if self.floating_zone is pytz.UTC:
+                return value
+            # Same DST rules as the batch path
+            utc = self.localize_many(np.array([value], dtype='datetime64[ns]'), None)[0]
+            return pd.Timestamp(utc).to_pydatetime()
+        return value.astimezone(pytz.UTC).replace(tzinfo=None)
+
+    def _zone(self, tz):
+        """Resolve a tzinfo to a zone pandas converts natively, or None."""
+        if tz not in self._zones:
+            zone = None
+            name = getattr(tz, 'key', None) or getattr(tz, 'zone', None)
+            if name:
+                try:
+                    # pandas localizes pytz zones from their transition tables,
+                    # but calls into zoneinfo once per element
+                    zone = pytz.timezone(name)
+                except pytz.UnknownTimeZoneError:
+                    zone = None
+            elif isinstance(tz, timezone):
+                zone = tz
+            self._zones[tz] = zone
+        return self._zones[tz]
+
+    def localize_many(self, local: np.ndarray, tz) -> np.ndarray:
+        """Convert naive wall times that share one zone to naive UTC.
+
+        Args:
+            local: datetime64 array of wall times
+            tz: tzinfo of the times, or None for floating times
+
+        Returns:
+            datetime64[ns] array of naive UTC times
+        """
+        local = np.asarray(local, dtype='datetime64[ns]')
+        if tz is None:
+            tz = self.floating_zone
+        if tz is pytz.UTC or not len(local):
+            return local
+        zone = self._zone(tz)
+        if zone is pytz.UTC:
+            return local
+        if zone is None:
+            # Zones pandas cannot handle (e.g. custom VTIMEZONE definitions)
+            return self._convert_each(local, tz)
+        try:
+            converted = pd.DatetimeIndex(local).tz_localize(
+                zone, ambiguous=np.ones(len(local), dtype=bool), nonexistent='NaT'
+            )
+        except (TypeError, ValueError, AttributeError):
+            return self._convert_each(local, tz)
+        utc = converted.tz_convert('UTC').tz_localize(None).to_numpy(dtype='datetime64[ns]')
+        gaps = np.isnat(utc)
+        if gaps.any():
+            utc[gaps] = self._convert_each(local[gaps], tz)
+        return utc
+
+    def to_utc_many(self, local: np.ndarray, zones: Sequence) -> np.ndarray:
+        """Convert naive wall times with per-value zones to naive UTC.
+
+        Values are grouped by zone and each group is converted in one call.
+
+        Args:
+            local: datetime64 array of wall times
+            zones: tzinfo per value as returned by split
+
+        Returns:
+            datetime64[ns] array of naive UTC times
+        """
+        local = np.asarray(local, dtype='datetime64[ns]')
+        if not len(local):
+            return local
+        # Hash-based grouping; floating times (None) come back from factorize as NaN
+        codes, uniques = pd.factorize(pd.Series(zones, dtype=object), use_na_sentinel=False)
+        zones = [tz if isinstance(tz, tzinfo) else None for tz in uniques]
+        if len(zones) == 1:
+            return self.localize_many(local, zones[0])
+        utc = np.empty(len(local), dtype='datetime64[ns]')
+        for code, tz in enumerate(zones):
+            members = np.flatnonzero(codes == code)
+            utc[members] = self.localize_many(local[members], tz)
+        return utc
+
+    def to_utc_values(self, values: Sequence, end: bool = False) -> np.ndarray:
+        """Convert DTSTART/DTEND values of many events to naive UTC.
+
+        Args:
+            values: dates and datetimes from icalendar
+            end: Whether the values are ends, for the all-day end rule
+
+        Returns:
+            datetime64[ns] array of naive UTC times
+        """
+        extension = self.all_day_extension if end else timedelta(0)
+        local, zones = [], []
+        for value in values:
+            if isinstance(value, datetime):
+                local.append(value.replace(tzinfo=None))
+                zones.append(value.tzinfo)
+            else:
+                local.append(datetime.combine(value, datetime.min.time()) + extension)
+                zones.append(pytz.UTC)
+        return self.to_utc_many(pd.DatetimeIndex(local).to_numpy(dtype='datetime64[ns]'), zones)
+
+    def _convert_each(self, local: np.ndarray, tz) -> np.ndarray:
+        return np.array([
+            self._attach(value, tz).astimezone(pytz.UTC).replace(tzinfo=None)
+            for value in pd.DatetimeIndex(local).to_pydatetime()
+        ], dtype='datetime64[ns]')
+
+    @staticmethod
+    def _attach(value: datetime, tz) -> datetime:
+        return tz.localize(value) if hasattr(tz, 'localize') else value.replace(tzinfo=tz)
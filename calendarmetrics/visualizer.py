@@ -1,10 +1,72 @@
+# plotly.graph_objects only loads the figure classes when they are first
+# used; plotly.io and plotly.offline are imported where they are needed
 import plotly.graph_objects as go
-import plotly.express as px
-from typing import Dict
+from typing import Dict, List
+import html
+import json
+import os
 import pandas as pd
 
 
 class Visualizer:
+    # How write_figures lays out the HTML output
+    RENDER_MODES = ('standalone', 'shared', 'dashboard')
+    
+    # Bins of the daily view, finest first, with their length in days
+    # (a month is counted as 30 days to pick the resolution)
+    DAILY_RESOLUTIONS = {'day': 1, 'week': 7, 'month': 30}
+    # The automatic resolution keeps at most this many bins in view
+    MAX_DAILY_BINS = 120
+    # Bars (bins x activities) above which the daily view uses WebGL traces
+    WEBGL_THRESHOLD = 2000
+    DAILY_TITLES = {
+        'day': 'Hours per Macro-activities per Day',
+        'week': 'Hours per Macro-activities per Day (weekly average)',
+        'month': 'Hours per Macro-activities per Day (monthly average)'
+    }
+    DAILY_HOVER_DATES = {
+        'day': '%{x|%Y-%m-%d (%a)}',
+        'week': 'Week of %{x|%Y-%m-%d}',
+        'month': '%{x|%B %Y}'
+    }
+    # Swaps in the finer levels of a daily view when its x range is zoomed
+    DAILY_ZOOM_SCRIPT = """
+function calendarMetricsDailyZoom(gd) {
+  var meta = gd.layout.meta && gd.layout.meta.daily_levels;
+  if (!meta || gd.dataset.dailyZoom) return;
+  gd.dataset.dailyZoom = '1';
+  var names = Object.keys(meta.levels);
+  var current = meta.resolution;
+  gd.on('plotly_relayout', function () {
+    var range = gd.layout.xaxis.range;
+    var days = (new Date(range[1]) - new Date(range[0])) / 86400000 + 1;
+    var level = names[names.length - 1];
+    for (var i = 0; i < names.length; i++) {
+      if (days <= meta.levels[names[i]].bin_days * meta.max_bins) { level = names[i]; break; }
+    }
+    if (level === current) return;
+    current = level;
+    var data = meta.levels[level];
+    var update = {x: [], y: [], customdata: [], hovertemplate: data.hovertemplate, width: []};
+    var total = null;
+    data.y.forEach(function (values) {
+      update.x.push(data.x);
+      update.customdata.push(values);
+      update.width.push(data.width);
+      if (meta.webgl) {
+        total = total ? total.map(function (t, j) { return t + values[j]; }) : values.slice();
+        update.y.push(total);
+      } else {
+        update.y.push(values);
+      }
+    });
+    if (meta.webgl) delete update.width;
+    Plotly.restyle(gd, update);
+    Plotly.relayout(gd, {'title.text': data.title});
+  });
+}
+"""
+    
     def __init__(self, config_loader):
         self.config = config_loader
         # Get colors from calendars configuration
@@ -67,7 +129,7 @@ class Visualizer:
         
         return fig
 
-    def plot_daily_hours(self, df: pd.DataFrame) -> go.Figure:
+    def _daily_view_range(self, df: pd.DataFrame):
         # Get date range from config
         if 'daily_view_range' in self.config.time_periods:
             start_date = pd.to_datetime(self.config.time_periods['daily_view_range']['start_date']).date()
@@ -76,55 +138,138 @@ class Visualizer:
             # If no range specified, use min and max dates from data
             start_date = df['date'].min()
             end_date = df['date'].max()
+        return start_date, end_date
+
+    def daily_hours_input(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Rows and columns of the events that plot_daily_hours shows."""
+        start_date, end_date = self._daily_view_range(df)
+        df = df[['date', 'macro_activities', 'duration']]
+        return df[(df['date'] >= start_date) & (df['date'] <= end_date)]
+
+    def daily_settings(self) -> Dict:
+        """Resolution, bin limit and WebGL threshold of the daily view from settings.yaml."""
+        settings = self.config.get_render_settings().get('daily') or {}
+        resolution = settings.get('resolution', 'auto')
+        if resolution != 'auto' and resolution not in self.DAILY_RESOLUTIONS:
+            raise ValueError(f"Invalid daily resolution: {resolution}")
+        return {
+            'resolution': resolution,
+            'max_bins': int(settings.get('max_bins', self.MAX_DAILY_BINS)),
+            'webgl_threshold': int(settings.get('webgl_threshold', self.WEBGL_THRESHOLD))
+        }
+
+    def daily_resolution(self, start_date, end_date) -> str:
+        """Bin size of the daily view: the finest one keeping at most max_bins bins."""
+        settings = self.daily_settings()
+        if settings['resolution'] != 'auto':
+            return settings['resolution']
+        days = (end_date - start_date).days + 1
+        for resolution, bin_days in self.DAILY_RESOLUTIONS.items():
+            if days <= bin_days * settings['max_bins']:
+                return resolution
+        return resolution
+
+    @staticmethod
+    def _bin_starts(dates: pd.DatetimeIndex, resolution: str) -> pd.DatetimeIndex:
+        """First day of the day, week (Monday) or month bin of each date."""
+        if resolution == 'week':
+            return dates - pd.to_timedelta(dates.weekday, unit='D')
+        if resolution == 'month':
+            return dates.to_period('M').to_timestamp()
+        return dates
 
-        # Create complete date range
-        date_range = pd.date_range(start=start_date, end=end_date, freq='D').date
+    def daily_levels(self, df: pd.DataFrame, start_date, end_date,
+                     resolution: str) -> Dict[str, pd.DataFrame]:
+        """Average hours per day of each activity, binned at resolution and every finer one.
+
+        Hours are divided by the days of each bin inside the range, so all
+        levels share one scale and a partial first or last bin is not
+        understated.
+
+        Args:
+            df: Events with date, macro_activities and duration, inside the range
+            start_date: First day of the range
+            end_date: Last day of the range
+            resolution: Coarsest level to compute
+
+        Returns:
+            Dictionary mapping each level, finest first, to a DataFrame
+            indexed by bin start with one column per activity
+        """
+        days = pd.date_range(start=start_date, end=end_date, freq='D')
+        dates = pd.DatetimeIndex(pd.to_datetime(df['date']))
+        activities = list(df['macro_activities'].unique())
+        levels = {}
+        for level in self.DAILY_RESOLUTIONS:
+            days_per_bin = pd.Series(1, index=self._bin_starts(days, level)).groupby(level=0).sum()
+            if len(df):
+                hours = df['duration'].groupby(
+                    [self._bin_starts(dates, level), df['macro_activities'].to_numpy()]
+                ).sum().unstack(fill_value=0)
+            else:
+                hours = pd.DataFrame()
+            hours = hours.reindex(index=days_per_bin.index, columns=activities, fill_value=0)
+            levels[level] = hours.div(days_per_bin, axis=0).round(1)
+            if level == resolution:
+                break
+        return levels
+
+    def plot_daily_hours(self, df: pd.DataFrame) -> go.Figure:
+        start_date, end_date = self._daily_view_range(df)
 
         # Filter data to the date range
         df = df[(df['date'] >= start_date) & (df['date'] <= end_date)]
 
-        # Aggregate data by date and activity first
-        daily_hours = df.groupby(['date', 'macro_activities'])['duration'].sum().reset_index()
-        
-        # Create a complete index with all dates and activities
-        all_activities = df['macro_activities'].unique()
-        multi_index = pd.MultiIndex.from_product([date_range, all_activities], names=['date', 'macro_activities'])
-        
-        # Reindex the daily hours with the complete index
-        daily_hours_complete = daily_hours.set_index(['date', 'macro_activities']).reindex(multi_index).fillna(0).reset_index()
-        
-        # Then pivot the aggregated data
-        pivot = daily_hours_complete.pivot(index='date', columns='macro_activities', values='duration').round(1)
-        # Create date labels with weekday names, showing full date for Mondays only
-        date_labels = []
-        for date in pivot.index:
-            weekday = date.strftime('%a')
-            if weekday == 'Mon':
-                date_labels.append(f"{date.strftime('%Y-%m-%d')} ({weekday})")
-            else:
-                date_labels.append(f"{date.strftime('%d')} ({weekday})")
-        
+        # Long ranges are shown per week or month; the finer levels are kept
+        # in the figure and swapped in when the range slider zooms in
+        settings = self.daily_settings()
+        resolution = self.daily_resolution(start_date, end_date)
+        levels = self.daily_levels(df, start_date, end_date, resolution)
+        pivot = levels[resolution]
+
+        # Thousands of SVG bars slow the browser down; draw stacked WebGL steps instead
+        webgl = pivot.size > settings['webgl_threshold']
+        stacked = pivot.cumsum(axis=1)
+
         fig = go.Figure()
-        
-        for column in pivot.columns:
+
+        for i, column in enumerate(pivot.columns):
             color = self.colors.get(column, '#808080')  # Default gray if no color defined
-            fig.add_trace(go.Bar(
-                name=column,
-                x=date_labels,
-                y=pivot[column],
-                marker_color=color
-            ))
-        
+            hovertemplate = self._daily_hovertemplate(column, resolution)
+            if webgl:
+                fig.add_trace(go.Scattergl(
+                    name=column,
+                    x=pivot.index,
+                    y=stacked[column],
+                    customdata=pivot[column],
+                    mode='lines',
+                    line=dict(color=color, width=0.5, shape='hv'),
+                    fill='tozeroy' if i == 0 else 'tonexty',
+                    fillcolor=color,
+                    hovertemplate=hovertemplate
+                ))
+            else:
+                fig.add_trace(go.Bar(
+                    name=column,
+                    x=pivot.index,
+                    y=pivot[column],
+                    customdata=pivot[column],
+                    width=self._daily_bar_width(resolution),
+                    marker_color=color,
+                    hovertemplate=hovertemplate
+                ))
+
         fig.update_layout(
             **self.layout_settings,
-            title='Hours per Macro-activities per Day',
+            title=self.DAILY_TITLES[resolution],
             xaxis=dict(
                 title='Date',
+                type='date',
                 showgrid=True,
                 gridcolor='rgba(255, 255, 255, 0.1)',
                 tickfont=dict(family="Montserrat, sans-serif", color='white', size=10),
                 tickangle=45,  # Angle the date labels for better readability
-                dtick=1  # Show all ticks
+                rangeslider=dict(visible=len(levels) > 1, thickness=0.08)
             ),
             yaxis=dict(
                 title='Hours',
@@ -140,9 +285,38 @@ class Visualizer:
             height=600,
             width=1200
         )
-        
+
+        if len(levels) > 1:
+            fig.update_layout(meta={'daily_levels': {
+                'resolution': resolution,
+                'max_bins': settings['max_bins'],
+                'webgl': webgl,
+                'levels': {
+                    level: {
+                        'bin_days': self.DAILY_RESOLUTIONS[level],
+                        'x': hours.index.strftime('%Y-%m-%d').tolist(),
+                        'y': [hours[column].tolist() for column in pivot.columns],
+                        'width': self._daily_bar_width(level),
+                        'title': self.DAILY_TITLES[level],
+                        'hovertemplate': [self._daily_hovertemplate(column, level)
+                                          for column in pivot.columns]
+                    }
+                    for level, hours in levels.items()
+                }
+            }})
+
         return fig
-        
+
+    @classmethod
+    def _daily_bar_width(cls, resolution: str) -> float:
+        # Bar width on a date axis is in milliseconds
+        return 0.8 * cls.DAILY_RESOLUTIONS[resolution] * 86400000
+
+    @classmethod
+    def _daily_hovertemplate(cls, activity: str, resolution: str) -> str:
+        return (f"<b>{html.escape(str(activity))}</b><br>{cls.DAILY_HOVER_DATES[resolution]}"
+                "<br>Hours per day: %{customdata:.1f}<extra></extra>")
+
     def plot_activities_percentages(self, df: pd.DataFrame, title: str = "Hours per Macro-activities") -> go.Figure:
         df['percentage'] = df['percentage'].round(1)
         
@@ -165,4 +339,143 @@ class Visualizer:
             width=800
         )
         
-        return fig
\ No newline at end of file
+        return fig
+    
+    def write_figures(self, figures: Dict[str, go.Figure], output_dir: str,
+                      mode: str = 'standalone') -> List[str]:
+        """Write figures as HTML.
+        
+        Args:
+            figures: Mapping of output name (file name without extension) to figure
+            output_dir: Directory to write into
+            mode: "standalone" writes one self-contained file per figure, each
+                embedding plotly.js; "shared" writes one file per figure that
+                all load a single plotly.min.js from output_dir; "dashboard"
+                writes every figure into one tabbed dashboard.html
+                
+        Returns:
+            Paths of the written HTML files
+        """
+        if mode not in self.RENDER_MODES:
+            raise ValueError(f"Invalid render mode: {mode}")
+        
+        if mode == 'dashboard':
+            path = os.path.join(output_dir, 'dashboard.html')
+            self.write_dashboard(figures, path)
+            return [path]
+        
+        paths = []
+        for name, fig in figures.items():
+            path = os.path.join(output_dir, f'{name}.html')
+            self.write_figure(fig, path, mode)
+            paths.append(path)
+        return paths
+    
+    @staticmethod
+    def post_script(fig: go.Figure):
+        """JavaScript to run after fig is drawn in its own HTML page, or None."""
+        if fig.layout.meta and 'daily_levels' in fig.layout.meta:
+            return (Visualizer.DAILY_ZOOM_SCRIPT
+                    + "calendarMetricsDailyZoom(document.getElementById('{plot_id}'));")
+        return None
+    
+    @staticmethod
+    def write_figure(fig: go.Figure, path: str, mode: str = 'standalone') -> None:
+        """Write one figure as its own HTML file.
+        
+        Args:
+            fig: Figure to write
+            path: Path of the HTML file
+            mode: "standalone" embeds plotly.js; "shared" loads plotly.min.js
+                from the same directory, copying it there if it is missing
+        """
+        post_script = Visualizer.post_script(fig)
+        if mode == 'shared':
+            fig.write_html(path, include_plotlyjs='directory', post_script=post_script)
+        else:
+            fig.write_html(path, post_script=post_script)
+    
+    def write_dashboard(self, figures: Dict[str, go.Figure], path: str) -> None:
+        """Write all figures into one HTML page with a tab per figure.
+        
+        plotly.js is embedded once. Each figure is stored as compact JSON
+        without its layout template; templates are stored once and shared,
+        so the page grows with the data rather than the number of figures.
+        Figures are drawn when their tab is first opened.
+        
+        Args:
+            figures: Mapping of output name to figure
+            path: Path of the HTML file to write
+        """
+        import plotly.io as pio
+        from plotly.offline import get_plotlyjs
+        
+        templates = {}
+        specs = []
+        for name, fig in figures.items():
+            spec = json.loads(pio.to_json(fig, validate=False))
+            template = json.dumps(spec['layout'].pop('template', {}), separators=(',', ':'))
+            template_id = templates.setdefault(template, len(templates))
+            title = fig.layout.title.text or name
+            specs.append((name, title, template_id, json.dumps(spec, separators=(',', ':'))))
+        
+        def script_json(text: str) -> str:
+            # Keep "</script>" inside the JSON from closing the tag
+            return text.replace('</', '<\\/')
+        
+        parts = [
+            '<!DOCTYPE html>\n<html>\n<head>\n<meta charset="utf-8">\n',
+            '<title>CalendarMetrics dashboard</title>\n<style>\n',
+            'body{margin:0;background:rgb(17,17,17);color:white;font-family:Montserrat,sans-serif}\n',
+            'nav{display:flex;flex-wrap:wrap;gap:4px;padding:8px}\n',
+            'nav button{background:rgb(40,40,40);color:white;border:1px solid rgba(255,255,255,0.1);',
+            'padding:6px 10px;cursor:pointer;font-family:inherit}\n',
+            'nav button.active{background:rgb(80,80,80)}\n',
+            '.figure{display:none;padding:8px}\n.figure.active{display:block}\n',
+            '</style>\n<script type="text/javascript">', get_plotlyjs(), '</script>\n',
+            '</head>\n<body>\n<nav>\n'
+        ]
+        for i, (name, title, _, _) in enumerate(specs):
+            parts.append(f'<button data-figure="{i}">{html.escape(title)}</button>\n')
+        parts.append('</nav>\n')
+        for i, (name, _, _, _) in enumerate(specs):
+            parts.append(f'<div class="figure" id="figure-{i}" data-name="{html.escape(name)}"></div>\n')
+        for template, template_id in templates.items():
+            parts.append(f'<script type="application/json" id="template-{template_id}">'
+                         f'{script_json(template)}</script>\n')
+        for i, (_, _, template_id, spec) in enumerate(specs):
+            parts.append(f'<script type="application/json" id="spec-{i}" '
+                         f'data-template="{template_id}">{script_json(spec)}</script>\n')
+        parts.append('<script type="text/javascript">' + self.DAILY_ZOOM_SCRIPT + """
+(function () {
+  var templates = {};
+  var drawn = {};
+  function show(i) {
+    document.querySelectorAll('nav button').forEach(function (b) {
+      b.classList.toggle('active', b.dataset.figure === String(i));
+    });
+    document.querySelectorAll('.figure').forEach(function (d) {
+      d.classList.toggle('active', d.id === 'figure-' + i);
+    });
+    if (drawn[i]) return;
+    var node = document.getElementById('spec-' + i);
+    var spec = JSON.parse(node.textContent);
+    var t = node.dataset.template;
+    if (!(t in templates)) {
+      templates[t] = JSON.parse(document.getElementById('template-' + t).textContent);
+    }
+    spec.layout.template = templates[t];
+    Plotly.newPlot('figure-' + i, spec.data, spec.layout, spec.config || {}).then(calendarMetricsDailyZoom);
+    drawn[i] = true;
+  }
+  document.querySelectorAll('nav button').forEach(function (b) {
+    b.addEventListener('click', function () { show(b.dataset.figure); });
+  });
+  if (document.querySelector('nav button')) show(0);
+})();
+</script>
+</body>
+</html>
+""")
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(''.join(parts))
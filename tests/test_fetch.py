@@ -0,0 +1,202 @@
+"""FeedFetcher against a local stand-in HTTP server.
+
+Run with: python -m pytest tests
+"""
+import asyncio
+import hashlib
+import os
+import tempfile
+import threading
+import time
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from calendarmetrics.fetch import Feed, FeedFetcher, FetchError, _Response
+
+CALENDAR = (b'BEGIN:VCALENDAR\r\nVERSION:2.0\r\n'
+            + b''.join(b'BEGIN:VEVENT\r\nUID:%d@test\r\nSUMMARY:Event %d\r\nEND:VEVENT\r\n' % (i, i)
+                       for i in range(2000))
+            + b'END:VCALENDAR\r\n')
+ETAG = '"' + hashlib.sha1(CALENDAR).hexdigest() + '"'
+
+
+class StandInServer:
+    """Serve a few fixed routes on 127.0.0.1 and record the headers of every request."""
+
+    def __init__(self, protocol_version: str = 'HTTP/1.1', redirect_to: str = ''):
+        self.requests = []
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                server.requests.append((self.path, dict(self.headers)))
+                route = getattr(self, 'route_' + self.path.strip('/').replace('/', '_').replace('.', '_'), None)
+                if route is None:
+                    self.send_response(404)
+                    self.send_header('Content-Length', '0')
+                    self.end_headers()
+                else:
+                    route()
+
+            def route_plain_ics(self):
+                if self.headers.get('If-None-Match') == ETAG:
+                    self.send_response(304)
+                    self.send_header('ETag', ETAG)
+                    self.end_headers()
+                    return
+                self.send_response(200)
+                self.send_header('ETag', ETAG)
+                self.send_header('Content-Length', str(len(CALENDAR)))
+                self.end_headers()
+                self.wfile.write(CALENDAR)
+
+            def route_chunked_ics(self):
+                self.send_response(200)
+                self.send_header('Transfer-Encoding', 'chunked')
+                self.end_headers()
+                for start in range(0, len(CALENDAR), 7000):
+                    chunk = CALENDAR[start:start + 7000]
+                    self.wfile.write(b'%x\r\n%s\r\n' % (len(chunk), chunk))
+                self.wfile.write(b'0\r\n\r\n')
+
+            def route_slow_ics(self):
+                # Each pause is shorter than the timeout, the whole body is not
+                self.send_response(200)
+                self.send_header('Content-Length', str(len(CALENDAR)))
+                self.end_headers()
+                third = len(CALENDAR) // 3 + 1
+                for start in range(0, len(CALENDAR), third):
+                    self.wfile.write(CALENDAR[start:start + third])
+                    self.wfile.flush()
+                    time.sleep(0.3)
+
+            def route_moved_ics(self):
+                self.send_response(302)
+                self.send_header('Location', '/plain.ics')
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+
+            def route_away_ics(self):
+                self.send_response(301)
+                self.send_header('Location', server.redirect_to)
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+
+        Handler.protocol_version = protocol_version
+        self.redirect_to = redirect_to
+        self.httpd = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.url = f'http://127.0.0.1:{self.httpd.server_address[1]}'
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+
+    def close(self) -> None:
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+class FeedFetcherTest(unittest.TestCase):
+    def setUp(self):
+        self.server = StandInServer()
+        self.addCleanup(self.server.close)
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.calendars_dir = tmp.name
+
+    def feed(self, name: str, url: str, **kwargs) -> Feed:
+        return Feed(name, url, os.path.join(self.calendars_dir, f'{name}.ics'), **kwargs)
+
+    def test_download_then_not_modified(self):
+        feed = self.feed('work', self.server.url + '/plain.ics')
+        fetcher = FeedFetcher(self.calendars_dir)
+        self.assertEqual(fetcher.fetch([feed])['work']['status'], 'updated')
+        with open(feed.path, 'rb') as f:
+            self.assertEqual(f.read(), CALENDAR)
+        mtime = os.stat(feed.path).st_mtime_ns
+
+        result = fetcher.fetch([feed])['work']
+        self.assertEqual(result['status'], 'not_modified')
+        self.assertEqual(self.server.requests[-1][1].get('If-None-Match'), ETAG)
+        self.assertEqual(os.stat(feed.path).st_mtime_ns, mtime)
+
+    def test_chunked_body(self):
+        feed = self.feed('chunked', self.server.url + '/chunked.ics')
+        result = FeedFetcher(self.calendars_dir).fetch([feed])['chunked']
+        self.assertEqual(result, {'status': 'updated', 'bytes': len(CALENDAR), 'seconds': result['seconds']})
+        with open(feed.path, 'rb') as f:
+            self.assertEqual(f.read(), CALENDAR)
+
+    def test_connections_are_reused(self):
+        feeds = [self.feed(f'cal{i}', self.server.url + '/plain.ics') for i in range(4)]
+        fetcher = FeedFetcher(self.calendars_dir, max_connections=1)
+        fetcher.fetch(feeds)
+        self.assertEqual(fetcher.connections_opened, 1)
+
+    def test_http10_connections_are_not_reused(self):
+        server = StandInServer(protocol_version='HTTP/1.0')
+        self.addCleanup(server.close)
+        feeds = [self.feed(f'cal{i}', server.url + '/plain.ics') for i in range(3)]
+        fetcher = FeedFetcher(self.calendars_dir, max_connections=1)
+        results = fetcher.fetch(feeds)
+        self.assertEqual({result['status'] for result in results.values()}, {'updated'})
+        self.assertEqual(fetcher.connections_opened, 3)
+
+    def test_http10_needs_keep_alive_to_reuse(self):
+        self.assertFalse(_Response('HTTP/1.0', 200, {}, None, 1.0).reusable)
+        self.assertTrue(_Response('HTTP/1.0', 200, {'connection': 'keep-alive'}, None, 1.0).reusable)
+        self.assertTrue(_Response('HTTP/1.1', 200, {}, None, 1.0).reusable)
+        self.assertFalse(_Response('HTTP/1.1', 200, {'connection': 'close'}, None, 1.0).reusable)
+
+    def test_timeout_is_per_read(self):
+        feed = self.feed('slow', self.server.url + '/slow.ics')
+        result = FeedFetcher(self.calendars_dir, timeout=0.6).fetch([feed])['slow']
+        self.assertEqual(result['status'], 'updated')
+        self.assertGreater(result['seconds'], 0.6)
+
+    def test_same_origin_redirect_keeps_credentials(self):
+        os.environ['CALENDARMETRICS_TEST_AUTH'] = 'user:secret'
+        self.addCleanup(os.environ.pop, 'CALENDARMETRICS_TEST_AUTH')
+        feed = self.feed('moved', self.server.url + '/moved.ics', auth_env='CALENDARMETRICS_TEST_AUTH')
+        self.assertEqual(FeedFetcher(self.calendars_dir).fetch([feed])['moved']['status'], 'updated')
+        self.assertEqual([path for path, _ in self.server.requests], ['/moved.ics', '/plain.ics'])
+        self.assertIn('Authorization', self.server.requests[-1][1])
+
+    def test_cross_origin_redirect_drops_credentials_and_validators(self):
+        other = StandInServer()
+        self.addCleanup(other.close)
+        self.server.redirect_to = other.url + '/plain.ics'
+        os.environ['CALENDARMETRICS_TEST_AUTH'] = 'user:secret'
+        self.addCleanup(os.environ.pop, 'CALENDARMETRICS_TEST_AUTH')
+        feed = self.feed('away', self.server.url + '/away.ics', auth_env='CALENDARMETRICS_TEST_AUTH')
+        fetcher = FeedFetcher(self.calendars_dir)
+        self.assertEqual(fetcher.fetch([feed])['away']['status'], 'updated')
+        fetcher.fetch([feed])
+
+        self.assertEqual(len(self.server.requests), 2)
+        self.assertIn('Authorization', self.server.requests[-1][1])
+        self.assertIn('If-None-Match', self.server.requests[-1][1])
+        self.assertEqual(len(other.requests), 2)
+        for _, headers in other.requests:
+            self.assertNotIn('Authorization', headers)
+            self.assertNotIn('If-None-Match', headers)
+
+    def test_https_to_http_redirect_is_refused(self):
+        class RedirectingPool:
+            async def get(self, url, headers, handle):
+                return {'status': 302, 'location': 'http://example.com/basic.ics', 'bytes': 0}
+
+        feed = self.feed('secure', 'https://example.com/basic.ics')
+        fetcher = FeedFetcher(self.calendars_dir)
+        with self.assertRaisesRegex(FetchError, 'https to http'):
+            asyncio.run(fetcher._fetch_feed(RedirectingPool(), feed, {}))
+
+    def test_failed_feed_is_reported(self):
+        feed = self.feed('missing', self.server.url + '/missing.ics')
+        result = FeedFetcher(self.calendars_dir).fetch([feed])['missing']
+        self.assertEqual(result, {'status': 'error', 'error': 'HTTP 404'})
+        self.assertFalse(os.path.exists(feed.path))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,151 @@
+"""IncrementalIngestor against a full ingest of the same exports.
+
+Run with: python -m pytest tests
+"""
+import os
+import tempfile
+import unittest
+
+import yaml
+
+from calendarmetrics.config_loader import ConfigLoader
+from calendarmetrics.data_processor import DataProcessor
+from calendarmetrics.event_table import EVENT_COLUMNS
+from calendarmetrics.ingest import CalendarIngestor, IncrementalIngestor
+
+CONFIG = {
+    'calendars.yaml': {'calendars': {
+        'work': {'file': 'work.ics', 'category': 'WORK'},
+        'home': {'file': 'home.ics', 'category': 'HOME'},
+    }},
+    'time_periods.yaml': {
+        'default_periods': {'year': {'start_month': 9, 'end_month': 8}},
+        'active_range': {'start_date': '2024-01-01', 'end_date': '2024-12-31'},
+    },
+    'settings.yaml': {'parsing': {'expand_recurrences': True}, 'segments': {'split_at': 'day'}},
+    'text_replacements.yaml': {'replacements': {}},
+    'holidays.yaml': {'holidays': {}},
+}
+
+# Columns that must agree between the two paths; period columns derive from start
+COMPARED = EVENT_COLUMNS + ['date', 'iso_week_key', 'fiscal_quarter_key']
+
+
+def vevent(uid: str, start: str, end: str, summary: str, *extra: str) -> str:
+    lines = ['BEGIN:VEVENT', f'UID:{uid}', 'DTSTAMP:20240101T000000Z',
+             f'DTSTART;TZID=Europe/Rome:{start}', f'DTEND;TZID=Europe/Rome:{end}',
+             f'SUMMARY:{summary}', *extra, 'END:VEVENT']
+    return '\r\n'.join(lines)
+
+
+def vcalendar(*events: str) -> str:
+    return '\r\n'.join(['BEGIN:VCALENDAR', 'VERSION:2.0', *events, 'END:VCALENDAR']) + '\r\n'
+
+
+WORK = {
+    'report': vevent('report', '20240304T090000', '20240304T110000', 'report'),
+    'review': vevent('review', '20240305T140000', '20240305T150000', 'review'),
+    # Crosses midnight, so it is stored as two pieces
+    'deploy': vevent('deploy', '20240306T220000', '20240307T020000', 'deploy'),
+    # Outside the active range until it is moved
+    'planning': vevent('planning', '20230601T090000', '20230601T100000', 'planning'),
+    'standup': vevent('standup', '20240311T093000', '20240311T094500', 'standup',
+                      'RRULE:FREQ=DAILY;COUNT=10', 'EXDATE;TZID=Europe/Rome:20240313T093000'),
+    'standup-moved': vevent('standup', '20240315T120000', '20240315T121500', 'standup',
+                            'RECURRENCE-ID;TZID=Europe/Rome:20240315T093000'),
+    'standup-long': vevent('standup', '20240318T093000', '20240318T103000', 'standup',
+                           'RECURRENCE-ID;TZID=Europe/Rome:20240318T093000'),
+}
+HOME = {
+    'gym': vevent('gym', '20240302T180000', '20240302T190000', 'gym',
+                  'RRULE:FREQ=WEEKLY;COUNT=4'),
+    'dinner': vevent('dinner', '20240309T200000', '20240309T220000', 'dinner'),
+}
+
+
+class IncrementalIngestTest(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.config_dir = os.path.join(tmp.name, 'config')
+        self.calendars_dir = os.path.join(tmp.name, 'calendars')
+        self.store_dir = os.path.join(tmp.name, 'store')
+        os.makedirs(self.config_dir)
+        os.makedirs(self.calendars_dir)
+        for filename, content in CONFIG.items():
+            with open(os.path.join(self.config_dir, filename), 'w') as f:
+                yaml.safe_dump(content, f)
+        self.config = ConfigLoader(self.config_dir)
+        self.work, self.home = dict(WORK), dict(HOME)
+
+    def export(self) -> None:
+        for filename, events in (('work.ics', self.work), ('home.ics', self.home)):
+            with open(os.path.join(self.calendars_dir, filename), 'w', newline='') as f:
+                f.write(vcalendar(*events.values()))
+
+    def full_ingest(self):
+        table = CalendarIngestor(self.config).ingest_table(self.calendars_dir)
+        return DataProcessor(table, self.config).df
+
+    def assertSameEvents(self, incremental, full):
+        def normalized(df):
+            return (df[COMPARED].sort_values(COMPARED[:4] + ['calendar'])
+                    .reset_index(drop=True).astype({'duration': float}))
+        self.assertEqual(len(incremental), len(full))
+        self.assertTrue(normalized(incremental).equals(normalized(full)),
+                        f"\n{normalized(incremental)}\n!=\n{normalized(full)}")
+
+    def test_edits_deletes_and_inserts_match_full_ingest(self):
+        self.export()
+        ingestor = IncrementalIngestor(self.config, self.store_dir)
+        processor = ingestor.ingest(self.calendars_dir)
+        self.assertSameEvents(processor.df, self.full_ingest())
+
+        # Edited single event, deleted one, inserted one, event moved into range
+        self.work['report'] = vevent('report', '20240304T100000', '20240304T130000', 'report',
+                                     'SEQUENCE:1')
+        del self.work['review']
+        self.work['retro'] = vevent('retro', '20240308T160000', '20240309T010000', 'retro')
+        self.work['planning'] = vevent('planning', '20240601T090000', '20240601T100000',
+                                       'planning', 'SEQUENCE:1')
+        # Edited override, deleted override and a new exception on the series
+        self.work['standup-moved'] = vevent('standup', '20240315T150000', '20240315T153000',
+                                            'standup', 'SEQUENCE:1',
+                                            'RECURRENCE-ID;TZID=Europe/Rome:20240315T093000')
+        del self.work['standup-long']
+        self.work['standup'] = vevent('standup', '20240311T093000', '20240311T094500', 'standup',
+                                      'RRULE:FREQ=DAILY;COUNT=10', 'SEQUENCE:1',
+                                      'EXDATE;TZID=Europe/Rome:20240313T093000,20240314T093000')
+        # Series shortened in the other calendar, its single event deleted
+        self.home['gym'] = vevent('gym', '20240302T180000', '20240302T190000', 'gym',
+                                  'RRULE:FREQ=WEEKLY;COUNT=2', 'SEQUENCE:1')
+        del self.home['dinner']
+        self.export()
+
+        processor = ingestor.ingest(self.calendars_dir, processor)
+        full = self.full_ingest()
+        self.assertSameEvents(processor.df, full)
+        self.assertEqual(ingestor.last_changes, {
+            'work': {'inserted': 2, 'updated': 3, 'deleted': 2},
+            'home': {'inserted': 0, 'updated': 1, 'deleted': 1},
+        })
+
+        # The store holds the same result for a fresh ingestor
+        reloaded = IncrementalIngestor(self.config, self.store_dir).ingest(self.calendars_dir)
+        self.assertSameEvents(reloaded.df, full)
+
+    def test_unchanged_exports_leave_the_store_alone(self):
+        self.export()
+        ingestor = IncrementalIngestor(self.config, self.store_dir)
+        processor = ingestor.ingest(self.calendars_dir)
+        meta = os.path.join(self.store_dir, 'meta.json')
+        written = os.stat(meta).st_mtime_ns
+
+        self.assertIs(ingestor.ingest(self.calendars_dir, processor), processor)
+        self.assertEqual(os.stat(meta).st_mtime_ns, written)
+        self.assertEqual({name: sum(counts.values()) for name, counts in ingestor.last_changes.items()},
+                         {'work': 0, 'home': 0})
+
+
+if __name__ == '__main__':
+    unittest.main()
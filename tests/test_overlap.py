@@ -0,0 +1,75 @@
+"""OverlapResolver against a per-minute brute-force reference.
+
+Run with: python -m pytest tests
+"""
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from calendarmetrics.event_table import EVENT_COLUMNS
+from calendarmetrics.overlap import OverlapResolver
+
+PRIORITY = ['SLEEP', 'WORK']
+ORIGIN = pd.Timestamp('2024-03-01')
+
+
+def random_events(seed: int, count: int = 150, minutes: int = 3 * 24 * 60) -> pd.DataFrame:
+    """Events on a minute grid, with shared instants, nesting and zero-length events."""
+    rng = np.random.default_rng(seed)
+    starts = rng.integers(0, minutes, count)
+    lengths = rng.choice([0, 15, 30, 60, 90, 240, 480], count)
+    starts[::7] = starts[1::7][:len(starts[::7])]
+    return pd.DataFrame({
+        'start': ORIGIN + pd.to_timedelta(starts, unit='min'),
+        'end': ORIGIN + pd.to_timedelta(starts + lengths, unit='min'),
+        'macro_activities': rng.choice(['SLEEP', 'WORK', 'HOME', 'ERRANDS'], count),
+        # Unique label to tell the segments of each event apart
+        'micro_activities': [f'event {i}' for i in range(count)],
+        'duration': lengths / 60,
+        'calendar': 'test',
+    })[EVENT_COLUMNS]
+
+
+def brute_force_minutes(events: pd.DataFrame) -> dict:
+    """Minutes attributed to each event, deciding every minute on its own."""
+    order = PRIORITY + sorted(set(events['macro_activities']) - set(PRIORITY))
+    rank = events['macro_activities'].map(order.index).tolist()
+    starts = ((events['start'] - ORIGIN) // pd.Timedelta(minutes=1)).tolist()
+    ends = ((events['end'] - ORIGIN) // pd.Timedelta(minutes=1)).tolist()
+    attributed = {}
+    for minute in range(min(starts), max(ends)):
+        active = [i for i in range(len(events)) if starts[i] <= minute < ends[i]]
+        if active:
+            # Highest priority, then longest reaching, then earliest start
+            owner = min(active, key=lambda i: (rank[i], -ends[i], starts[i], i))
+            label = events['micro_activities'].iat[owner]
+            attributed[label] = attributed.get(label, 0) + 1
+    return attributed
+
+
+class OverlapResolverTest(unittest.TestCase):
+    def test_matches_brute_force(self):
+        for seed in range(5):
+            with self.subTest(seed=seed):
+                events = random_events(seed)
+                segments = OverlapResolver(PRIORITY).resolve(events)
+
+                minutes = (segments['end'] - segments['start']) // pd.Timedelta(minutes=1)
+                self.assertEqual(minutes.groupby(segments['micro_activities']).sum().to_dict(),
+                                 brute_force_minutes(events))
+                np.testing.assert_allclose(segments['duration'], minutes / 60)
+
+    def test_segments_do_not_overlap(self):
+        segments = OverlapResolver(PRIORITY).resolve(random_events(7))
+        self.assertTrue(segments['start'].is_monotonic_increasing)
+        self.assertTrue((segments['end'] > segments['start']).all())
+        self.assertTrue((segments['start'].iloc[1:].to_numpy() >= segments['end'].iloc[:-1].to_numpy()).all())
+
+    def test_no_positive_events(self):
+        events = random_events(0).iloc[:3].assign(end=lambda df: df['start'])
+        self.assertEqual(len(OverlapResolver().resolve(events)), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
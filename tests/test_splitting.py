@@ -0,0 +1,62 @@
+"""PeriodSplitter keeps every hour of the events it cuts.
+
+Run with: python -m pytest tests
+"""
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from calendarmetrics.splitting import PeriodSplitter
+
+
+def random_events(seed: int, count: int = 300) -> pd.DataFrame:
+    """Events from minutes to several months long, some starting exactly on midnight."""
+    rng = np.random.default_rng(seed)
+    starts = pd.Timestamp('2023-12-20') + pd.to_timedelta(rng.integers(0, 60 * 24 * 120, count), unit='min')
+    starts = starts.where(rng.random(count) > 0.2, starts.normalize())
+    lengths = pd.to_timedelta(rng.choice([5, 90, 23 * 60, 49 * 60, 40 * 24 * 60, 400 * 24 * 60], count),
+                              unit='min')
+    return pd.DataFrame({
+        'start': starts,
+        'end': starts + lengths,
+        'duration': lengths / pd.Timedelta(hours=1),
+        'summary': [f'event {i}' for i in range(count)],
+    }, index=pd.Index([f'key{i}' for i in range(count)], name='key'))
+
+
+class PeriodSplitterTest(unittest.TestCase):
+    def test_piece_durations_sum_to_the_original(self):
+        events = random_events(0)
+        for unit in PeriodSplitter.UNITS:
+            with self.subTest(unit=unit):
+                pieces = PeriodSplitter(unit, fiscal_start_month=9).split(events)
+                self.assertGreater(len(pieces), len(events))
+                totals = pieces['duration'].groupby(level='key').sum()
+                np.testing.assert_allclose(totals[events.index], events['duration'])
+
+                # Pieces tile each event without gaps and keep its other columns
+                spans = pieces.groupby(level='key').agg(start=('start', 'min'), end=('end', 'max'),
+                                                        summary=('summary', 'first'))
+                pd.testing.assert_frame_equal(spans.loc[events.index], events[['start', 'end', 'summary']])
+                np.testing.assert_allclose(pieces['duration'],
+                                           (pieces['end'] - pieces['start']) / pd.Timedelta(hours=1))
+
+    def test_day_pieces_stay_within_one_day(self):
+        pieces = PeriodSplitter('day').split(random_events(1))
+        last_instant = pieces['end'] - pd.Timedelta(nanoseconds=1)
+        self.assertTrue((pieces['start'].dt.normalize() == last_instant.dt.normalize()).all())
+
+    def test_events_inside_one_period_are_untouched(self):
+        events = random_events(2)
+        short = events[events['start'].dt.normalize() == (events['end'] - pd.Timedelta(minutes=1)).dt.normalize()]
+        self.assertGreater(len(short), 0)
+        pd.testing.assert_frame_equal(PeriodSplitter('day').split(short), short)
+
+    def test_unknown_unit(self):
+        with self.assertRaises(ValueError):
+            PeriodSplitter('hour')
+
+
+if __name__ == '__main__':
+    unittest.main()